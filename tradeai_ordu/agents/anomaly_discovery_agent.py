@@ -1,5 +1,6 @@
 from config.config import Config
 from agents.base_agent import BaseAgent
+from core.anomaly_engine import FEATURES
 import numpy as np
 
 class AnomalyDiscoveryAgent(BaseAgent):
@@ -22,16 +23,22 @@ class AnomalyDiscoveryAgent(BaseAgent):
         "pattern_confirm_weight": 0.13,
         "max_anomaly_risk": 0.21,
         "history_boost_window": 10,
+        "idio_z_threshold": 2.0,
+        "idiosyncratic_weight": 0.08,
     }
 
-    def ml_anomaly_detection(self, features):
+    consumes = ("momentum_score", "dump_pump_flag")
+
+    def ml_anomaly_detection(self, features, z_scores=None):
         """
         Feature z-score, outlier ve future ML/AI detection interface.
+        z_scores verilirse (online anomaly motoru) doğrudan onlar kullanılır.
         """
-        if features is None or len(features) == 0:
-            return 0, []
-        features = np.array(features)
-        z_scores = (features - np.mean(features)) / (np.std(features) + 1e-8)
+        if z_scores is None:
+            if features is None or len(features) == 0:
+                return 0, []
+            features = np.array(features)
+            z_scores = (features - np.mean(features)) / (np.std(features) + 1e-8)
         outliers = np.where(np.abs(z_scores) > self.params.get("z_score_threshold", 2.6))[0]
         score = len(outliers) * self.params.get("ml_anomaly_weight", 0.23)
         return score, outliers.tolist()
@@ -49,6 +56,10 @@ class AnomalyDiscoveryAgent(BaseAgent):
         patterns = d.get("patterns", {})
         momentum_score = d.get("momentum_score", 0)
         dump_pump_flag = d.get("dump_pump_flag", False)
+        # Artık getiri z'si: fiyat hareketinin BTC betasıyla açıklanamayan kısmı
+        residual_z = d.get("residual_z", float("nan"))
+        has_residual = bool(np.isfinite(residual_z))
+        market_move = has_residual and abs(residual_z) < params["idio_z_threshold"]
 
         confidence = 0.5
         risk = 0
@@ -57,11 +68,29 @@ class AnomalyDiscoveryAgent(BaseAgent):
         signals = []
 
         # 1. Teknik feature’lardan z-score/outlier ile anomaly yakala
-        close_arr = np.array(df["close"][-35:]) if df is not None else np.array([])
-        ml_score, outliers = self.ml_anomaly_detection(close_arr)
-        score += ml_score
-        if len(outliers) > 0:
-            signals.append(f"Fiyat outlier {len(outliers)}x (z-score>{self.params.get('z_score_threshold', 2.6)})")
+        # Online motor ısındıysa çok değişkenli robust z'ler, yoksa son 35 kapanışın z-score'u
+        engine_z = d.get("anomaly_zscores")
+        if engine_z is not None and len(engine_z) and np.any(engine_z):
+            if market_move:
+                # Piyasa geneli getiri pariteye özgü anomaly sayılmaz
+                engine_z = np.where(np.array(FEATURES) == "ret", 0.0, engine_z)
+            ml_score, outliers = self.ml_anomaly_detection(None, z_scores=engine_z)
+            score += ml_score
+            if len(outliers) > 0:
+                names = ", ".join(FEATURES[i] for i in outliers)
+                signals.append(f"Online anomaly: {names} (mesafe={d.get('anomaly_score', 0):.2f})")
+        elif not market_move:
+            close_arr = np.array(df["close"][-35:]) if df is not None else np.array([])
+            ml_score, outliers = self.ml_anomaly_detection(close_arr)
+            score += ml_score
+            if len(outliers) > 0:
+                signals.append(f"Fiyat outlier {len(outliers)}x (z-score>{self.params.get('z_score_threshold', 2.6)})")
+
+        if has_residual and abs(residual_z) > params["idio_z_threshold"]:
+            score += params["idiosyncratic_weight"]
+            signals.append(f"Pariteye özgü hareket (artık z={residual_z:.1f}, BTC beta={d.get('market_beta', 0):.2f})")
+        elif market_move:
+            signals.append("Fiyat BTC'yi takip ediyor (piyasa geneli)")
 
         # 2. Volume anomaly & outlier
         if volume_anomaly is not None and volume_anomaly > 2.1:
@@ -81,19 +110,8 @@ class AnomalyDiscoveryAgent(BaseAgent):
             signals.append("Whale anomaly (ani büyük transfer)")
 
         # 5. Funding/OI anomaly
-        funding_delta = 0
-        if len(funding_rates) > 2:
-            try:
-                funding_delta = float(funding_rates[-1].get("fundingRate", 0)) - float(funding_rates[-2].get("fundingRate", 0))
-            except Exception:
-                funding_delta = 0
-
-        oi_change = 0
-        if len(oi_changes) > 2:
-            try:
-                oi_change = float(oi_changes[-1]) - float(oi_changes[-2])
-            except Exception:
-                oi_change = 0
+        funding_delta = funding_rates[-1] - funding_rates[-2] if len(funding_rates) > 2 else 0
+        oi_change = oi_changes[-1] - oi_changes[-2] if len(oi_changes) > 2 else 0
 
         if abs(funding_delta) > 0.0014:
             score += params["funding_oi_outlier_weight"]
@@ -120,12 +138,9 @@ class AnomalyDiscoveryAgent(BaseAgent):
             signals.append("Dump/Pump anomaly (ek risk)")
 
         # 8. Feedback geçmişiyle başarı boost
-        if hasattr(self, "history") and len(self.history) > params["history_boost_window"]:
-            last_wins = [
-                r for r in self.history[-params["history_boost_window"]:]
-                if r.get("direction") == r.get("last_trade_result", "none") and r.get("score", 0) > 0.1
-            ]
-            if len(last_wins) > 4:
+        if len(self.history) > params["history_boost_window"]:
+            last_wins = self.history.win_count(params["history_boost_window"], min_score=0.1)
+            if last_wins > 4:
                 score += 0.08
                 confidence += 0.04
                 signals.append("Anomaly geçmiş başarısı boost")
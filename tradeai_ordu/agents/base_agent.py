@@ -2,7 +2,10 @@ from config.config import Config
 # agents/base_agent.py
 
 import json
+import numpy as np
 from core.self_learning import update_agent_stats
+from core.ring_buffer import HistoryRing
+from core.agent_result import AgentResult
 
 class BaseAgent:
     """
@@ -10,12 +13,26 @@ class BaseAgent:
     """
     # Tüm agent parametreleri ve hyperparameter'lar dinamik olarak ayarlanabilir
     default_params = {}
+    # Vectorized batch API: analyze_batch destekleyen ajanlar ihtiyaç duyduğu feature'ları bildirir
+    supports_batch = False
+    batch_features = ()
+    # Ajanlar arası ara sinyaller: AgentPool bunlardan topolojik stage'ler kurar
+    produces = ()
+    consumes = ()
 
     def __init__(self, data, params=None):
-        self.data = data                  # Pipeline'dan gelen full feature/data dict
+        self.data = data                  # Pipeline'dan gelen SymbolSnapshot (dict uyumlu erişim)
         self.params = params or self.default_params.copy()
-        self.result_data = {}
-        self.history = []                 # Agent'ın geçmiş kararları (feedback için)
+        self.result_data = None           # Son analiz sonucu (AgentResult)
+        self.history = HistoryRing()      # Agent'ın geçmiş kararları (feedback için, sabit boyutlu ring)
+
+    def update(self, data):
+        """
+        Kalıcı ajan instance'ını yeni döngünün verisiyle günceller (geçmiş korunur).
+        """
+        self.data = data
+        self.result_data = None
+        return self
 
     def analyze(self):
         """
@@ -23,37 +40,72 @@ class BaseAgent:
         """
         raise NotImplementedError
 
+    def analyze_batch(self, matrix):
+        """
+        Opsiyonel: aynı kuralları SnapshotMatrix üzerinde tüm pariteler için tek seferde
+        değerlendirir, parite sırasıyla sonuç listesi döner.
+        """
+        raise NotImplementedError
+
+    def required_batch_features(self):
+        return tuple(self.batch_features)
+
+    def _batch_output(self, matrix, score, confidence, risk, direction, anomaly, signals, agent_type, label):
+        """
+        Vektör skor/mask'lerden parite bazlı standart çıktı listesi üretir.
+        signals: [(mask, açıklama), ...]
+        """
+        name = self.__class__.__name__
+        outputs = []
+        for i in range(len(matrix)):
+            s, c, r = float(score[i]), float(confidence[i]), float(risk[i])
+            # Açıklama yalnızca okunursa (rapor/log) formatlanır
+            explanation = lambda i=i, s=s, c=c, r=r: (
+                f"{label}: {' | '.join(text for mask, text in signals if mask[i])} | "
+                f"Skor: {s:.2f}, Güven: {c:.2f}, Risk: {r:.2f}"
+            )
+            outputs.append(AgentResult(
+                agent_name=name,
+                score=s,
+                confidence=c,
+                risk=r,
+                direction=str(direction[i]),
+                type=agent_type,
+                explanation=explanation,
+                anomaly=bool(anomaly[i]),
+                params=self.params,
+            ))
+        return outputs
+
+    @staticmethod
+    def _directions(score, upper, lower):
+        return np.where(score > upper, "long", np.where(score < lower, "short", "none"))
+
     def result(self):
         """
         Analiz sonrası rapor (full explainability ile birlikte).
         """
-        out = self.result_data.copy()
-        out["agent_name"] = self.__class__.__name__
-        out["params"] = self.params
-        return out
+        if self.result_data is None:
+            return AgentResult(agent_name=self.__class__.__name__, params=self.params)
+        return self.result_data
 
     def _base_output(self, **kwargs):
         """
         Standart output alanlarını birleştirip geçmiş/log kaydını otomatik tutar.
+        Eksik alanlar AgentResult varsayılanlarıyla dolar; features snapshot'tan paylaşılır.
         """
-        self.result_data.update(kwargs)
-        # En temel alanlar:
-        for key, val in {
-            "agent_name": self.__class__.__name__,
-            "score": 0,
-            "confidence": 0.5,
-            "risk": 0,
-            "direction": "none",
-            "type": "unknown",
-            "explanation": "",
-            "anomaly": False,
-        }.items():
-            if key not in self.result_data:
-                self.result_data[key] = val
+        kwargs.setdefault("features", self.data.get("time_features") if self.data is not None else None)
+        self.result_data = AgentResult(agent_name=self.__class__.__name__, params=self.params, **kwargs)
         # Karar geçmişi/log kaydı (feedback ve auto-learning için)
-        self.history.append(self.result_data.copy())
+        self.remember(self.result_data)
         return self.result_data
 
+    def remember(self, result):
+        """
+        Sonucu kompakt geçmiş ring'ine yazar.
+        """
+        self.history.append(result.score, result.confidence, result.risk, result.direction)
+
     def feedback(self, trade_result=None):
         """
         Trade sonrası/karar sonrası kendini güncelleyen feedback fonksiyonu.
@@ -76,4 +128,4 @@ class BaseAgent:
         if not log_path:
             return
         with open(log_path, "a") as f:
-            f.write(json.dumps(self.result(), ensure_ascii=False) + "\n")
\ No newline at end of file
+            f.write(json.dumps(self.result().to_dict(), ensure_ascii=False, default=str) + "\n")
\ No newline at end of file
@@ -23,15 +23,19 @@ class DumpPumpAgent(BaseAgent):
         "momentum_confirm_weight": 0.13,
         "max_anomaly_risk": 0.23,
         "history_boost_window": 12,
+        "idio_z_threshold": 2.0,          # artık getiri z'si bunun altındaysa hareket piyasa geneli
     }
 
+    produces = ("dump_pump_flag",)
+    consumes = ("momentum_score",)
+
     def analyze(self):
         d = self.data
         params = self.params
-        df = d.get("klines_df")
+        lv = d.latest  # son/önceki indikatör değerleri (pipeline tek sefer çıkarır)
         volume_anomaly = d.get("volume_anomaly", 1)
-        price_now = df["close"].iloc[-1]
-        price_prev = df["close"].iloc[-2]
+        price_now = lv.close
+        price_prev = lv.close_prev
         price_change = abs(price_now - price_prev) / price_prev if price_prev else 0
         whale_events = d.get("whale_events", [])
         funding_rates = d.get("funding_rates", [])
@@ -39,6 +43,9 @@ class DumpPumpAgent(BaseAgent):
         ob_ana = d.get("orderbook_anomaly", {})
         patterns = d.get("patterns", {})
         momentum_score = d.get("momentum_score", 0)
+        # BTC betasıyla açıklanan hareket (artık getiri küçük) pariteye özgü dump/pump değildir
+        residual_z = d.get("residual_z", float("nan"))
+        market_move = bool(np.isfinite(residual_z)) and abs(residual_z) < params["idio_z_threshold"]
 
         confidence = 0.5
         risk = 0
@@ -47,7 +54,11 @@ class DumpPumpAgent(BaseAgent):
         signals = []
 
         # 1. Volume ve fiyat spike (ani dump/pump edge)
-        if volume_anomaly > params["dump_pump_vol_spike"] and price_change > params["dump_pump_price_spike"]:
+        price_spike = price_change > params["dump_pump_price_spike"]
+        if price_spike and market_move:
+            price_spike = False
+            signals.append(f"Fiyat hareketi piyasa geneli (beta={d.get('market_beta', 0):.2f}, artık z={residual_z:.1f})")
+        if volume_anomaly > params["dump_pump_vol_spike"] and price_spike:
             score -= 0.21
             risk += 0.11
             anomaly = True
@@ -55,7 +66,7 @@ class DumpPumpAgent(BaseAgent):
         elif volume_anomaly > params["dump_pump_vol_spike"]:
             risk += 0.09
             signals.append("Hacim spike (tuzak riski)")
-        elif price_change > params["dump_pump_price_spike"]:
+        elif price_spike:
             risk += 0.09
             signals.append("Fiyat spike (tuzak riski)")
 
@@ -66,8 +77,8 @@ class DumpPumpAgent(BaseAgent):
             signals.append(f"{len(whale_events)}x whale transfer dump/pump riski")
 
         # 3. Funding ve OI spike
-        funding_delta = float(funding_rates[-1]["fundingRate"]) - float(funding_rates[-2]["fundingRate"]) if len(funding_rates) > 2 else 0
-        oi_change = float(oi_changes[-1]) - float(oi_changes[-2]) if len(oi_changes) > 2 else 0
+        funding_delta = funding_rates[-1] - funding_rates[-2] if len(funding_rates) > 2 else 0
+        oi_change = oi_changes[-1] - oi_changes[-2] if len(oi_changes) > 2 else 0
         if abs(funding_delta) > params["funding_spike"]:
             risk += 0.13
             anomaly = True
@@ -101,9 +112,9 @@ class DumpPumpAgent(BaseAgent):
             signals.append("Dump/Pump + volume onay")
 
         # 7. Feedback/Geçmiş başarıya göre risk optimizasyonu
-        if hasattr(self, "history") and len(self.history) > params["history_boost_window"]:
-            last_fails = [r for r in self.history[-params["history_boost_window"]:] if abs(r.get("score", 0)) < 0.05]
-            if len(last_fails) > 4:
+        if len(self.history) > params["history_boost_window"]:
+            last_fails = self.history.count_below(params["history_boost_window"], 0.05)
+            if last_fails > 4:
                 risk += 0.09
                 signals.append("Dump/Pump geçmişi: risk boost")
 
@@ -113,8 +124,8 @@ class DumpPumpAgent(BaseAgent):
             confidence *= 0.58
             signals.append("DUMP/PUMP ANOMALY SHIELD: Skor ve güven kırıldı!")
 
-        # Dump/Pump flag output (diğer ajanlara kullanabilmesi için)
-        d["dump_pump_flag"] = (risk > 0.15 or anomaly)
+        # Dump/Pump flag output (diğer ajanlara kullanabilmesi için, AgentPool snapshot'a yazar)
+        dump_pump_flag = (risk > 0.15 or anomaly)
 
         # Nihai karar (burada çoğunlukla “none” veya “işlemden kaç” önerir)
         direction = "none" if score < 0.15 else ("short" if score < -0.25 else "long" if score > 0.25 else "none")
@@ -129,4 +140,5 @@ class DumpPumpAgent(BaseAgent):
             type="dump_pump",
             explanation=explanation,
             anomaly=anomaly,
+            dump_pump_flag=dump_pump_flag,
         )
\ No newline at end of file
@@ -2,6 +2,7 @@ from config.config import Config
 # agents/midterm_agent.py
 
 from agents.base_agent import BaseAgent
+from core.snapshot import trend_slope
 import numpy as np
 
 class MidtermAgent(BaseAgent):
@@ -26,15 +27,25 @@ class MidtermAgent(BaseAgent):
         "max_volatility": 4.5,
     }
 
+    supports_batch = True
+    batch_features = (
+        "EMA_21", "EMA_55", "SMA_200", "RSI_14", "ATR_14", "Volatility",
+        "pat_double_bottom", "pat_double_top", "pat_breakout", "pat_breakdown",
+        "volume_anomaly", "spoofing", "whale_count",
+    )
+
+    def required_batch_features(self):
+        return self.batch_features + (f"slope_{self.params['trend_slope_window']}",)
+
     def analyze(self):
         d = self.data
         params = self.params
-        df = d.get("klines_df")
+        lv = d.latest  # son/önceki indikatör değerleri (pipeline tek sefer çıkarır)
         ob_ana = d.get("orderbook_anomaly", {})
         whale_events = d.get("whale_events", [])
         patterns = d.get("patterns", {})
         volume_anomaly = d.get("volume_anomaly", 1)
-        atr = df["ATR_14"].iloc[-1] if "ATR_14" in df else np.nan
+        atr = lv.ATR_14
 
         score = 0
         confidence = 0.5
@@ -43,11 +54,11 @@ class MidtermAgent(BaseAgent):
         anomaly = False
 
         # 1. Trend Gücü: EMA/MA cross, slope
-        ema_fast = df["EMA_21"].iloc[-1]
-        ema_slow = df["EMA_55"].iloc[-1]
-        ma_long = df["SMA_200"].iloc[-1]
-        last_close = df["close"].iloc[-1]
-        slope = np.polyfit(range(params["trend_slope_window"]), df["close"].iloc[-params["trend_slope_window"]:], 1)[0]
+        ema_fast = lv.EMA_21
+        ema_slow = lv.EMA_55
+        ma_long = lv.SMA_200
+        last_close = lv.close
+        slope = trend_slope(d.klines["close"], params["trend_slope_window"])
 
         if ema_fast > ema_slow and ema_slow > ma_long and slope > params["min_trend_strength"]:
             score += 1.2
@@ -59,7 +70,7 @@ class MidtermAgent(BaseAgent):
             signals.append("Güçlü aşağı trend (EMA<EMA<MA, slope)")
 
         # 2. RSI Trend Filter
-        last_rsi = df["RSI_14"].iloc[-1]
+        last_rsi = lv.RSI_14
         if last_rsi > params["rsi_trend_high"]:
             score += 0.35
             signals.append("RSI yüksek trend onayı")
@@ -93,7 +104,7 @@ class MidtermAgent(BaseAgent):
             signals.append("Whale hareketi")
 
         # 5. Volatilite & Orderbook
-        volatility = df["Volatility"].iloc[-1]
+        volatility = lv.Volatility
         if volatility > params["max_volatility"] * (atr if not np.isnan(atr) else 1):
             risk += 0.3
             anomaly = True
@@ -124,4 +135,68 @@ class MidtermAgent(BaseAgent):
             type="midterm",
             explanation=explanation,
             anomaly=anomaly,
-        )
\ No newline at end of file
+        )
+
+    def analyze_batch(self, m):
+        """
+        EMA21>EMA55>SMA200 trend ve diğer kurallar, tüm pariteler için vektörel.
+        """
+        params = self.params
+        n = len(m)
+        score = np.zeros(n)
+        confidence = np.full(n, 0.5)
+        risk = np.zeros(n)
+        signals = []
+
+        ema_fast, ema_slow, ma_long = m.col("EMA_21"), m.col("EMA_55"), m.col("SMA_200")
+        slope = m.col(f"slope_{params['trend_slope_window']}")
+        atr = m.col("ATR_14")
+
+        # Trend Gücü: EMA/MA cross, slope
+        up = (ema_fast > ema_slow) & (ema_slow > ma_long) & (slope > params["min_trend_strength"])
+        down = ~up & (ema_fast < ema_slow) & (ema_slow < ma_long) & (slope < -params["min_trend_strength"])
+        score += 1.2 * up - 1.2 * down
+        confidence += 0.2 * up + 0.2 * down
+        signals += [(up, "Güçlü yukarı trend (EMA>EMA>MA, slope)"), (down, "Güçlü aşağı trend (EMA<EMA<MA, slope)")]
+
+        # RSI Trend Filter
+        rsi = m.col("RSI_14")
+        rsi_high = rsi > params["rsi_trend_high"]
+        rsi_low = rsi < params["rsi_trend_low"]
+        score += 0.35 * rsi_high - 0.35 * rsi_low
+        signals += [(rsi_high, "RSI yüksek trend onayı"), (rsi_low, "RSI düşük trend onayı")]
+
+        # Macro Pattern & Formasyon
+        if params["pattern_confirm"]:
+            for name, weight, conf, text in (
+                ("double_bottom", 0.6, 0.08, "Double Bottom formasyonu"),
+                ("double_top", -0.6, 0.08, "Double Top formasyonu"),
+                ("breakout", 0.45, 0, "Major Breakout"),
+                ("breakdown", -0.45, 0, "Major Breakdown"),
+            ):
+                hit = m.col(f"pat_{name}") > 0
+                score += weight * hit
+                confidence += conf * hit
+                signals.append((hit, text))
+
+        # Volume Anomaly & Whale
+        vol_spike = m.col("volume_anomaly") > params["min_volume_spike"]
+        whale = m.col("whale_count") >= params["whale_min_delta"]
+        score += 0.2 * vol_spike + 0.25 * whale
+        signals += [(vol_spike, "Hacim artışı orta vade"), (whale, "Whale hareketi")]
+
+        # Volatilite & Orderbook
+        too_volatile = m.col("Volatility") > params["max_volatility"] * np.where(np.isnan(atr), 1, atr)
+        spoofing = m.col("spoofing") > 0
+        risk += 0.3 * too_volatile + 0.25 * spoofing
+        anomaly = too_volatile | spoofing
+        signals += [(too_volatile, "Aşırı volatilite, risk arttı"), (spoofing, "Orderbook manipülasyonu orta vade")]
+
+        # Tuzak Koruması
+        shield = (risk > 0.4) | anomaly
+        score = np.where(shield, score * 0.25, score)
+        confidence = np.where(shield, confidence * 0.6, confidence)
+        signals.append((shield, "ANOMALY SHIELD: Skor azaltıldı (midterm)!"))
+
+        direction = self._directions(score, 0.8, -0.8)
+        return self._batch_output(m, score, confidence, risk, direction, anomaly, signals, "midterm", "MidtermAgent analiz")
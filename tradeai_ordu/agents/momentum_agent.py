@@ -36,6 +36,8 @@ class MomentumAgent(BaseAgent):
         "fakeout_penalty": 0.19,
     }
 
+    produces = ("momentum_score",)
+
     def multi_timeframe_momentum(self, data_dicts):
         """
         Farklı zaman dilimi (ör: 15m, 1h, 4h) dataframe'leriyle momentum uyumunu ölçer.
@@ -64,6 +66,7 @@ class MomentumAgent(BaseAgent):
         d = self.data
         params = self.params
         df = d.get("klines_df")
+        lv = d.latest  # son/önceki indikatör değerleri (pipeline tek sefer çıkarır)
         df1h = d.get("klines_df_1h")
         df4h = d.get("klines_df_4h")
         patterns = d.get("patterns", {})
@@ -91,12 +94,12 @@ class MomentumAgent(BaseAgent):
             signals.append("Multi-timeframe downward momentum")
 
         # 2. Momentum Teknikleri (RSI, MACD, Stoch, CCI, ROC)
-        last_rsi = df["RSI_14"].iloc[-1]
-        stoch_k = df["STOCH_K"].iloc[-1]
-        cci = df["CCI_20"].iloc[-1]
-        roc = df["ROC"].iloc[-1]
-        macd = df["MACD"].iloc[-1]
-        macd_signal = df["MACD_SIGNAL"].iloc[-1]
+        last_rsi = lv.RSI_14
+        stoch_k = lv.STOCH_K
+        cci = lv.CCI_20
+        roc = lv.ROC
+        macd = lv.MACD
+        macd_signal = lv.MACD_SIGNAL
 
         # RSI
         if last_rsi < params["rsi_buy"]:
@@ -131,11 +134,11 @@ class MomentumAgent(BaseAgent):
             signals.append("ROC momentum -")
 
         # MACD
-        if macd > macd_signal and df["MACD"].iloc[-2] < df["MACD_SIGNAL"].iloc[-2]:
+        if macd > macd_signal and lv.MACD_prev < lv.MACD_SIGNAL_prev:
             score += params["macd_cross_weight"]
             confidence += 0.07
             signals.append("MACD AL cross")
-        if macd < macd_signal and df["MACD"].iloc[-2] > df["MACD_SIGNAL"].iloc[-2]:
+        if macd < macd_signal and lv.MACD_prev > lv.MACD_SIGNAL_prev:
             score -= params["macd_cross_weight"]
             confidence += 0.07
             signals.append("MACD SAT cross")
@@ -149,7 +152,7 @@ class MomentumAgent(BaseAgent):
             signals.append(f"{len(whale_events)}x whale momentum")
 
         # 4. Trend slope/price momentum spike
-        slope = np.polyfit(range(params["slope_window"]), df["close"].iloc[-params["slope_window"]:], 1)[0]
+        slope = np.polyfit(range(params["slope_window"]), d.klines["close"][-params["slope_window"]:], 1)[0]
         if abs(slope) > params["trend_strength_thresh"]:
             score += np.sign(slope) * 0.13
             signals.append(f"Slope trend {slope:.5f}")
@@ -165,8 +168,8 @@ class MomentumAgent(BaseAgent):
             signals += osc_alerts
 
         # 7. Fakeout/fake breakout/fake momentum tespiti & Volatility/Anomaly Shield
-        volatility = df["Volatility"].iloc[-1]
-        atr = df["ATR_14"].iloc[-1] if "ATR_14" in df else 1
+        volatility = lv.Volatility
+        atr = lv.ATR_14
         if volatility > 2.4 * (atr if not np.isnan(atr) else 1):
             risk += 0.12
             anomaly = True
@@ -179,9 +182,9 @@ class MomentumAgent(BaseAgent):
             signals.append("Orderbook anomaly (momentum) / Fakeout penalty")
 
         # 8. Feedback—geçmiş başarıya göre skor boost
-        if hasattr(self, "history") and len(self.history) > 12:
-            last_wins = [r for r in self.history[-12:] if r.get("direction") == r.get("last_trade_result", "none") and r.get("score", 0) > 0.1]
-            if len(last_wins) > 6:
+        if len(self.history) > 12:
+            last_wins = self.history.win_count(12, min_score=0.1)
+            if last_wins > 6:
                 score += params["past_win_boost"]
                 confidence += 0.07
                 signals.append("Geçmiş momentum başarısı: skor arttı")
@@ -205,4 +208,5 @@ class MomentumAgent(BaseAgent):
             type="momentum",
             explanation=explanation,
             anomaly=anomaly,
+            momentum_score=score,
         )
\ No newline at end of file
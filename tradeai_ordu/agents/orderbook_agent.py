@@ -26,17 +26,19 @@ class OrderbookAgent(BaseAgent):
         "fakeout_penalty": 0.17,
     }
 
+    consumes = ("momentum_score",)
+
     def analyze(self):
         d = self.data
         params = self.params
-        df = d.get("klines_df")
+        lv = d.latest  # son/önceki indikatör değerleri (pipeline tek sefer çıkarır)
         ob_ana = d.get("orderbook_anomaly", {})
         whale_events = d.get("whale_events", [])
         volume_anomaly = d.get("volume_anomaly", 1)
         patterns = d.get("patterns", {})
         momentum_score = d.get("momentum_score", 0)
-        price = df["close"].iloc[-1]
-        atr = df["ATR_14"].iloc[-1] if "ATR_14" in df else 1
+        price = lv.close
+        atr = lv.ATR_14
 
         confidence = 0.5
         risk = 0
@@ -91,9 +93,9 @@ class OrderbookAgent(BaseAgent):
             signals.append("ORDERBOOK ANOMALY SHIELD: Skor ve güven kırıldı!")
 
         # 8. Feedback geçmişiyle başarı boost
-        if hasattr(self, "history") and len(self.history) > params["history_boost_window"]:
-            last_wins = [r for r in self.history[-params["history_boost_window"]:] if r.get("direction") == r.get("last_trade_result", "none") and r.get("score", 0) > 0.1]
-            if len(last_wins) > 5:
+        if len(self.history) > params["history_boost_window"]:
+            last_wins = self.history.win_count(params["history_boost_window"], min_score=0.1)
+            if last_wins > 5:
                 score += 0.07
                 confidence += 0.04
                 signals.append("Orderbook geçmiş başarısı boost")
@@ -48,9 +48,9 @@ class PatternAgent(BaseAgent):
         meta_score -= self.data.get("orderbook_anomaly", {}).get("spoofing", False) * 0.15
         meta_score -= self.data.get("orderbook_anomaly", {}).get("spread", 0) * 0.05
         # Ekstra: ATR/volatility cezası
-        df = self.data["klines_df"]
-        volatility = df["Volatility"].iloc[-1]
-        atr = df["ATR_14"].iloc[-1] if "ATR_14" in df else 1
+        lv = self.data.latest
+        volatility = lv.Volatility
+        atr = lv.ATR_14
         if volatility > 2.7 * (atr if not np.isnan(atr) else 1):
             meta_score -= 0.13
         return meta_score, pattern_count
@@ -59,6 +59,7 @@ class PatternAgent(BaseAgent):
         d = self.data
         params = self.params
         df = d.get("klines_df")
+        lv = d.latest  # son/önceki indikatör değerleri (pipeline tek sefer çıkarır)
         patterns = d.get("patterns", {})
         volume_anomaly = d.get("volume_anomaly", 1)
         ob_ana = d.get("orderbook_anomaly", {})
@@ -101,8 +102,8 @@ class PatternAgent(BaseAgent):
             signals.append(f"Pattern-ensemble: {pattern_hits}, Hacim/Whale/Orderbook onayı")
 
         # 4. Volatility/anomaly penalty
-        volatility = df["Volatility"].iloc[-1]
-        atr = df["ATR_14"].iloc[-1] if "ATR_14" in df else 1
+        volatility = lv.Volatility
+        atr = lv.ATR_14
         if volatility > 2.7 * (atr if not np.isnan(atr) else 1):
             score -= params["volatility_penalty"]
             risk += 0.18
@@ -25,10 +25,18 @@ class ScalpAgent(BaseAgent):
         "whale_min_delta": 3,
     }
 
+    supports_batch = True
+    batch_features = (
+        "RSI_14", "MACD", "MACD_SIGNAL", "EMA_9", "EMA_21", "close", "ATR_14",
+        "pat_double_bottom", "pat_double_top", "pat_bullish_engulfing", "pat_bearish_engulfing",
+        "pat_breakout", "pat_breakdown",
+        "volume_anomaly", "spoofing", "spread", "whale_count", "osc_rsi_alert",
+    )
+
     def analyze(self):
         d = self.data
         params = self.params
-        df = d.get("klines_df")
+        lv = d.latest  # son/önceki indikatör değerleri (pipeline tek sefer çıkarır)
         ob_ana = d.get("orderbook_anomaly", {})
         whale_events = d.get("whale_events", [])
         patterns = d.get("patterns", {})
@@ -43,13 +51,13 @@ class ScalpAgent(BaseAgent):
         anomaly = False
 
         # 1. Teknik Momentum ve Trend
-        last_rsi = df["RSI_14"].iloc[-1]
-        last_macd = df["MACD"].iloc[-1]
-        last_macd_signal = df["MACD_SIGNAL"].iloc[-1]
-        ema_fast = df["EMA_9"].iloc[-1]
-        ema_slow = df["EMA_21"].iloc[-1]
-        last_close = df["close"].iloc[-1]
-        atr = df["ATR_14"].iloc[-1] if "ATR_14" in df else np.nan
+        last_rsi = lv.RSI_14
+        last_macd = lv.MACD
+        last_macd_signal = lv.MACD_SIGNAL
+        ema_fast = lv.EMA_9
+        ema_slow = lv.EMA_21
+        last_close = lv.close
+        atr = lv.ATR_14
 
         # 2. Momentum: RSI & MACD & EMA Cross
         if last_rsi < params["rsi_lower"] and last_macd > last_macd_signal and ema_fast > ema_slow:
@@ -138,4 +146,76 @@ class ScalpAgent(BaseAgent):
             type="scalp",
             explanation=explanation,
             anomaly=anomaly,
-        )
\ No newline at end of file
+        )
+
+    def analyze_batch(self, m):
+        """
+        analyze() ile aynı kurallar; tüm pariteler için boolean mask ve skor dizileriyle.
+        """
+        params = self.params
+        n = len(m)
+        score = np.zeros(n)
+        confidence = np.full(n, 0.5)
+        risk = np.zeros(n)
+        signals = []
+
+        rsi, macd, macd_signal = m.col("RSI_14"), m.col("MACD"), m.col("MACD_SIGNAL")
+        ema_fast, ema_slow, last_close, atr = m.col("EMA_9"), m.col("EMA_21"), m.col("close"), m.col("ATR_14")
+
+        # Momentum: RSI & MACD & EMA Cross
+        bull = (rsi < params["rsi_lower"]) & (macd > macd_signal) & (ema_fast > ema_slow)
+        bear = (rsi > params["rsi_upper"]) & (macd < macd_signal) & (ema_fast < ema_slow)
+        score += 1.4 * bull - 1.4 * bear
+        confidence += 0.15 * bull + 0.15 * bear
+        signals += [(bull, "RSI aşırı satım + MACD AL + EMA cross"), (bear, "RSI aşırı alım + MACD SAT + EMA aşağı")]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ema_gap = np.abs(ema_fast - ema_slow) / last_close > 0.003
+        score += np.where(ema_gap, np.sign(ema_fast - ema_slow) * 0.3, 0)
+        signals.append((ema_gap, "EMA güç farkı"))
+
+        # Pattern & Formasyon Onayı
+        if params["confirm_pattern"]:
+            for name, weight, conf, text in (
+                ("double_bottom", 0.5, 0.10, "Double Bottom formasyonu"),
+                ("double_top", -0.5, 0.10, "Double Top formasyonu"),
+                ("bullish_engulfing", 0.3, 0, "Bullish Engulfing"),
+                ("bearish_engulfing", -0.3, 0, "Bearish Engulfing"),
+                ("breakout", 0.4, 0, "Breakout"),
+                ("breakdown", -0.4, 0, "Breakdown"),
+            ):
+                hit = m.col(f"pat_{name}") > 0
+                score += weight * hit
+                confidence += conf * hit
+                signals.append((hit, text))
+
+        # Volume Anomaly ve Spike
+        volume_anomaly = m.col("volume_anomaly")
+        vol_spike = volume_anomaly > params["min_volume_spike"]
+        vol_drop = volume_anomaly < 0.6
+        score += 0.25 * vol_spike - 0.25 * vol_drop
+        confidence += 0.05 * vol_spike
+        signals += [(vol_spike, "Hacim spike +"), (vol_drop, "Hacim düşüşü -")]
+
+        # Orderbook Anomaly & Spoofing
+        anomaly = m.col("spoofing") > 0
+        risk += 0.3 * anomaly
+        spread_anomaly = m.col("spread") > atr * params["atr_mult"]
+        risk += 0.15 * spread_anomaly
+        signals += [(anomaly, "Orderbook spoofing tespit!"), (spread_anomaly, "Spread anomaly")]
+
+        # Whale & Oscillator
+        whale = m.col("whale_count") >= params["whale_min_delta"]
+        score += 0.4 * whale
+        confidence += 0.08 * whale
+        osc = m.col("osc_rsi_alert") > 0
+        risk += 0.07 * osc
+        signals += [(whale, "Whale transfer/funding spike"), (osc, "RSI aşırı seviye alarmı")]
+
+        # Anomaly/Tuzak Koruması
+        shield = (risk > 0.6) | anomaly
+        score = np.where(shield, score * 0.2, score)
+        confidence = np.where(shield, confidence * 0.5, confidence)
+        signals.append((shield, "ANOMALY SHIELD: Skor azaltıldı!"))
+
+        direction = self._directions(score, 0.75, -0.75)
+        return self._batch_output(m, score, confidence, risk, direction, anomaly, signals, "scalp", "ScalpAgent sinyalleri")
@@ -26,6 +26,8 @@ class SentimentAgent(BaseAgent):
         "history_boost_window": 12,
     }
 
+    consumes = ("dump_pump_flag",)
+
     def analyze(self):
         d = self.data
         params = self.params
@@ -78,9 +80,9 @@ class SentimentAgent(BaseAgent):
             signals.append("Fake news/dump-pump anomaly")
 
         # 6. Feedback geçmişiyle başarı boost
-        if hasattr(self, "history") and len(self.history) > params["history_boost_window"]:
-            last_wins = [r for r in self.history[-params["history_boost_window"]:] if r.get("direction") == r.get("last_trade_result", "none") and r.get("score", 0) > 0.1]
-            if len(last_wins) > 4:
+        if len(self.history) > params["history_boost_window"]:
+            last_wins = self.history.win_count(params["history_boost_window"], min_score=0.1)
+            if last_wins > 4:
                 score += 0.07
                 confidence += 0.04
                 signals.append("Sentiment geçmiş başarısı boost")
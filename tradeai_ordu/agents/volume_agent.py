@@ -23,10 +23,11 @@ class VolumeAgent(BaseAgent):
         "dump_pump_penalty": 0.21,
     }
 
+    consumes = ("momentum_score", "dump_pump_flag")
+
     def analyze(self):
         d = self.data
         params = self.params
-        df = d.get("klines_df")
         volume_anomaly = d.get("volume_anomaly", 1)
         spot_futures_ratio = d.get("spot_futures_ratio", 1)
         whale_events = d.get("whale_events", [])
@@ -82,9 +83,9 @@ class VolumeAgent(BaseAgent):
             signals.append("Dump/Pump anomaly: Hacim skor kırıldı")
 
         # 7. Feedback geçmişiyle başarı boost
-        if hasattr(self, "history") and len(self.history) > params["history_boost_window"]:
-            last_wins = [r for r in self.history[-params["history_boost_window"]:] if r.get("direction") == r.get("last_trade_result", "none") and r.get("score", 0) > 0.1]
-            if len(last_wins) > 4:
+        if len(self.history) > params["history_boost_window"]:
+            last_wins = self.history.win_count(params["history_boost_window"], min_score=0.1)
+            if last_wins > 4:
                 score += 0.07
                 confidence += 0.04
                 signals.append("Hacim geçmiş başarısı boost")
@@ -26,10 +26,12 @@ class WhaleAgent(BaseAgent):
         "fakeout_penalty": 0.21,
     }
 
+    consumes = ("momentum_score", "dump_pump_flag")
+
     def analyze(self):
         d = self.data
         params = self.params
-        df = d.get("klines_df")
+        lv = d.latest  # son/önceki indikatör değerleri (pipeline tek sefer çıkarır)
         whale_events = d.get("whale_events", [])
         whale_usdt = sum(w.get("amount", 0) for w in whale_events) if whale_events else 0
         funding_rates = d.get("funding_rates", [])
@@ -39,8 +41,8 @@ class WhaleAgent(BaseAgent):
         momentum_score = d.get("momentum_score", 0)
         dump_pump_flag = d.get("dump_pump_flag", False)
         ob_ana = d.get("orderbook_anomaly", {})
-        price = df["close"].iloc[-1]
-        price_prev = df["close"].iloc[-2]
+        price = lv.close
+        price_prev = lv.close_prev
 
         confidence = 0.5
         risk = 0
@@ -65,7 +67,7 @@ class WhaleAgent(BaseAgent):
                 signals.append("Whale-fiyat ters korelasyon (fakeout riski)")
 
         # 3. Funding rate delta
-        funding_delta = float(funding_rates[-1]["fundingRate"]) - float(funding_rates[-2]["fundingRate"]) if len(funding_rates) > 2 else 0
+        funding_delta = funding_rates[-1] - funding_rates[-2] if len(funding_rates) > 2 else 0
         if funding_delta > params["min_funding_delta"]:
             score += 0.13
             signals.append("Funding rate artışı (long bias)")
@@ -74,7 +76,7 @@ class WhaleAgent(BaseAgent):
             signals.append("Funding rate düşüşü (short bias)")
 
         # 4. OI değişimi
-        oi_change = float(oi_changes[-1]) - float(oi_changes[-2]) if len(oi_changes) > 2 else 0
+        oi_change = oi_changes[-1] - oi_changes[-2] if len(oi_changes) > 2 else 0
         if oi_change > params["min_oi_change"]:
             score += params["whale_oi_bonus"]
             signals.append("Açık pozisyon (OI) artışı")
@@ -122,9 +124,9 @@ class WhaleAgent(BaseAgent):
             signals.append("WHALE ANOMALY SHIELD: Skor ve güven kırıldı!")
 
         # 9. Feedback/Auto-tune (son X işlemin başarı ortalamasına göre bonus)
-        if hasattr(self, "history") and len(self.history) > params["history_boost_window"]:
-            last_wins = [r for r in self.history[-params["history_boost_window"]:] if r.get("direction") == r.get("last_trade_result", "none") and r.get("score", 0) > 0.1]
-            if len(last_wins) > 4:
+        if len(self.history) > params["history_boost_window"]:
+            last_wins = self.history.win_count(params["history_boost_window"], min_score=0.1)
+            if last_wins > 4:
                 score += 0.09
                 confidence += 0.05
                 signals.append("Whale geçmiş başarısı boost")
@@ -13,6 +13,11 @@ class Config:
     # EXCHANGE/BINANCE
     BINANCE_API_KEY    = os.getenv("BINANCE_API_KEY", "")
     BINANCE_API_SECRET = os.getenv("BINANCE_API_SECRET", "")
+    EXCHANGE_INFO_CACHE   = os.getenv("EXCHANGE_INFO_CACHE", "./cache/exchange_info.json")  # exchangeInfo + parite listesi önbelleği
+    EXCHANGE_INFO_TTL_SEC = float(os.getenv("EXCHANGE_INFO_TTL_SEC", "21600"))  # bu süreden eskiyse arka planda yenilenir
+    UNIVERSE_REFRESH_SEC  = float(os.getenv("UNIVERSE_REFRESH_SEC", "0"))  # çalışırken listeleme/delist kontrol aralığı; 0 = kapalı, örn. 900
+    UNIVERSE_REMOVE_AFTER = int(os.getenv("UNIVERSE_REMOVE_AFTER", "3"))  # parite bu kadar ardışık yenilemede yoksa çıkarılır
+    UNIVERSE_MAX_SHRINK   = float(os.getenv("UNIVERSE_MAX_SHRINK", "0.1"))  # tek yenilemede kaybolabilecek en büyük oran; fazlası reddedilir
 
     # TELEGRAM
     TELEGRAM_BOT_TOKEN   = os.getenv("TELEGRAM_BOT_TOKEN", "")
@@ -20,8 +25,27 @@ class Config:
 
     # GLOBAL SYSTEM PARAMS
     MAX_PARALLEL_SYMBOL  = int(os.getenv("MAX_PARALLEL_SYMBOL", "8"))
+    CYCLE_DEADLINE_SEC   = float(os.getenv("CYCLE_DEADLINE_SEC", "0"))  # döngü bütçesi (veri + analiz); 0 = sınırsız
     ANALYSIS_INTERVAL    = int(os.getenv("ANALYSIS_INTERVAL", "60"))  # saniye
+    SCHEDULER_MODE       = os.getenv("SCHEDULER_MODE", "interval")  # "interval" (sabit döngü) | "event" (WS tetiklemeli)
+    SCHEDULER_DEBOUNCE_SEC = float(os.getenv("SCHEDULER_DEBOUNCE_SEC", "2"))  # parite başına en sık analiz aralığı
+    SCHEDULER_SWEEP_SEC  = float(os.getenv("SCHEDULER_SWEEP_SEC", "300"))  # bu süre tetiklenmeyen pariteler yine analiz edilir
+    DEPTH_TRIGGER_PCT    = float(os.getenv("DEPTH_TRIGGER_PCT", "0.002"))  # mid fiyat değişimi (oran)
+    TRADE_BURST_MULT     = float(os.getenv("TRADE_BURST_MULT", "4"))  # trade hızı / ortalama
+    TRADE_BURST_MIN      = int(os.getenv("TRADE_BURST_MIN", "50"))  # burst için minimum trade farkı
     AGENT_TIMEOUT_SEC    = int(os.getenv("AGENT_TIMEOUT_SEC", "25"))
+    AGENT_TIMEOUT_OVERRIDES = os.getenv("AGENT_TIMEOUT_OVERRIDES", "")  # "MomentumAgent=3,WhaleAgent=5"
+    AGENT_EXECUTOR       = os.getenv("AGENT_EXECUTOR", "thread")  # "thread" | "process" | "sharded"
+    AGENT_WORKERS        = int(os.getenv("AGENT_WORKERS", "10"))
+    AGENT_PROCESSES      = int(os.getenv("AGENT_PROCESSES", "0"))  # sharded mod; 0 = CPU sayısı
+    AGENT_HISTORY_SIZE   = int(os.getenv("AGENT_HISTORY_SIZE", "64"))  # ajan başına geçmiş ring kapasitesi
+    AGENT_BATCH_MODE     = bool(int(os.getenv("AGENT_BATCH_MODE", "1")))  # analyze_batch destekleyen ajanlar vektörel
+    AGENT_EVAL_MODE      = os.getenv("AGENT_EVAL_MODE", "parallel")  # "parallel" | "lazy" (ucuz-veto-önce, vetoda kalanlar atlanır)
+    RUN_MODE             = os.getenv("RUN_MODE", "single")  # "single" | "worker" | "coordinator" | "local_cluster"
+    SHARD_COUNT          = int(os.getenv("SHARD_COUNT", "1"))
+    SHARD_INDEX          = int(os.getenv("SHARD_INDEX", "0"))  # worker modunda bu process'in shard numarası
+    SHARD_LISTEN         = os.getenv("SHARD_LISTEN", "unix:/tmp/tradeai_shard_0.sock")  # "unix:/yol" | "tcp:host:port"
+    SHARD_NODES          = os.getenv("SHARD_NODES", "")  # coordinator: virgüllü worker adresleri
     FEEDBACK_AUTOLEARN   = bool(int(os.getenv("FEEDBACK_AUTOLEARN", "1")))
     LOG_LEVEL            = os.getenv("LOG_LEVEL", "INFO")
 
@@ -29,9 +53,49 @@ class Config:
     SCALP_TF             = os.getenv("SCALP_TF", "15m")
     MIDTERM_TF           = os.getenv("MIDTERM_TF", "1h")
     SIGNAL_N_BEST        = int(os.getenv("SIGNAL_N_BEST", "5"))
+    SIGNAL_EARLY_EDGE    = float(os.getenv("SIGNAL_EARLY_EDGE", "0"))  # |edge| bu eşiği geçerse döngü bitmeden raporla; 0 = kapalı
+    SCREEN_ENABLED       = bool(int(os.getenv("SCREEN_ENABLED", "0")))  # 24s ticker ile ön eleme, sadece top-K derin analiz
+    SCREEN_TOP_K         = int(os.getenv("SCREEN_TOP_K", "40"))  # başlangıç derin analiz kümesi
+    SCREEN_MIN_K         = int(os.getenv("SCREEN_MIN_K", "10"))
+    SCREEN_MAX_K         = int(os.getenv("SCREEN_MAX_K", "150"))
+    SCREEN_MIN_QUOTE_VOLUME = float(os.getenv("SCREEN_MIN_QUOTE_VOLUME", "5000000"))  # 24s USDT hacim alt sınırı
+    SCREEN_Z_ALWAYS      = float(os.getenv("SCREEN_Z_ALWAYS", "3"))  # |getiri z-skoru| bunu geçerse K dışında da alınır
 
     # DATA/PIPELINE
     DATA_PARALLEL_LIMIT  = int(os.getenv("DATA_PARALLEL_LIMIT", "8"))
+    WS_STALE_SEC         = float(os.getenv("WS_STALE_SEC", "10"))  # bu süre mesaj gelmeyen akış bayat sayılır (REST'e geçilir)
+    WS_MAX_LATENCY_MS    = float(os.getenv("WS_MAX_LATENCY_MS", "3000"))  # borsa->yerel gecikme EWMA üst sınırı
+    WS_RECV_TIMEOUT_SEC  = float(os.getenv("WS_RECV_TIMEOUT_SEC", "30"))  # sessiz soket bu süre sonra yeniden bağlanır
+    WS_RECONNECT_MAX_SEC = float(os.getenv("WS_RECONNECT_MAX_SEC", "30"))  # üstel yeniden bağlanma beklemesinin tavanı
+    WS_KLINE_BUFFER      = int(os.getenv("WS_KLINE_BUFFER", "200"))  # parite başına tutulan kapanmış mum sayısı (market bus ring'i de bu boyutta)
+    MARKET_BUS_ENABLED   = bool(int(os.getenv("MARKET_BUS_ENABLED", "0")))  # kline/derinlik tamponlarını shared memory'de yayınla
+    MARKET_BUS_PREFIX    = os.getenv("MARKET_BUS_PREFIX", "tradeai_bus")  # segment adı: <prefix>[_<shard>]_<SYMBOL>
+    MARKET_BUS_MANIFEST  = os.getenv("MARKET_BUS_MANIFEST", "./cache/market_bus.json")  # okuyucuların parite listesi (shard'larda market_bus.<shard>.json)
+    KLINE_BACKFILL_DELAY_SEC = float(os.getenv("KLINE_BACKFILL_DELAY_SEC", "1"))  # toplu reconnect'te boşlukların biriktirilme süresi
+
+    # ONLINE ANOMALY MOTORU
+    ANOMALY_ENGINE_ENABLED = bool(int(os.getenv("ANOMALY_ENGINE_ENABLED", "0")))
+    ANOMALY_ALPHA        = float(os.getenv("ANOMALY_ALPHA", "0.05"))  # EWMA ortalama/varyans katsayısı
+    ANOMALY_MEDIAN_ETA   = float(os.getenv("ANOMALY_MEDIAN_ETA", "0.05"))  # medyan/MAD taslağı adım oranı
+    ANOMALY_MIN_OBS      = int(os.getenv("ANOMALY_MIN_OBS", "30"))  # skorlamadan önce gereken gözlem sayısı
+
+    # KORELASYON / BETA MOTORU
+    CORRELATION_ENGINE_ENABLED = bool(int(os.getenv("CORRELATION_ENGINE_ENABLED", "0")))
+    CORRELATION_BENCHMARKS = os.getenv("CORRELATION_BENCHMARKS", "BTCUSDT,ETHUSDT").split(",")  # ilki artık getiri faktörü
+    CORRELATION_WINDOW   = int(os.getenv("CORRELATION_WINDOW", "96"))  # kayan pencere (mum)
+    CORRELATION_MIN_OBS  = int(os.getenv("CORRELATION_MIN_OBS", "20"))  # beta için gereken ortak mum sayısı
+
+    # STORAGE (MongoDB kayıt formatı)
+    # "records": eski format (klines list-of-dict, orderbook string listeleri)
+    # "columnar": kolon bazlı binary blob (data/codec.py); koleksiyonu okuyan dış araçlar decode_klines/
+    # decode_orderbook kullanmalı. Eski kayıtlar okunmaya devam eder, dönüşüm gerekmez (cleanup_old_records ile eskir)
+    STORAGE_ENCODING     = os.getenv("STORAGE_ENCODING", "records")
+    STORAGE_FLOAT_DTYPE  = os.getenv("STORAGE_FLOAT_DTYPE", "f8")      # "f8" (kayıpsız) | "f4" (indikatörler yarı boyut, kayıplı)
+    STORAGE_DELTA        = bool(int(os.getenv("STORAGE_DELTA", "1")))
+
+    # CHECKPOINT (sıcak yeniden başlatma)
+    CHECKPOINT_DIR          = os.getenv("CHECKPOINT_DIR", "./cache/checkpoint")
+    CHECKPOINT_INTERVAL_SEC = float(os.getenv("CHECKPOINT_INTERVAL_SEC", "0"))  # 0 = kapalı, örn. 300
 
     # PATHS
     LOG_DIR              = os.getenv("LOG_DIR", "./logs")
@@ -40,3 +104,23 @@ class Config:
     @classmethod
     def as_dict(cls):
         return {k: getattr(cls, k) for k in dir(cls) if k.isupper()}
+
+    @classmethod
+    def validate(cls):
+        """
+        Birlikte desteklenmeyen ayar kombinasyonlarını açılışta reddeder (sessizce yok sayılmasın).
+        """
+        errors = []
+        if cls.AGENT_EXECUTOR == "sharded":
+            # Sharded modda ajanlar worker process'lerde parite parite, stage sırasıyla koşar;
+            # lazy/veto, batch, ajan bazlı timeout ve ajan geçmişi checkpoint'i uygulanmaz
+            if cls.AGENT_EVAL_MODE == "lazy":
+                errors.append("AGENT_EXECUTOR=sharded ile AGENT_EVAL_MODE=lazy desteklenmiyor")
+            if cls.AGENT_BATCH_MODE:
+                errors.append("AGENT_EXECUTOR=sharded ile AGENT_BATCH_MODE=1 desteklenmiyor (AGENT_BATCH_MODE=0 verin)")
+            if cls.AGENT_TIMEOUT_OVERRIDES:
+                errors.append("AGENT_EXECUTOR=sharded ile AGENT_TIMEOUT_OVERRIDES desteklenmiyor (deadline shard bazlı)")
+            if cls.CHECKPOINT_INTERVAL_SEC:
+                errors.append("AGENT_EXECUTOR=sharded ile checkpoint desteklenmiyor (ajan geçmişleri worker'larda)")
+        if errors:
+            raise ValueError("Geçersiz ayar kombinasyonu: " + "; ".join(errors))
@@ -0,0 +1,156 @@
+# core/agent_executor.py
+
+import asyncio
+import inspect
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from config.config import Config
+
+
+def _analyze_sync(agent):
+    """
+    Sync ajanı çalıştırıp sonucunu döner (thread/process worker tarafında).
+    """
+    agent.analyze()
+    return agent.result()
+
+
+def parse_timeouts(spec):
+    """
+    "MomentumAgent=3,AnomalyDiscoveryAgent=5" formatındaki ajan bazlı timeout ayarını okur.
+    """
+    out = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            name, val = part.split("=", 1)
+            out[name.strip()] = float(val)
+    return out
+
+
+class AgentExecutor:
+    """
+    Ajan çalıştırma backend'i:
+    - analyze async ise event loop'ta, sync ise thread/process pool'da çalışır
+    - Her ajan kendi timeout'u ile iptal edilir, bir yavaş ajan döngüyü kilitlemez
+    - Thread modunda timeout thread'i durdurmaz: önceki çağrısı hâlâ süren instance
+      (kalıcı ajan, geçmişi ve self.data'sı) iş bitene kadar tekrar çağrılmaz (busy)
+    - Ajan bazlı success/timeout/error/busy sayaçları tutulur
+    """
+
+    def __init__(self, mode=None, max_workers=None, timeout=None, agent_timeouts=None):
+        self.mode = mode or Config.AGENT_EXECUTOR
+        self.max_workers = max_workers or Config.AGENT_WORKERS
+        self.timeout = timeout or Config.AGENT_TIMEOUT_SEC
+        self.agent_timeouts = agent_timeouts if agent_timeouts is not None else parse_timeouts(Config.AGENT_TIMEOUT_OVERRIDES)
+        if self.mode == "process":
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            # Batch ajanları vektörel NumPy; matrisi process'e pickle etmek işin kendisinden pahalı
+            self.batch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-batch")
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="agent")
+            self.batch_pool = self.pool
+        self.counters = defaultdict(lambda: {"success": 0, "timeout": 0, "error": 0, "busy": 0, "total_time": 0.0})
+        self._inflight = {}   # timeout'a düşmüş ama thread'i hâlâ süren ajan instance'ı -> future
+
+    def timeout_for(self, name):
+        return self.agent_timeouts.get(name, self.timeout)
+
+    def busy(self, agent):
+        """
+        Ajanın önceki (timeout'a düşmüş) sync çağrısı thread'de hâlâ sürüyor mu.
+        """
+        future = self._inflight.get(agent)
+        return future is not None and not future.done()
+
+    def _track(self, agent, future):
+        if future.done():
+            return
+        self._inflight[agent] = future
+
+        def _release(done):
+            # Worker thread'inde çalışır; sadece kendi kaydını siler
+            if self._inflight.get(agent) is done:
+                self._inflight.pop(agent, None)
+        future.add_done_callback(_release)
+
+    def skip_busy(self, agent):
+        name = agent.__class__.__name__
+        self.counters[name]["busy"] += 1
+        print(f"[AgentExecutor] {name} önceki çağrısı hâlâ sürüyor, bu döngü atlandı")
+
+    async def run(self, agent):
+        """
+        Tek bir ajanı timeout ile çalıştırır; hata/timeout durumunda None döner.
+        """
+        name = agent.__class__.__name__
+        stats = self.counters[name]
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(agent.analyze):
+                await asyncio.wait_for(agent.analyze(), timeout=self.timeout_for(name))
+                result = agent.result()
+            else:
+                result = await self._call(self.pool, agent, _analyze_sync, agent, track=self.mode != "process")
+                if self.mode == "process":
+                    # Analiz worker'daki kopyada yapıldı; geçmişi kalıcı instance'a yaz
+                    agent.remember(result)
+            stats["success"] += 1
+            return result
+        except asyncio.TimeoutError:
+            stats["timeout"] += 1
+            print(f"[AgentExecutor] {name} timeout ({self.timeout_for(name)}s)")
+            return None
+        except Exception as ex:
+            stats["error"] += 1
+            print(f"[AgentExecutor] {name} hatası: {ex}")
+            return None
+        finally:
+            stats["total_time"] += time.perf_counter() - start
+
+    async def _call(self, pool, agent, fn, *args, track=True):
+        future = pool.submit(fn, *args)
+        try:
+            # Timeout'ta sonucu yok sayılır; thread içindeki iş bitene kadar instance busy kalır
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout_for(agent.__class__.__name__))
+        except asyncio.TimeoutError:
+            if track:
+                self._track(agent, future)
+            raise
+
+    async def run_batch(self, agent, matrix):
+        """
+        Batch ajanın analyze_batch'ini thread'de ajan timeout'u ile çalıştırır.
+        Timeout'ta None döner; hata yukarı iletilir (çağıran parite bazlı moda düşer).
+        """
+        name = agent.__class__.__name__
+        stats = self.counters[name]
+        start = time.perf_counter()
+        try:
+            outputs = await self._call(self.batch_pool, agent, agent.analyze_batch, matrix)
+            stats["success"] += 1
+            return outputs
+        except asyncio.TimeoutError:
+            stats["timeout"] += 1
+            print(f"[AgentExecutor] {name} batch timeout ({self.timeout_for(name)}s)")
+            return None
+        except Exception:
+            stats["error"] += 1
+            raise
+        finally:
+            stats["total_time"] += time.perf_counter() - start
+
+    def stats(self):
+        """
+        Ajan bazlı çalıştırma sayaçları (ortalama süre dahil).
+        """
+        out = {}
+        for name, s in self.counters.items():
+            total = s["success"] + s["timeout"] + s["error"]
+            out[name] = {**s, "avg_time": s["total_time"] / total if total else 0.0}
+        return out
+
+    def shutdown(self, wait=False):
+        self.pool.shutdown(wait=wait, cancel_futures=True)
+        if self.batch_pool is not self.pool:
+            self.batch_pool.shutdown(wait=wait, cancel_futures=True)
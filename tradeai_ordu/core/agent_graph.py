@@ -0,0 +1,53 @@
+# core/agent_graph.py
+
+
+def build_dependencies(agent_classes):
+    """
+    Her ajan için bağımlı olduğu (tükettiği sinyali üreten) ajan kümesini döner.
+    """
+    producers = {}
+    for cls in agent_classes:
+        for key in cls.produces:
+            if key in producers:
+                raise ValueError(f"'{key}' sinyali birden fazla ajan tarafından üretiliyor: "
+                                 f"{producers[key].__name__}, {cls.__name__}")
+            producers[key] = cls
+    return {
+        cls: {producers[key] for key in cls.consumes if key in producers and producers[key] is not cls}
+        for cls in agent_classes
+    }
+
+
+def build_stages(agent_classes):
+    """
+    Ajanların produces/consumes bildirimlerinden topolojik aşamalar (stage) üretir.
+    Aynı stage'deki ajanlar birbirinden bağımsızdır ve paralel çalışabilir.
+    Üreticisi olmayan bir sinyal tüketilirse snapshot'taki varsayılan değer kullanılır.
+    """
+    agent_classes = list(agent_classes)
+    deps = build_dependencies(agent_classes)
+
+    stages = []
+    remaining = list(agent_classes)
+    done = set()
+    while remaining:
+        # Orijinal sıra korunur (rapor/açıklama sırası değişmesin)
+        ready = [cls for cls in remaining if deps[cls] <= done]
+        if not ready:
+            names = ", ".join(cls.__name__ for cls in remaining)
+            raise ValueError(f"Ajan bağımlılık grafında döngü var: {names}")
+        stages.append(ready)
+        done.update(ready)
+        remaining = [cls for cls in remaining if cls not in done]
+    return stages
+
+
+def publish_signals(agent_cls, result, snapshot):
+    """
+    Ajanın ürettiği ara sinyalleri snapshot'a yazar (parite/döngü başına bir kez).
+    """
+    if not result:
+        return
+    for key in agent_cls.produces:
+        if key in result:
+            snapshot[key] = result[key]
@@ -1,5 +1,6 @@
 from config.config import Config
 import asyncio
+import time
 
 from agents.scalp_agent import ScalpAgent
 from agents.midterm_agent import MidtermAgent
@@ -13,6 +14,12 @@ from agents.sentiment_agent import SentimentAgent
 from agents.anomaly_discovery_agent import AnomalyDiscoveryAgent
 
 from core.self_learning import get_agent_weights
+from core.agent_executor import AgentExecutor
+from core.sharded_executor import ShardedAgentRunner
+from core.snapshot import SnapshotMatrix
+from core.agent_registry import AgentRegistry
+from core.agent_graph import build_dependencies, build_stages, publish_signals
+from core.veto_scheduler import VetoScheduler, is_veto
 
 class AgentPool:
     """
@@ -20,7 +27,7 @@ class AgentPool:
     her biri için skor, edge, risk, confidence ve açıklama üreten paralel motor.
     """
 
-    def __init__(self, agent_list=None):
+    def __init__(self, agent_list=None, executor=None):
         self.agent_classes = agent_list or [
             ScalpAgent,
             MidtermAgent,
@@ -34,53 +41,256 @@ class AgentPool:
             AnomalyDiscoveryAgent
         ]
         self.agent_weights = get_agent_weights()
+        self.executor = executor or AgentExecutor()
+        # (ajan, parite) başına kalıcı instance; geçmiş döngüler arası korunur
+        self.registry = AgentRegistry()
+        # produces/consumes bildirimlerinden topolojik stage'ler (ara sinyaller bir kez hesaplanır)
+        self.stages = build_stages(self.agent_classes)
+        self.dependencies = build_dependencies(self.agent_classes)
+        self._order = {cls.__name__: i for i, cls in enumerate(self.agent_classes)}
+        # analyze_batch destekleyen (bağımlılığı olmayan) ajanlar için sınıf başına tek kalıcı instance
+        self.batch_agents = {cls: cls(None) for cls in self.agent_classes if cls.supports_batch and not cls.consumes}
+        # Lazy mod: ucuz-veto-önce sıralama, veto gelince paritenin kalan ajanları atlanır
+        self.lazy = Config.AGENT_EVAL_MODE == "lazy"
+        self.veto_scheduler = VetoScheduler()
+        # Çok çekirdekli mod: pariteler worker process'lere shard'lanır (stage sırasıyla)
+        self.sharded = (
+            ShardedAgentRunner([cls for stage in self.stages for cls in stage])
+            if Config.AGENT_EXECUTOR == "sharded" else None
+        )
 
-    async def analyze_symbol(self, symbol_data):
+    async def analyze_symbol(self, symbol_data, agent_classes=None):
         """
-        Bir parite için tüm ajanları paralel olarak çalıştırır, skorları toplar.
+        Bir parite için ajanları bağımlılık stage'leri sırasıyla çalıştırır;
+        aynı stage'deki bağımsız ajanlar paralel koşar, skorları toplar.
         """
-        # Her agent için async çağrı yapıyoruz
-        tasks = [self._run_agent(agent_cls, symbol_data) for agent_cls in self.agent_classes]
+        if self.lazy:
+            return await self._analyze_lazy(symbol_data, agent_classes)
+        stages = self.stages if agent_classes is None else build_stages(agent_classes)
+        filtered_results = []
+        for stage in stages:
+            # asyncio.gather hata fırlatan agentleri durdurmaz, onları None ile yakalarız
+            results = await asyncio.gather(*(self._run_agent(cls, symbol_data) for cls in stage), return_exceptions=True)
+            for agent_cls, res in zip(stage, results):
+                if isinstance(res, Exception):
+                    # Burada loglama yapabiliriz
+                    print(f"[AgentPool] Agent hata fırlattı: {res}")
+                    continue
+                if res is not None:
+                    # Üretilen ara sinyaller sonraki stage'lere snapshot üzerinden aktarılır
+                    publish_signals(agent_cls, res, symbol_data)
+                    filtered_results.append(res)
 
-        # asyncio.gather hata fırlatan agentleri durdurmaz, onları None ile yakalarız
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        filtered_results.sort(key=lambda r: self._order.get(r.get("agent_name"), len(self._order)))
+        return filtered_results
 
+    async def _analyze_lazy(self, symbol_data, agent_classes=None):
+        """
+        Ajanları tek tek, hazır olanlar arasından (maliyet / veto olasılığı) en düşük olanı
+        seçerek çalıştırır. dump_pump/anomaly vetosu gelirse kalan ajanlar atlanır;
+        bu durumda parite zaten işlem açamayacağı için sonuç kararı değişmez.
+        """
+        deps = self.dependencies if agent_classes is None else build_dependencies(agent_classes)
+        remaining = list(deps)
         filtered_results = []
-        for res in results:
-            if isinstance(res, Exception):
-                # Burada loglama yapabiliriz
-                print(f"[AgentPool] Agent hata fırlattı: {res}")
-                continue
+        vetoed = False
+        while remaining and not vetoed:
+            pending = set(remaining)
+            # Üreticisi henüz çalışmamış ajanlar bekler (başarısız üretici de "bitti" sayılır)
+            agent_cls = self.veto_scheduler.pick([cls for cls in remaining if not deps[cls] & pending])
+            remaining.remove(agent_cls)
+            start = time.perf_counter()
+            res = await self._run_agent(agent_cls, symbol_data)
+            vetoed = is_veto(res)
+            self.veto_scheduler.observe(agent_cls.__name__, time.perf_counter() - start, vetoed)
             if res is not None:
+                publish_signals(agent_cls, res, symbol_data)
                 filtered_results.append(res)
+        self.veto_scheduler.finish(vetoed, len(remaining))
 
+        filtered_results.sort(key=lambda r: self._order.get(r.get("agent_name"), len(self._order)))
         return filtered_results
 
     async def _run_agent(self, agent_cls, data):
         try:
             weight = self.agent_weights.get(agent_cls.__name__, 1.0)
-            agent = agent_cls(data)
-            # Eğer agent analyze async değilse await hata verir
-            # Bu durumda agent.analyze() async yap veya buradan sync çağır
-            result = await agent.analyze()
+            previous = self.registry.peek(agent_cls, data.symbol)
+            if previous is not None and self.executor.busy(previous):
+                # Timeout'a düşen çağrı thread'de sürüyor; instance'ın verisi/geçmişi değiştirilmez
+                self.executor.skip_busy(previous)
+                return None
+            agent = self.registry.get(agent_cls, data)
+            # Sync/async ayrımı, pool ve ajan bazlı timeout executor'da
+            result = await self.executor.run(agent)
             if result is None:
                 return None
-            result["weight"] = weight
-            result["agent_name"] = agent_cls.__name__
+            result.weight = weight
+            result.agent_name = agent_cls.__name__
             return result
         except Exception as ex:
             print(f"[AgentPool] {agent_cls.__name__} hatası: {ex}")
             return None
 
-    async def analyze_batch(self, batch_symbol_data):
+    def stats(self):
+        """
+        Ajan bazlı success/timeout/error sayaçları (lazy modda veto/atlama sayaçları dahil).
+        """
+        stats = self.executor.stats()
+        if self.lazy:
+            stats["lazy"] = self.veto_scheduler.stats()
+        return stats
+
+    async def analyze_batch(self, batch_symbol_data, max_parallel=None, deadline=None):
         """
         Çoklu parite datası için batch agent analizi.
+        - En fazla max_parallel parite aynı anda analiz edilir (FIFO, adil sıra)
+        - Sonuçlar tamamlandıkça toplanır; deadline (sn) aşılırsa biten pariteler döner
         """
         all_results = {}
+        async for chunk in self.stream_batch(batch_symbol_data, max_parallel, deadline):
+            all_results.update(chunk)
+        return all_results
+
+    async def stream_batch(self, batch_symbol_data, max_parallel=None, deadline=None):
+        """
+        analyze_batch'in akış hali: biten pariteleri {symbol: results} parçaları (micro-batch)
+        halinde, tamamlandıkları anda yield eder. Karar/raporlama en yavaş pariteyi beklemez.
+        """
         # Tip kontrolü
         if not isinstance(batch_symbol_data, dict):
             raise ValueError("batch_symbol_data dict tipinde olmalı")
+        if not batch_symbol_data:
+            return
 
-        for symbol, data in batch_symbol_data.items():
-            all_results[symbol] = await self.analyze_symbol(data)
-        return all_results
+        deadline = Config.CYCLE_DEADLINE_SEC if deadline is None else deadline
+        if self.sharded is not None:
+            yield await self._analyze_sharded(batch_symbol_data, deadline)
+            return
+
+        # analyze_batch destekleyen (bağımlılığı olmayan) ajanlar tüm pariteler için tek seferde çalışır
+        batch_results, batched = await self._run_batch_agents(batch_symbol_data) if Config.AGENT_BATCH_MODE else ({}, set())
+        scalar_classes = [cls for cls in self.agent_classes if cls not in batched]
+
+        limit = asyncio.Semaphore(max_parallel or Config.MAX_PARALLEL_SYMBOL)
+
+        async def _bounded(symbol, data):
+            async with limit:
+                batched_res = batch_results.get(symbol, [])
+                if self.lazy and scalar_classes and any(is_veto(r) for r in batched_res):
+                    # Batch ajanlarından biri zaten veto etti; parite bazlı ajanlara gerek yok
+                    self.veto_scheduler.finish(True, len(scalar_classes))
+                    results = []
+                else:
+                    results = await self.analyze_symbol(data, scalar_classes) if scalar_classes else []
+                results += batched_res
+                results.sort(key=lambda r: self._order.get(r.get("agent_name"), len(self._order)))
+                return symbol, results
+
+        # Görevler sembol sırasıyla açılır; semaphore bekleyenleri geliş sırasıyla uyandırır
+        pending = {asyncio.create_task(_bounded(s, d)) for s, d in batch_symbol_data.items()}
+        end_at = time.monotonic() + deadline if deadline else None
+        try:
+            while pending:
+                timeout = max(0.0, end_at - time.monotonic()) if end_at else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                chunk = {}
+                for task in done:
+                    if task.exception() is not None:
+                        print(f"[AgentPool] Parite analizi hatası: {task.exception()}")
+                        continue
+                    symbol, results = task.result()
+                    chunk[symbol] = results
+                if chunk:
+                    yield chunk
+        finally:
+            if pending:
+                print(f"[AgentPool] Döngü deadline'ı aşıldı: {len(pending)} parite kısmi sonuç dışında kaldı.")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run_batch_agents(self, batch_symbol_data):
+        """
+        Batch destekli ajanları (parite × feature) matrisi üzerinde bir kez, ajan timeout'uyla çalıştırır.
+        Hata veren ajan parite bazlı moda geri düşer; timeout'ta (veya önceki çağrısı sürerken)
+        o ajanın bu döngüde sonucu olmaz. Parite sonuçları registry'deki geçmiş ring'lerine yazılır.
+        """
+        agents = list(self.batch_agents.values())
+        if not agents:
+            return {}, set()
+        features = [f for agent in agents for f in agent.required_batch_features()]
+        try:
+            matrix = SnapshotMatrix.from_snapshots(list(batch_symbol_data.values()), features)
+        except Exception as ex:
+            print(f"[AgentPool] Batch matrisi kurulamadı: {ex}")
+            return {}, set()
+
+        per_symbol = {symbol: [] for symbol in matrix.symbols}
+        batched = set()
+        for agent in agents:
+            cls = agent.__class__
+            if self.executor.busy(agent):
+                self.executor.skip_busy(agent)
+                batched.add(cls)
+                continue
+            try:
+                outputs = await self.executor.run_batch(agent, matrix)
+            except Exception as ex:
+                print(f"[AgentPool] {cls.__name__} batch hatası, parite bazlı moda geçiliyor: {ex}")
+                continue
+            batched.add(cls)
+            if outputs is None:
+                continue
+            weight = self.agent_weights.get(cls.__name__, 1.0)
+            for symbol, res in zip(matrix.symbols, outputs):
+                snapshot = batch_symbol_data[symbol]
+                res.weight = weight
+                res.features = snapshot.get("time_features")
+                publish_signals(cls, res, snapshot)
+                self.registry.remember(cls, snapshot, res)
+                per_symbol[symbol].append(res)
+        return per_symbol, batched
+
+    async def _analyze_sharded(self, batch_symbol_data, deadline):
+        merged = await self.sharded.analyze_batch(batch_symbol_data, deadline=deadline)
+        for results in merged.values():
+            for res in results:
+                res.weight = self.agent_weights.get(res.agent_name, 1.0)
+        return merged
+
+    def record_trade(self, symbol, direction, agent_names=None):
+        """
+        Verilen sinyalin yönünü ajan geçmişlerine işler (sharded modda geçmişler worker'larda, işlenmez).
+        """
+        self.registry.record_trade(symbol, direction, agent_names)
+
+    def evict(self, symbols):
+        """
+        Listeden çıkan paritelerin ajan instance'larını ve geçmişlerini serbest bırakır.
+        """
+        for symbol in symbols:
+            self.registry.evict(symbol)
+        if self.sharded is not None:
+            self.sharded.evict(symbols)
+
+    def checkpoint_state(self):
+        """
+        Ajan geçmişleri ve veto zamanlayıcısının maliyet/veto EWMA'ları.
+        (Sharded modda geçmişler worker process'lerde tutulur ve checkpoint'e girmez.)
+        """
+        arrays, meta = self.registry.checkpoint_state()
+        meta["veto_cost"] = dict(self.veto_scheduler.cost)
+        meta["veto_rate"] = dict(self.veto_scheduler.veto_rate)
+        return arrays, meta
+
+    def restore_state(self, arrays, meta, symbols=None):
+        self.registry.restore_state(arrays, meta, symbols)
+        self.veto_scheduler.cost.update(meta.get("veto_cost", {}))
+        self.veto_scheduler.veto_rate.update(meta.get("veto_rate", {}))
+
+    def shutdown(self):
+        self.executor.shutdown()
+        if self.sharded is not None:
+            self.sharded.shutdown()
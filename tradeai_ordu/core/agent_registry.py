@@ -0,0 +1,86 @@
+# core/agent_registry.py
+
+from core.ring_buffer import pack_rings, unpack_ring
+
+class AgentRegistry:
+    """
+    (ajan, parite) başına tek, uzun ömürlü ajan instance'ı tutar.
+    Her döngüde yeni obje yaratmak yerine update(snapshot) ile güncellenir;
+    böylece ajan geçmişi (history ring) döngüler arasında korunur.
+    """
+
+    def __init__(self):
+        self._agents = {}
+        self._restored = {}   # checkpoint'ten gelen, ajanı henüz yaratılmamış geçmişler
+
+    def get(self, agent_cls, snapshot):
+        key = (agent_cls.__name__, snapshot.symbol)
+        agent = self._agents.get(key)
+        if agent is None:
+            agent = self._agents[key] = agent_cls(snapshot)
+            history = self._restored.pop(key, None)
+            if history is not None:
+                agent.history = history
+        else:
+            agent.update(snapshot)
+        return agent
+
+    def remember(self, agent_cls, snapshot, result):
+        """
+        Batch modda üretilen parite sonucunu (ajan, parite) geçmiş ring'ine yazar;
+        geçmiş parite bazlı moda geçişte ve checkpoint'te aynı instance'tan okunur.
+        """
+        self.get(agent_cls, snapshot).remember(result)
+
+    def peek(self, agent_cls, symbol):
+        """
+        Mevcut instance'ı güncellemeden döner (yoksa None).
+        """
+        return self._agents.get((agent_cls.__name__, symbol))
+
+    def record_trade(self, symbol, direction, agent_names=None):
+        """
+        Paritede verilen sinyalin yönünü, kararı üreten ajanların son geçmiş kaydına işler
+        (agent_names verilmezse paritenin tüm ajanları).
+        """
+        for (name, sym), agent in self._agents.items():
+            if sym == symbol and (agent_names is None or name in agent_names):
+                agent.history.set_trade_result(direction)
+
+    def agents_for(self, symbol):
+        return {name: agent for (name, sym), agent in self._agents.items() if sym == symbol}
+
+    def evict(self, symbol):
+        """
+        Listeden çıkan paritenin ajanlarını serbest bırakır.
+        """
+        for key in [k for k in self._agents if k[1] == symbol]:
+            del self._agents[key]
+        for key in [k for k in self._restored if k[1] == symbol]:
+            del self._restored[key]
+
+    def checkpoint_state(self):
+        """
+        Ajan geçmiş ring'leri: ({alan: (K, kapasite) dizisi}, {"keys": [[ajan, parite], ...]}).
+        """
+        histories = {key: agent.history for key, agent in self._agents.items()}
+        histories.update((k, h) for k, h in self._restored.items() if k not in histories)
+        if not histories:
+            return {}, {"keys": []}
+        keys = list(histories)
+        return pack_rings([histories[k] for k in keys]), {"keys": [list(k) for k in keys]}
+
+    def restore_state(self, arrays, meta, symbols=None):
+        listed = None if symbols is None else set(symbols)
+        for i, (name, symbol) in enumerate(meta.get("keys", [])):
+            if listed is not None and symbol not in listed:
+                continue
+            history = unpack_ring(arrays, i)
+            agent = self._agents.get((name, symbol))
+            if agent is not None:
+                agent.history = history
+            else:
+                self._restored[(name, symbol)] = history
+
+    def __len__(self):
+        return len(self._agents)
@@ -0,0 +1,217 @@
+# core/agent_result.py
+
+import numpy as np
+from core.ring_buffer import DIRECTION_CODES
+
+
+class AgentResult:
+    """
+    Ajan çıktısı için sabit alanlı, slotted sonuç tipi.
+    - Eski dict çıktılarla uyumlu: get / [] / in / to_dict
+    - explanation callable verilirse ilk erişimde üretilir (rapor/log edilmeyen sonuçta hiç formatlanmaz)
+    - Standart dışı alanlar (momentum_score, dump_pump_flag ...) `extra` içinde tutulur
+    """
+    __slots__ = (
+        "agent_name", "score", "confidence", "risk", "direction", "type",
+        "anomaly", "dump_pump", "spoofing", "features", "weight", "params",
+        "extra", "_explanation",
+    )
+    FIELDS = (
+        "agent_name", "score", "confidence", "risk", "direction", "type", "explanation",
+        "anomaly", "dump_pump", "spoofing", "features", "weight", "params",
+    )
+    _FIELD_SET = frozenset(FIELDS)
+
+    def __init__(self, agent_name="", score=0.0, confidence=0.5, risk=0.0, direction="none",
+                 type="unknown", explanation="", anomaly=False, dump_pump=False, spoofing=False,
+                 features=None, weight=1.0, params=None, **extra):
+        self.agent_name = agent_name
+        self.score = score
+        self.confidence = confidence
+        self.risk = risk
+        self.direction = direction
+        self.type = type
+        self._explanation = explanation
+        self.anomaly = anomaly
+        self.dump_pump = dump_pump
+        self.spoofing = spoofing
+        self.features = features
+        self.weight = weight
+        self.params = params
+        self.extra = extra or None
+
+    @property
+    def explanation(self):
+        if callable(self._explanation):
+            self._explanation = self._explanation()
+        return self._explanation
+
+    @explanation.setter
+    def explanation(self, value):
+        self._explanation = value
+
+    @classmethod
+    def from_dict(cls, data):
+        return data if isinstance(data, cls) else cls(**data)
+
+    # --- dict uyumlu erişim ---
+    def get(self, key, default=None):
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+        elif self.extra is None:
+            self.extra = {key: value}
+        else:
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in self._FIELD_SET or bool(self.extra and key in self.extra)
+
+    def to_dict(self):
+        out = {key: getattr(self, key) for key in self.FIELDS}
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    # Process/shard sınırında lazy açıklama çözülür (lambda pickle edilemez)
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return f"AgentResult({self.agent_name}, score={self.score:.2f}, direction={self.direction})"
+
+
+class AgentResultBatch:
+    """
+    Bir paritenin ajan sonuçlarının kolon bazlı görünümü.
+    Karar aşaması skor/ağırlık/bayrakları NumPy dizileri üzerinden tek geçişte toplar.
+    """
+    __slots__ = ("results", "score", "confidence", "risk", "weight", "direction",
+                 "anomaly", "dump_pump", "spoofing", "types")
+
+    def __init__(self, results):
+        self.results = [AgentResult.from_dict(r) for r in results]
+        rs = self.results
+        self.score = np.fromiter((r.score for r in rs), dtype=np.float64, count=len(rs))
+        self.confidence = np.fromiter((r.confidence for r in rs), dtype=np.float64, count=len(rs))
+        self.risk = np.fromiter((r.risk for r in rs), dtype=np.float64, count=len(rs))
+        self.weight = np.fromiter((r.weight for r in rs), dtype=np.float64, count=len(rs))
+        self.direction = np.fromiter((DIRECTION_CODES.get(r.direction, 0) for r in rs), dtype=np.int8, count=len(rs))
+        self.anomaly = np.fromiter((bool(r.anomaly) for r in rs), dtype=bool, count=len(rs))
+        self.dump_pump = np.fromiter((bool(r.dump_pump) for r in rs), dtype=bool, count=len(rs))
+        self.spoofing = np.fromiter((bool(r.spoofing) for r in rs), dtype=bool, count=len(rs))
+        self.types = [r.type for r in rs]
+
+    @classmethod
+    def of(cls, results):
+        return results if isinstance(results, cls) else cls(results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def select(self, mask):
+        return [r for r, keep in zip(self.results, mask) if keep]
+
+    def feature(self, name):
+        """
+        features[name] değerleri (eksikse NaN) float dizisi olarak.
+        """
+        return np.array([(r.features or {}).get(name, np.nan) for r in self.results], dtype=np.float64)
+
+    def flag(self, key):
+        return np.array([bool(r.get(key, False)) for r in self.results], dtype=bool)
+
+    @property
+    def veto(self):
+        """
+        dump_pump veya anomaly bayrağı olan ajan var mı (işlem açılmaz).
+        """
+        return bool((self.dump_pump | self.anomaly).any())
+
+
+# Strateji tipi kodları (karar matrisi için)
+TYPE_CODES = {"scalp": 1, "midterm": 2}
+_NO_FEATURES = {}
+
+
+class AgentResultMatrix:
+    """
+    Çoklu paritenin ajan sonuçları için (parite × ajan) matrisleri.
+    Parite başına ajan sayısı farklı olabilir (timeout/lazy veto); boş hücreler valid=False,
+    skor/ağırlık 0, feature NaN ile doldurulur. Karar motoru tüm pariteleri tek geçişte toplar.
+    """
+    __slots__ = ("symbols", "results", "valid", "score", "confidence", "risk", "weight", "direction",
+                 "anomaly", "dump_pump", "spoofing", "pattern", "type_code", "atr", "volatility")
+
+    def __init__(self, results_by_symbol):
+        self.symbols = list(results_by_symbol)
+        self.results = [[AgentResult.from_dict(r) for r in results_by_symbol[s]] for s in self.symbols]
+        counts = [len(rs) for rs in self.results]
+        flat = [r for rs in self.results for r in rs]
+        shape = (len(self.symbols), max(counts, default=0))
+        rows = np.repeat(np.arange(shape[0]), counts)
+        cols = np.concatenate([np.arange(c) for c in counts]) if flat else np.empty(0, dtype=np.int64)
+
+        def fill(values, dtype, pad):
+            out = np.full(shape, pad, dtype=dtype)
+            out[rows, cols] = values
+            return out
+
+        # Tek geçişte satır bazlı toplanır, sonra kolonlara dağıtılır
+        nums = np.array(
+            [(r.score, r.confidence, r.risk, r.weight,
+              (r.features or _NO_FEATURES).get("atr", np.nan),
+              (r.features or _NO_FEATURES).get("volatility", np.nan)) for r in flat],
+            dtype=np.float64,
+        ).reshape(-1, 6)
+        codes = np.array(
+            [(DIRECTION_CODES.get(r.direction, 0), TYPE_CODES.get(r.type, 0),
+              bool(r.anomaly), bool(r.dump_pump), bool(r.spoofing),
+              bool(r.extra and r.extra.get("pattern"))) for r in flat],
+            dtype=np.int8,
+        ).reshape(-1, 6)
+
+        self.valid = fill(True, bool, False)
+        self.score = fill(nums[:, 0], np.float64, 0.0)
+        self.confidence = fill(nums[:, 1], np.float64, 0.0)
+        self.risk = fill(nums[:, 2], np.float64, 0.0)
+        self.weight = fill(nums[:, 3], np.float64, 0.0)
+        self.atr = fill(nums[:, 4], np.float64, np.nan)
+        self.volatility = fill(nums[:, 5], np.float64, np.nan)
+        self.direction = fill(codes[:, 0], np.int8, 0)
+        self.type_code = fill(codes[:, 1], np.int8, 0)
+        self.anomaly = fill(codes[:, 2], bool, False)
+        self.dump_pump = fill(codes[:, 3], bool, False)
+        self.spoofing = fill(codes[:, 4], bool, False)
+        self.pattern = fill(codes[:, 5], bool, False)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @property
+    def counts(self):
+        return self.valid.sum(axis=1)
+
+    @property
+    def veto(self):
+        """
+        Parite bazlı: dump_pump veya anomaly bayrağı olan ajan var mı.
+        """
+        return (self.dump_pump | self.anomaly).any(axis=1)
@@ -0,0 +1,232 @@
+# core/anomaly_engine.py
+
+import math
+import numpy as np
+from config.config import Config
+
+# Motorun izlediği feature vektörü (snapshot.anomaly_zscores bu sırayla dolar)
+FEATURES = ("ret", "volume_ratio", "spread", "funding_delta", "oi_change", "book_imbalance")
+MAD_SCALE = 1.4826   # normal dağılımda MAD -> std
+Z_CLIP = 10.0
+# Feature'ın kaynağı: 0 kapanmış mum, 1 funding, 2 OI, -1 her döngüde yeni (orderbook)
+SOURCES = ("kline", "funding", "oi")
+FEATURE_SOURCE = np.array([0, 0, -1, 1, 2, -1])
+_STATE = ("n", "mean", "m2", "ewm_mean", "ewm_var", "median", "mad", "last_close", "last_stamp")
+_NAN_STATE = ("last_close", "last_stamp")
+
+
+def extract_features(snap):
+    """
+    Snapshot'tan tek gözlemlik feature vektörü; hesaplanamayan alanlar NaN'dır.
+    "ret" motorun tuttuğu son kapanışa göre hesaplanır (burada kapanış döner).
+    """
+    nan = math.nan
+    close = snap.latest.close if snap.latest is not None else nan
+    volume_ratio = math.log(snap.volume_anomaly) if snap.volume_anomaly and snap.volume_anomaly > 0 else nan
+    bids, asks = snap.orderbook_bids, snap.orderbook_asks
+    spread = imbalance = nan
+    if len(bids) and len(asks):
+        mid = (bids[0, 0] + asks[0, 0]) / 2
+        spread = (asks[0, 0] - bids[0, 0]) / mid if mid > 0 else nan
+        bid_qty, ask_qty = bids[:5, 1].sum(), asks[:5, 1].sum()
+        imbalance = (bid_qty - ask_qty) / (bid_qty + ask_qty) if bid_qty + ask_qty > 0 else nan
+    funding = snap.funding_rates
+    funding_delta = funding[-1] - funding[-2] if len(funding) > 1 else nan
+    oi = snap.oi_changes
+    oi_change = oi[-1] / oi[-2] - 1 if len(oi) > 1 and oi[-2] > 0 else nan
+    return close, (nan, volume_ratio, spread, funding_delta, oi_change, imbalance)
+
+
+def source_stamps(snap):
+    """
+    Kaynakların son gözlem zamanları (ms): son kapanmış mumun open_time'ı, funding ve OI zamanı.
+    Bilinmeyen damga NaN'dır; o kaynağın feature'ları her döngüde yeni sayılır.
+    """
+    nan = math.nan
+    open_time = snap.klines.get("open_time") if snap.klines else None
+    kline = float(open_time[-1]) if open_time is not None and len(open_time) else nan
+    return (kline, float(snap.funding_time) if snap.funding_time else nan,
+            float(snap.oi_time) if snap.oi_time else nan)
+
+
+class AnomalyEngine:
+    """
+    Parite başına çok değişkenli, artımlı (streaming) anomaly motoru.
+    - Her feature için: Welford ortalama/varyans (uzun dönem), EWMA ortalama/varyans (rejim)
+      ve stokastik yaklaşımla medyan/MAD taslağı (aykırı değerlere dayanıklı merkez/ölçek)
+    - Yeni gözlem önce mevcut duruma göre skorlanır, sonra durum güncellenir (O(d))
+    - Feature sadece kaynağında yeni gözlem varsa işlenir (mum/funding/OI damgası değişmişse);
+      60 sn'lik döngüde değişmeyen kapanış/funding/OI tekrarları dağılımı sıfıra çökertmez
+    - Skor: robust z = (x - medyan) / ölçek (ölçek: 1.4826·MAD, yoksa EWMA std, yoksa Welford std);
+      mesafe = sqrt(ortalama z²) — köşegen Mahalanobis, feature başına O(1)
+    - Durum (slot, feature) dizilerinde tutulur; batch modda tüm pariteler tek vektörel adımda işlenir
+    """
+
+    def __init__(self, alpha=None, eta=None, min_obs=None, capacity=64):
+        self.alpha = Config.ANOMALY_ALPHA if alpha is None else alpha
+        self.eta = Config.ANOMALY_MEDIAN_ETA if eta is None else eta
+        self.min_obs = Config.ANOMALY_MIN_OBS if min_obs is None else min_obs
+        self.slots = {}
+        self._free = []
+        d = len(FEATURES)
+        self.n = np.zeros((capacity, d), dtype=np.int64)
+        self.mean = np.zeros((capacity, d))
+        self.m2 = np.zeros((capacity, d))
+        self.ewm_mean = np.zeros((capacity, d))
+        self.ewm_var = np.zeros((capacity, d))
+        self.median = np.zeros((capacity, d))
+        self.mad = np.zeros((capacity, d))
+        self.last_close = np.full(capacity, np.nan)
+        self.last_stamp = np.full((capacity, len(SOURCES)), np.nan)
+
+    # --- slot yönetimi ---
+
+    def _grow(self, capacity):
+        for name in _STATE:
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], np.nan) if name in _NAN_STATE else np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _slot(self, symbol):
+        idx = self.slots.get(symbol)
+        if idx is None:
+            if self._free:
+                idx = self._free.pop()
+            else:
+                idx = len(self.slots)
+                if idx >= len(self.n):
+                    self._grow(2 * len(self.n))
+            self.slots[symbol] = idx
+        return idx
+
+    def evict(self, symbol):
+        idx = self.slots.pop(symbol, None)
+        if idx is None:
+            return
+        for name in _STATE:
+            getattr(self, name)[idx] = np.nan if name in _NAN_STATE else 0
+        self._free.append(idx)
+
+    # --- skor + güncelleme ---
+
+    def _scale(self, rows):
+        welford_var = np.where(self.n[rows] > 1, self.m2[rows] / np.maximum(self.n[rows] - 1, 1), 0.0)
+        scale = MAD_SCALE * self.mad[rows]
+        scale = np.where(scale > 1e-12, scale, np.sqrt(self.ewm_var[rows]))
+        scale = np.where(scale > 1e-12, scale, np.sqrt(welford_var))
+        return scale
+
+    def _fresh(self, rows, stamps):
+        """
+        (k, d) maske: feature'ın kaynağı son işlenen gözlemden beri yenilendi mi.
+        """
+        k = len(rows)
+        if stamps is None:
+            return np.ones((k, len(FEATURES)), dtype=bool)
+        stamps = np.asarray(stamps, dtype=np.float64).reshape(k, len(SOURCES))
+        last = self.last_stamp[rows]
+        new = ~np.isfinite(stamps) | ~np.isfinite(last) | (stamps != last)
+        self.last_stamp[rows] = np.where(np.isfinite(stamps), stamps, last)
+        fresh = np.ones((k, len(FEATURES)), dtype=bool)
+        sourced = FEATURE_SOURCE >= 0
+        fresh[:, sourced] = new[:, FEATURE_SOURCE[sourced]]
+        return fresh
+
+    def update(self, symbols, closes, x, stamps=None):
+        """
+        symbols: k parite, closes: (k,), x: (k, d) ham feature'lar ("ret" kolonu burada doldurulur),
+        stamps: (k, len(SOURCES)) kaynak damgaları (source_stamps); None ise hepsi yeni sayılır.
+        (mesafe (k,), robust z (k, d)) döner; ısınmamış ya da kaynağı yenilenmemiş feature'ların z'si 0'dır.
+        """
+        rows = np.array([self._slot(s) for s in symbols], dtype=np.int64)
+        closes = np.asarray(closes, dtype=np.float64)
+        x = np.array(x, dtype=np.float64).reshape(len(rows), len(FEATURES))
+        fresh = self._fresh(rows, stamps)
+        # Getiri mumdan muma: kapanış sadece yeni mumda ilerler
+        new_candle = fresh[:, 0]
+        prev = self.last_close[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x[:, 0] = np.where((prev > 0) & (closes > 0), np.log(closes / prev), np.nan)
+        self.last_close[rows] = np.where(new_candle & np.isfinite(closes), closes, prev)
+        valid = np.isfinite(x) & fresh
+
+        # 1. Skor (mevcut duruma göre)
+        scale = self._scale(rows)
+        warm = valid & (self.n[rows] >= self.min_obs) & (scale > 1e-12)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(warm, (x - self.median[rows]) / scale, 0.0)
+        z = np.clip(z, -Z_CLIP, Z_CLIP)
+        used = warm.sum(axis=1)
+        distance = np.where(used > 0, np.sqrt((z * z).sum(axis=1) / np.maximum(used, 1)), 0.0)
+
+        # 2. Güncelleme (sadece geçerli feature'lar)
+        xv = np.where(valid, x, 0.0)
+        n_old = self.n[rows]
+        n_new = n_old + valid
+        first = valid & (n_old == 0)
+        # Welford
+        mean = self.mean[rows]
+        delta = xv - mean
+        mean_new = np.where(valid, mean + delta / np.maximum(n_new, 1), mean)
+        self.m2[rows] = np.where(valid, self.m2[rows] + delta * (xv - mean_new), self.m2[rows])
+        self.mean[rows] = mean_new
+        # EWMA
+        a = self.alpha
+        ewm_mean, ewm_var = self.ewm_mean[rows], self.ewm_var[rows]
+        ed = xv - ewm_mean
+        self.ewm_mean[rows] = np.where(first, xv, np.where(valid, ewm_mean + a * ed, ewm_mean))
+        self.ewm_var[rows] = np.where(first, 0.0, np.where(valid, (1 - a) * (ewm_var + a * ed * ed), ewm_var))
+        # Medyan / MAD taslağı: adım feature'ın kendi ölçeğiyle orantılı
+        median, mad = self.median[rows], self.mad[rows]
+        step = self.eta * np.maximum(np.maximum(np.sqrt(self.ewm_var[rows]), mad * MAD_SCALE), np.abs(median) * 1e-3 + 1e-12)
+        median_new = np.where(first, xv, np.where(valid, median + step * np.sign(xv - median), median))
+        dev = np.abs(xv - median_new)
+        self.median[rows] = median_new
+        self.mad[rows] = np.where(first, 0.0, np.where(valid, np.maximum(mad + step * np.sign(dev - mad), 0.0), mad))
+        self.n[rows] = n_new
+        return distance, z
+
+    def score_batch(self, snapshots):
+        """
+        Tüm pariteleri tek vektörel adımda skorlar ve snapshot'lara yazar
+        (anomaly_score, anomaly_zscores); ajanlar bu alanları okur.
+        """
+        snapshots = list(snapshots)
+        if not snapshots:
+            return {}
+        extracted = [extract_features(s) for s in snapshots]
+        distance, z = self.update([s.symbol for s in snapshots],
+                                  [c for c, _ in extracted], [f for _, f in extracted],
+                                  [source_stamps(s) for s in snapshots])
+        for i, snap in enumerate(snapshots):
+            snap.anomaly_score = float(distance[i])
+            snap.anomaly_zscores = z[i]
+        return dict(zip((s.symbol for s in snapshots), distance.tolist()))
+
+    def observe(self, snapshot):
+        """
+        Tek parite (event-driven) için aynı adım.
+        """
+        return self.score_batch([snapshot])[snapshot.symbol]
+
+    # --- checkpoint ---
+
+    def checkpoint_state(self):
+        symbols = list(self.slots)
+        rows = np.array([self.slots[s] for s in symbols], dtype=np.int64)
+        return {name: getattr(self, name)[rows] for name in _STATE}, {"symbols": symbols, "features": list(FEATURES)}
+
+    def restore_state(self, arrays, meta, symbols=None):
+        if meta.get("features") != list(FEATURES) or any(name not in arrays for name in _STATE):
+            return
+        listed = None if symbols is None else set(symbols)
+        for i, symbol in enumerate(meta["symbols"]):
+            if listed is not None and symbol not in listed:
+                continue
+            idx = self._slot(symbol)
+            for name in _STATE:
+                # Uzun kesintide son kapanıştan hesaplanan ilk getiri sahte anomaly üretir
+                if name == "last_close" and meta.get("downtime", 0.0) > 2 * Config.ANALYSIS_INTERVAL:
+                    continue
+                getattr(self, name)[idx] = arrays[name][i]
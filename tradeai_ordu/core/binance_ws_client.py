@@ -1,12 +1,42 @@
 import asyncio
 import json
-import websockets
+import time
 import pandas as pd
+from config.config import Config
+from core.feed_health import StreamHealth
+
+MAX_KLINES = Config.WS_KLINE_BUFFER
+INTERVAL_UNITS_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def interval_to_ms(interval):
+    return int(interval[:-1]) * INTERVAL_UNITS_MS[interval[-1]]
+
+
+def candle_from_row(row):
+    """
+    REST kline satırını (DataFrame satırı / dict) WS mum formatına çevirir.
+    """
+    return {
+        "open_time": int(row["open_time"]),
+        "open": float(row["open"]),
+        "high": float(row["high"]),
+        "low": float(row["low"]),
+        "close": float(row["close"]),
+        "volume": float(row["volume"]),
+        "close_time": int(row["close_time"]),
+        "quote_asset_volume": float(row["quote_asset_volume"]),
+        "number_of_trades": int(row["num_trades"]),
+        "taker_buy_base_asset_volume": float(row["taker_buy_base_asset_volume"]),
+        "taker_buy_quote_asset_volume": float(row["taker_buy_quote_asset_volume"]),
+    }
+
 
 class BinanceWebSocketClient:
-    def __init__(self, symbol, interval="15m"):
+    def __init__(self, symbol, interval="15m", on_event=None):
         self.symbol = symbol.lower()
         self.interval = interval
+        self.interval_ms = interval_to_ms(interval)
         self.ws_kline_url = f"wss://fstream.binance.com/ws/{self.symbol}@kline_{self.interval}"
         self.ws_depth_url = f"wss://fstream.binance.com/ws/{self.symbol}@depth5"
         self.latest_klines = []
@@ -14,6 +44,58 @@ class BinanceWebSocketClient:
         self._kline_task = None
         self._depth_task = None
         self._running = False
+        # Event-driven scheduler tetikleyicisi: on_event(symbol, reason)
+        self.on_event = on_event
+        self._last_mid = None
+        self._last_trades = None       # (zaman, mum içi kümülatif trade sayısı)
+        self._trade_rate = None        # trade/sn EWMA
+        # Akış başına son mesaj yaşı / gecikme / yeniden bağlanma sayaçları (FeedHealthMonitor okur)
+        self.health = {"kline": StreamHealth(), "depth": StreamHealth()}
+        # Kapanmış mum tamponundaki boşluklar: [(ilk eksik open_time, son eksik open_time)]
+        self.pending_gaps = []
+        self._gap_mark = None          # kaydedilmiş son eksik open_time (aynı boşluk tekrar eklenmez)
+        self.known_holes = set()       # borsada da mum olmayan aralıklar (bakım vb.); tekrar istenmez
+        # Boşluk bulununca pipeline'ın toplu backfill'ini tetikler: on_gap(symbol)
+        self.on_gap = None
+        # Diğer yerel process'ler için shared-memory yayını (SymbolBusWriter, opsiyonel)
+        self.bus = None
+
+    def _emit(self, reason):
+        if self.on_event is not None:
+            self.on_event(self.symbol.upper(), reason)
+
+    def _check_trade_burst(self, k):
+        """
+        Kapanmamış mum güncellemelerindeki trade sayısı farkından anlık trade hızını ölçer;
+        hız EWMA'nın TRADE_BURST_MULT katını geçerse burst sayılır.
+        """
+        now = time.monotonic()
+        trades = k.get("n", 0)
+        prev, self._last_trades = self._last_trades, (now, trades)
+        if prev is None or trades < prev[1] or now <= prev[0]:
+            return False  # yeni mum başladı veya ilk mesaj
+        rate = (trades - prev[1]) / (now - prev[0])
+        if self._trade_rate is None:
+            self._trade_rate = rate
+            return False
+        burst = rate > Config.TRADE_BURST_MULT * self._trade_rate and trades - prev[1] >= Config.TRADE_BURST_MIN
+        self._trade_rate += 0.05 * (rate - self._trade_rate)
+        return burst
+
+    def _check_depth_change(self, bids, asks):
+        """
+        Son tetiklemeden beri mid fiyat DEPTH_TRIGGER_PCT'den fazla oynadıysa True.
+        """
+        if not bids or not asks:
+            return False
+        mid = (float(bids[0][0]) + float(asks[0][0])) / 2
+        if self._last_mid is None:
+            self._last_mid = mid
+            return False
+        if abs(mid - self._last_mid) / self._last_mid >= Config.DEPTH_TRIGGER_PCT:
+            self._last_mid = mid
+            return True
+        return False
 
     async def connect(self):
         if self._running:
@@ -37,49 +119,155 @@ class BinanceWebSocketClient:
             except asyncio.CancelledError:
                 pass
 
-    async def _listen_kline(self):
+    async def _listen(self, stream, url, on_message):
+        """
+        Akışı dinler; WS_RECV_TIMEOUT_SEC boyunca mesaj gelmezse (açık ama sessiz soket)
+        bağlantıyı yeniler. Yeniden bağlanma bekleme süresi üstel artar.
+        """
+        import websockets  # ilk bağlantıda yüklenir
+        health = self.health[stream]
+        failures = 0
         while self._running:
             try:
-                async with websockets.connect(self.ws_kline_url) as ws:
-                    async for message in ws:
+                async with websockets.connect(url) as ws:
+                    health.on_connect()
+                    while True:
+                        try:
+                            message = await asyncio.wait_for(ws.recv(), timeout=Config.WS_RECV_TIMEOUT_SEC)
+                        except asyncio.TimeoutError:
+                            health.timeouts += 1
+                            raise ConnectionError(f"{Config.WS_RECV_TIMEOUT_SEC:.0f}s boyunca mesaj yok")
                         data = json.loads(message)
-                        k = data.get("k", {})
-                        if k.get("x"):  # kline closed
-                            candle = {
-                                "open_time": k["t"],
-                                "open": float(k["o"]),
-                                "high": float(k["h"]),
-                                "low": float(k["l"]),
-                                "close": float(k["c"]),
-                                "volume": float(k["v"]),
-                                "close_time": k["T"],
-                                "quote_asset_volume": float(k["q"]),
-                                "number_of_trades": k["n"],
-                                "taker_buy_base_asset_volume": float(k["V"]),
-                                "taker_buy_quote_asset_volume": float(k["Q"]),
-                            }
-                            self.latest_klines.append(candle)
-                            if len(self.latest_klines) > 200:
-                                self.latest_klines.pop(0)
+                        health.record(data.get("E"))
+                        failures = 0
+                        on_message(data)
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"[WebSocket][{self.symbol}] Kline connection error: {e}")
-                await asyncio.sleep(5)
+                print(f"[WebSocket][{self.symbol}] {stream} connection error: {e}")
+            finally:
+                health.connected = False
+            health.reconnects += 1
+            failures += 1
+            await asyncio.sleep(min(Config.WS_RECONNECT_MAX_SEC, 2 ** (failures - 1)))
+
+    def _check_gap(self, open_time):
+        """
+        Gelen mumun (kapanmış ya da süren) open_time'ı, tampondaki son kapanmış mumdan
+        bir aralıktan fazla ilerideyse aradaki kapanmış mumlar kaçırılmıştır
+        (tipik olarak soket kopukken kapananlar).
+        """
+        if not self.latest_klines:
+            return
+        start = self.latest_klines[-1]["open_time"] + self.interval_ms
+        if self._gap_mark is not None:
+            start = max(start, self._gap_mark + self.interval_ms)
+        end = open_time - self.interval_ms
+        if end < start:
+            return
+        self.pending_gaps.append((start, end))
+        self._gap_mark = end
+        if self.on_gap is not None:
+            self.on_gap(self.symbol.upper())
+
+    def check_gap_until(self, now_ms):
+        """
+        WS akışı yokken (açılış/failover) şu ana kadar kapanmış ama tamponda olmayan mumları
+        bekleyen boşluk olarak kaydeder.
+        """
+        self._check_gap(now_ms - now_ms % self.interval_ms)
+
+    def scan_gaps(self):
+        """
+        Tampondaki tüm open_time süreksizliklerini bekleyen boşluk listesi olarak yeniden kurar;
+        son kapanmış mumdan sonraki (henüz tampona girmemiş) boşluklar korunur.
+        """
+        times = [c["open_time"] for c in self.latest_klines]
+        holes = [(a + self.interval_ms, b - self.interval_ms)
+                 for a, b in zip(times, times[1:]) if b - a > self.interval_ms]
+        trailing = [g for g in self.pending_gaps if times and g[0] > times[-1]]
+        self.pending_gaps = [g for g in holes if g not in self.known_holes] + trailing
+        return self.pending_gaps
+
+    def merge_klines(self, candles):
+        """
+        REST'ten gelen kapanmış mumları open_time'a göre tampona yerleştirir
+        (aynı open_time'da WS mumu yenisiyle değişir); tampon MAX_KLINES ile sınırlı kalır.
+        """
+        by_time = {c["open_time"]: c for c in self.latest_klines}
+        for c in candles:
+            by_time[c["open_time"]] = c
+        self.latest_klines = [by_time[t] for t in sorted(by_time)][-MAX_KLINES:]
+        if self.bus is not None:
+            self.bus.publish_klines(self.latest_klines)
+        return self.scan_gaps()
+
+    def _cover_gap(self, open_time):
+        """
+        Tampona eklenen mumun open_time'ını bekleyen boşluklardan çıkarır (boşluk ikiye bölünebilir).
+        """
+        gaps = []
+        for start, end in self.pending_gaps:
+            if start <= open_time <= end:
+                if start < open_time:
+                    gaps.append((start, open_time - self.interval_ms))
+                if open_time < end:
+                    gaps.append((open_time + self.interval_ms, end))
+            else:
+                gaps.append((start, end))
+        self.pending_gaps = gaps
+
+    def take_gaps(self):
+        gaps, self.pending_gaps = self.pending_gaps, []
+        return gaps
+
+    def _on_kline(self, data):
+        k = data.get("k", {})
+        if k.get("t") is not None:
+            self._check_gap(k["t"])
+        if k.get("x"):  # kline closed
+            candle = {
+                "open_time": k["t"],
+                "open": float(k["o"]),
+                "high": float(k["h"]),
+                "low": float(k["l"]),
+                "close": float(k["c"]),
+                "volume": float(k["v"]),
+                "close_time": k["T"],
+                "quote_asset_volume": float(k["q"]),
+                "number_of_trades": k["n"],
+                "taker_buy_base_asset_volume": float(k["V"]),
+                "taker_buy_quote_asset_volume": float(k["Q"]),
+            }
+            if self.latest_klines and candle["open_time"] <= self.latest_klines[-1]["open_time"]:
+                self.merge_klines([candle])  # tekrar gönderilen / sırası bozuk mum
+            else:
+                self.latest_klines.append(candle)
+                if len(self.latest_klines) > MAX_KLINES:
+                    self.latest_klines.pop(0)
+                if self.bus is not None:
+                    self.bus.append_kline(candle)
+                # Yeni mumun ilk mesajı öncekinin kapanışından önce gelmiş olabilir; eklenen mumun
+                # kapattığı (sahte) boşluk REST doldurmasını beklemeden düşülür
+                if self.pending_gaps:
+                    self._cover_gap(candle["open_time"])
+            self._emit("kline_close")
+        elif k and self._check_trade_burst(k):
+            self._emit("trade_burst")
+
+    def _on_depth(self, data):
+        self.latest_orderbook["bids"] = data.get("b", [])
+        self.latest_orderbook["asks"] = data.get("a", [])
+        if self.bus is not None:
+            self.bus.publish_depth(self.latest_orderbook["bids"], self.latest_orderbook["asks"])
+        if self._check_depth_change(self.latest_orderbook["bids"], self.latest_orderbook["asks"]):
+            self._emit("depth")
+
+    async def _listen_kline(self):
+        await self._listen("kline", self.ws_kline_url, self._on_kline)
 
     async def _listen_depth(self):
-        while self._running:
-            try:
-                async with websockets.connect(self.ws_depth_url) as ws:
-                    async for message in ws:
-                        data = json.loads(message)
-                        self.latest_orderbook["bids"] = data.get("b", [])
-                        self.latest_orderbook["asks"] = data.get("a", [])
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"[WebSocket][{self.symbol}] Depth connection error: {e}")
-                await asyncio.sleep(5)
+        await self._listen("depth", self.ws_depth_url, self._on_depth)
 
     def get_latest_klines_df(self):
         if not self.latest_klines:
@@ -0,0 +1,121 @@
+# core/checkpoint.py
+
+import asyncio
+import glob
+import json
+import os
+import time
+import numpy as np
+from config.config import Config
+
+MANIFEST = "checkpoint.json"
+
+
+class Checkpointer:
+    """
+    Çalışma zamanı durumunun çökmeye dayanıklı, periyodik checkpoint'i.
+    - Bileşenler checkpoint_state() -> (dizi sözlüğü, JSON meta) ve restore_state(arrays, meta, symbols) sağlar
+      (DataPipeline: mum tamponları, AgentPool: ajan geçmişleri, Orchestrator: karar/öncelik durumu)
+    - Diziler nesil numaralı .npy dosyalarına yazılır; manifest tmp + os.replace ile en son ve
+      atomik olarak değişir. Yarım kalan yazım önceki nesli bozmaz, eski nesiller sonra silinir.
+    - Yüklemede diziler memory-map (mmap_mode="r") ile açılır, sadece geçerli pariteler kopyalanır
+    - Kayıtlar bir kilitle sıralanır: periyodik kayıt sürerken gelen kapanış kaydı onun bitmesini bekler
+    """
+
+    def __init__(self, components, directory=None, interval=None):
+        self.components = components          # {ad: bileşen}
+        self.directory = directory or Config.CHECKPOINT_DIR
+        self.interval = Config.CHECKPOINT_INTERVAL_SEC if interval is None else interval
+        self.generation = 0
+        self.last_saved = None
+        self.last_duration = None
+        self._lock = asyncio.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def collect(self):
+        """
+        Bileşen durumlarını event loop içinde (tutarlı) kopyalar.
+        """
+        return {name: comp.checkpoint_state() for name, comp in self.components.items()}
+
+    def write(self, states, generation):
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = {"generation": generation, "saved_at": time.time(), "components": {}}
+        for name, (arrays, meta) in states.items():
+            for key, arr in arrays.items():
+                with open(self._path(f"{name}.{key}.{generation}.npy"), "wb") as f:
+                    np.save(f, np.ascontiguousarray(arr))
+                    f.flush()
+                    os.fsync(f.fileno())
+            manifest["components"][name] = {"arrays": list(arrays), "meta": meta}
+        tmp = self._path(f"{MANIFEST}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path(MANIFEST))
+        # Manifest yeni nesli gösterdikten sonra eski nesiller güvenle silinir
+        for path in glob.glob(self._path("*.npy")):
+            if not path.endswith(f".{generation}.npy"):
+                os.remove(path)
+
+    async def save(self):
+        async with self._lock:
+            started = time.monotonic()
+            states = self.collect()
+            self.generation = max(self.generation, self._manifest_generation()) + 1
+            writing = asyncio.ensure_future(asyncio.to_thread(self.write, states, self.generation))
+            try:
+                await asyncio.shield(writing)
+            except asyncio.CancelledError:
+                # İptal edilen görev yazan thread'i durduramaz; kilit yazım bitene kadar tutulur
+                await writing
+                raise
+            self.last_saved = time.time()
+            self.last_duration = time.monotonic() - started
+            return self.generation
+
+    def _manifest_generation(self):
+        try:
+            with open(self._path(MANIFEST), "r", encoding="utf-8") as f:
+                return json.load(f).get("generation", 0)
+        except (OSError, ValueError):
+            return 0
+
+    def load(self, symbols=None):
+        """
+        Son geçerli checkpoint'i bileşenlere yükler; {"age": sn, "components": [...]} ya da None döner.
+        """
+        try:
+            with open(self._path(MANIFEST), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        gen = manifest["generation"]
+        self.generation = gen
+        downtime = max(0.0, time.time() - manifest["saved_at"])
+        loaded = []
+        for name, entry in manifest["components"].items():
+            comp = self.components.get(name)
+            if comp is None:
+                continue
+            try:
+                arrays = {key: np.load(self._path(f"{name}.{key}.{gen}.npy"), mmap_mode="r") for key in entry["arrays"]}
+                comp.restore_state(arrays, {**entry["meta"], "downtime": downtime}, symbols)
+                loaded.append(name)
+            except Exception as ex:
+                print(f"[Checkpointer] {name} yüklenemedi: {ex}")
+        return {"age": downtime, "generation": gen, "components": loaded}
+
+    async def run_forever(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save()
+            except Exception as ex:
+                print(f"[Checkpointer] Checkpoint hatası: {ex}")
+
+    def stats(self):
+        return {"generation": self.generation, "last_saved": self.last_saved, "last_duration": self.last_duration}
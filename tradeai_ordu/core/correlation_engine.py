@@ -0,0 +1,376 @@
+# core/correlation_engine.py
+
+import time
+import numpy as np
+from config.config import Config
+from core.binance_ws_client import interval_to_ms
+
+_MATRICES = ("S", "Q", "P", "M")
+
+
+class CorrelationEngine:
+    """
+    Pariteler arası kayan pencereli getiri kovaryansı/korelasyonu ve benchmark (BTC/ETH) betası.
+    - Her kapanmış mum bir satırdır: log getiri vektörü r ve geçerlilik maskesi m (o mumu olmayan parite 0)
+    - Pencereye giren satır rank-1 güncelleme, çıkan satır rank-1 downdate ile eklenir/çıkarılır:
+        S += r rᵀ, Q += r² mᵀ, P += r mᵀ, M += m mᵀ
+      Bu toplamlardan her parite çifti için ikisinin de verisi olan mumlar üzerinden (pairwise-complete)
+      kovaryans ve varyans O(1)'de çıkar; tam matris yalnızca istendiğinde (correlation()) hesaplanır
+    - Döngü başına sadece benchmark kolonları okunur (O(N)); beta, korelasyon ve benchmark'tan
+      arındırılmış (idiosyncratic) getiri snapshot'lara yazılır
+    - Kayan noktalı birikmiş hata için her pencere dolumunda toplamlar ring'den yeniden hesaplanır
+    - Bazı döngülerde analiz edilmeyen (ön elemeyle girip çıkan) parite tekrar geldiğinde, pencerede
+      eksik kalan satırları kendi mum geçmişinden doldurulur; sadece o kolonlar yeniden hesaplanır
+    """
+
+    def __init__(self, benchmarks=None, window=None, min_obs=None, interval="15m", capacity=64):
+        self.benchmarks = list(benchmarks or Config.CORRELATION_BENCHMARKS)
+        self.window = Config.CORRELATION_WINDOW if window is None else window
+        self.min_obs = Config.CORRELATION_MIN_OBS if min_obs is None else min_obs
+        self.interval_ms = interval_to_ms(interval)
+        self.slots = {}
+        self._free = []
+        self._used = 0                 # kullanılmış en yüksek slot + 1 (matris işlemleri bu dilimde)
+        self.last_time = None          # son işlenen mumun open_time'ı (ms)
+        self.head = 0
+        self.filled = 0
+        self.pushes = 0
+        self.times = np.zeros(self.window, dtype=np.int64)
+        self._alloc(capacity)
+
+    # --- slot yönetimi ---
+
+    def _alloc(self, capacity):
+        nb = len(self.benchmarks)
+        self.ring_r = np.zeros((self.window, capacity))
+        self.ring_m = np.zeros((self.window, capacity))
+        for name in _MATRICES:
+            setattr(self, name, np.zeros((capacity, capacity)))
+        self.beta = np.full((capacity, nb), np.nan)
+        self.corr = np.full((capacity, nb), np.nan)
+        self.residual = np.full(capacity, np.nan)
+        self.residual_z = np.full(capacity, np.nan)
+
+    def _grow(self, capacity):
+        old = {name: getattr(self, name) for name in ("ring_r", "ring_m", "beta", "corr", "residual", "residual_z") + _MATRICES}
+        self._alloc(capacity)
+        k = self._used
+        self.ring_r[:, :k] = old["ring_r"][:, :k]
+        self.ring_m[:, :k] = old["ring_m"][:, :k]
+        for name in _MATRICES:
+            getattr(self, name)[:k, :k] = old[name][:k, :k]
+        for name in ("beta", "corr", "residual", "residual_z"):
+            getattr(self, name)[:k] = old[name][:k]
+
+    def _slot(self, symbol):
+        idx = self.slots.get(symbol)
+        if idx is None:
+            if self._free:
+                idx = self._free.pop()
+            else:
+                idx = self._used
+                if idx >= self.ring_r.shape[1]:
+                    self._grow(2 * self.ring_r.shape[1])
+                self._used += 1
+            self.slots[symbol] = idx
+        return idx
+
+    def evict(self, symbol):
+        idx = self.slots.pop(symbol, None)
+        if idx is None:
+            return
+        self.ring_r[:, idx] = 0.0
+        self.ring_m[:, idx] = 0.0
+        for name in _MATRICES:
+            mat = getattr(self, name)
+            mat[idx, :] = 0.0
+            mat[:, idx] = 0.0
+        for name in ("beta", "corr", "residual", "residual_z"):
+            getattr(self, name)[idx] = np.nan
+        self._free.append(idx)
+
+    # --- rank-1 güncelleme ---
+
+    def _rank1(self, r, m, sign):
+        k = self._used
+        r, m = r[:k], m[:k]
+        self.S[:k, :k] += sign * np.outer(r, r)
+        self.Q[:k, :k] += sign * np.outer(r * r, m)
+        self.P[:k, :k] += sign * np.outer(r, m)
+        self.M[:k, :k] += sign * np.outer(m, m)
+
+    def _resync(self):
+        """
+        Toplamları ring'deki satırlardan baştan hesaplar (toplu tohumlama ve birikmiş hata düzeltmesi).
+        """
+        k = self._used
+        rows, mask = self.ring_r[self._window(), :k], self.ring_m[self._window(), :k]
+        self.S[:k, :k] = rows.T @ rows
+        self.Q[:k, :k] = (rows * rows).T @ mask
+        self.P[:k, :k] = rows.T @ mask
+        self.M[:k, :k] = mask.T @ mask
+
+    def _window(self):
+        if self.filled == self.window:
+            return slice(None)
+        return slice(0, self.filled)
+
+    def _refresh_columns(self, cols):
+        """
+        Ring'de değişen kolonların toplam satır/kolonlarını yeniden hesaplar (O(W·N) / kolon).
+        """
+        k = self._used
+        rows, mask = self.ring_r[self._window(), :k], self.ring_m[self._window(), :k]
+        rc, mc = rows[:, cols], mask[:, cols]
+        self.S[cols, :k] = rc.T @ rows
+        self.S[:k, cols] = self.S[cols, :k].T
+        self.Q[cols, :k] = (rc * rc).T @ mask
+        self.Q[:k, cols] = (rows * rows).T @ mc
+        self.P[cols, :k] = rc.T @ mask
+        self.P[:k, cols] = rows.T @ mc
+        self.M[cols, :k] = mc.T @ mask
+        self.M[:k, cols] = self.M[cols, :k].T
+
+    def _backfill(self, series):
+        """
+        Penceredeki satırlarda maskesi 0 olan paritelerin o mumlarını kendi geçmişlerinden doldurur.
+        Doldurulan kolon sayısını döner.
+        """
+        if not self.filled:
+            return 0
+        window = self._window()
+        times = self.times[window]
+        changed = []
+        for symbol, (open_time, close) in series.items():
+            col = self.slots[symbol]
+            missing = self.ring_m[window, col] == 0
+            if not missing.any():
+                continue
+            r, valid = self._returns(open_time, close, times)
+            fill = missing & valid
+            if not fill.any():
+                continue
+            self.ring_r[window, col] = np.where(fill, r, self.ring_r[window, col])
+            self.ring_m[window, col] = np.where(fill, 1.0, self.ring_m[window, col])
+            changed.append(col)
+        if changed:
+            self._refresh_columns(np.array(changed, dtype=np.int64))
+        return len(changed)
+
+    def _write_row(self, open_time, r, m):
+        h = self.head
+        self.ring_r[h] = r
+        self.ring_m[h] = m
+        self.times[h] = open_time
+        self.head = (h + 1) % self.window
+        self.filled = min(self.filled + 1, self.window)
+        self.pushes += 1
+        self.last_time = int(open_time)
+
+    def _push(self, open_time, r, m):
+        if self.filled == self.window:
+            h = self.head
+            self._rank1(self.ring_r[h], self.ring_m[h], -1.0)
+        self._rank1(r, m, 1.0)
+        self._write_row(open_time, r, m)
+        if self.pushes % self.window == 0:
+            self._resync()
+
+    # --- istatistikler ---
+
+    def _pair_stats(self, j):
+        """
+        Tüm pariteler i ile j kolonu arası: (ortak mum sayısı, cov, var_i, var_j) — i ve j'nin
+        ikisinin de geçerli olduğu mumlar üzerinden.
+        """
+        k = self._used
+        n = self.M[:k, j]
+        inv = 1.0 / np.maximum(n, 1.0)
+        dof = np.maximum(n - 1.0, 1.0)
+        sum_i, sum_j = self.P[:k, j], self.P[j, :k]
+        cov = (self.S[:k, j] - sum_i * sum_j * inv) / dof
+        var_i = (self.Q[:k, j] - sum_i * sum_i * inv) / dof
+        var_j = (self.Q[j, :k] - sum_j * sum_j * inv) / dof
+        return n, cov, var_i, var_j
+
+    def _score(self, r, m):
+        """
+        Benchmark beta/korelasyonunu günceller ve r satırının artık getirisini
+        (mevcut pencereye göre, satır eklenmeden önce) hesaplar.
+        """
+        k = self._used
+        for b, name in enumerate(self.benchmarks):
+            j = self.slots.get(name)
+            if j is None:
+                self.beta[:k, b] = np.nan
+                self.corr[:k, b] = np.nan
+                if b == 0:
+                    self.residual[:k] = np.nan
+                    self.residual_z[:k] = np.nan
+                continue
+            n, cov, var_i, var_j = self._pair_stats(j)
+            ready = (n >= self.min_obs) & (var_i > 1e-18) & (var_j > 1e-18)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                beta = np.where(ready, cov / var_j, np.nan)
+                corr = np.where(ready, np.clip(cov / np.sqrt(var_i * var_j), -1.0, 1.0), np.nan)
+            self.beta[:k, b] = beta
+            self.corr[:k, b] = corr
+            if b == 0:
+                ok = ready & (m[:k] > 0) & (m[j] > 0)
+                residual = r[:k] - beta * r[j]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    std = np.sqrt(np.maximum(var_i * (1.0 - corr * corr), 0.0))
+                    self.residual[:k] = np.where(ok, residual, np.nan)
+                    self.residual_z[:k] = np.where(ok & (std > 1e-12), residual / std, np.nan)
+
+    def correlation(self, symbols=None):
+        """
+        İstenen paritelerin (varsayılan: tümü) tam korelasyon matrisi; (semboller, matris) döner.
+        Ortak mum sayısı MIN_OBS altındaki çiftler NaN'dır.
+        """
+        symbols = [s for s in (symbols or self.slots) if s in self.slots]
+        idx = np.array([self.slots[s] for s in symbols], dtype=np.int64)
+        n = self.M[np.ix_(idx, idx)]
+        inv = 1.0 / np.maximum(n, 1.0)
+        dof = np.maximum(n - 1.0, 1.0)
+        P = self.P[np.ix_(idx, idx)]
+        cov = (self.S[np.ix_(idx, idx)] - P * P.T * inv) / dof
+        var = (self.Q[np.ix_(idx, idx)] - P * P * inv) / dof   # var[i, j]: i'nin j ile ortak mumlardaki varyansı
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.sqrt(var * var.T)
+        ready = (n >= self.min_obs) & (var > 1e-18) & (var.T > 1e-18)
+        return symbols, np.where(ready, np.clip(corr, -1.0, 1.0), np.nan)
+
+    # --- mum girişi ---
+
+    def _series(self, klines, now_ms):
+        open_time = np.asarray(klines["open_time"], dtype=np.int64)
+        close = np.asarray(klines["close"], dtype=np.float64)
+        close_time = klines.get("close_time")
+        close_time = open_time + self.interval_ms - 1 if close_time is None else np.asarray(close_time, dtype=np.int64)
+        closed = close_time < now_ms
+        return open_time[closed], close[closed]
+
+    def _returns(self, open_time, close, times):
+        """
+        times mumlarının log getirisi ve geçerliliği (mum ve bir öncekinin ikisi de varsa geçerli).
+        """
+        idx = np.searchsorted(open_time, times)
+        safe = np.minimum(idx, len(open_time) - 1)
+        prev = np.maximum(safe - 1, 0)
+        valid = (idx < len(open_time)) & (idx > 0) & (open_time[safe] == times) \
+            & (open_time[prev] == times - self.interval_ms) & (close[safe] > 0) & (close[prev] > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(valid, np.log(close[safe] / close[prev]), 0.0), valid
+
+    def klines_needed(self, now_ms=None):
+        """
+        Benchmark'ı snapshot'larda olmayan çağıranın (örn. shard) kaç mum çekmesi gerektiği.
+        """
+        if self.last_time is None:
+            return self.window + 2
+        now_ms = time.time() * 1000 if now_ms is None else now_ms
+        return int(min(self.window, max(0, now_ms - self.last_time) // self.interval_ms) + 3)
+
+    def observe(self, snapshots, extra=None, now_ms=None):
+        """
+        Snapshot'lardaki (ve extra={sembol: kline kolonları} ile verilen benchmark'ların) son
+        işlenenden sonra kapanmış mumlarını sırayla ekler. İlk çağrıda pencere mum geçmişinden
+        tek seferde tohumlanır; pencerede eksik satırı olan pariteler önce geçmişlerinden doldurulur.
+        Eklenen satır sayısını döner.
+        """
+        now_ms = time.time() * 1000 if now_ms is None else now_ms
+        sources = {s.symbol: s.klines for s in snapshots if s.klines}
+        if extra:
+            sources.update(extra)
+        series = {}
+        latest = None
+        for symbol, klines in sources.items():
+            open_time, close = self._series(klines, now_ms)
+            if len(open_time) < 2:
+                continue
+            series[symbol] = (open_time, close)
+            latest = open_time[-1] if latest is None else max(latest, open_time[-1])
+        if latest is None or (self.last_time is not None and latest <= self.last_time):
+            return 0
+        start = latest - (self.window - 1) * self.interval_ms
+        if self.last_time is not None:
+            start = max(start, self.last_time + self.interval_ms)
+        times = np.arange(start, latest + 1, self.interval_ms, dtype=np.int64)
+
+        for symbol in series:
+            self._slot(symbol)
+        self._backfill(series)
+        cap = self.ring_r.shape[1]
+        R = np.zeros((len(times), cap))
+        Mk = np.zeros((len(times), cap))
+        for symbol, (open_time, close) in series.items():
+            col = self.slots[symbol]
+            R[:, col], Mk[:, col] = self._returns(open_time, close, times)
+
+        if len(times) > 8:
+            # Toplu giriş (açılış / uzun kesinti): satırlar ring'e yazılıp toplamlar bir kez hesaplanır
+            for t in range(len(times) - 1):
+                self._write_row(times[t], R[t], Mk[t])
+            self._resync()
+        else:
+            for t in range(len(times) - 1):
+                self._push(times[t], R[t], Mk[t])
+        # Son mum mevcut pencereye göre skorlanır, sonra pencereye eklenir
+        self._score(R[-1], Mk[-1])
+        self._push(times[-1], R[-1], Mk[-1])
+        return len(times)
+
+    def apply(self, snapshots):
+        """
+        Beta/korelasyon ve artık getiriyi snapshot'lara yazar (NaN: motor bu parite için ısınmadı).
+        """
+        for snap in snapshots:
+            idx = self.slots.get(snap.symbol)
+            if idx is None:
+                continue
+            snap.market_beta = float(self.beta[idx, 0])
+            snap.market_corr = float(self.corr[idx, 0])
+            snap.benchmark_betas = dict(zip(self.benchmarks, self.beta[idx].tolist()))
+            snap.residual_return = float(self.residual[idx])
+            snap.residual_z = float(self.residual_z[idx])
+
+    def stats(self):
+        return {"symbols": len(self.slots), "window": self.filled, "pushes": self.pushes, "last_time": self.last_time}
+
+    # --- checkpoint ---
+
+    def checkpoint_state(self):
+        symbols = list(self.slots)
+        cols = np.array([self.slots[s] for s in symbols], dtype=np.int64)
+        # Ring eskiden yeniye sıralanarak saklanır
+        order = (np.arange(self.filled) + (self.head - self.filled)) % self.window
+        arrays = {
+            "returns": self.ring_r[np.ix_(order, cols)],
+            "mask": self.ring_m[np.ix_(order, cols)],
+            "times": self.times[order],
+        }
+        return arrays, {"symbols": symbols, "benchmarks": self.benchmarks, "last_time": self.last_time,
+                        "interval_ms": self.interval_ms}
+
+    def restore_state(self, arrays, meta, symbols=None):
+        if meta.get("interval_ms") != self.interval_ms:
+            return
+        # Benchmark'lar shard'ın kendi paritesi olmasa da pencerede kalır
+        listed = None if symbols is None else set(symbols) | set(self.benchmarks)
+        keep = [i for i, s in enumerate(meta["symbols"]) if listed is None or s in listed]
+        cols = np.array([self._slot(meta["symbols"][i]) for i in keep], dtype=np.int64)
+        rows = len(arrays["times"])
+        take = min(rows, self.window)
+        src = np.arange(rows - take, rows)
+        keep = np.array(keep, dtype=np.int64)
+        self.ring_r[:take, cols] = arrays["returns"][np.ix_(src, keep)]
+        self.ring_m[:take, cols] = arrays["mask"][np.ix_(src, keep)]
+        self.times[:take] = arrays["times"][src]
+        self.filled = take
+        self.head = take % self.window
+        self.last_time = meta["last_time"]
+        self._resync()
+        # Beta/korelasyon geri yüklenen pencereden; artık getiri bir sonraki mumla oluşur
+        empty = np.zeros(self.ring_r.shape[1])
+        self._score(empty, empty)
@@ -3,53 +3,167 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from config.config import Config
-from data.features import calculate_technicals, detect_patterns
+from data.features import calculate_technicals, detect_patterns, oscillator_alerts
+from data.codec import encode_klines, decode_klines, encode_orderbook, decode_orderbook
 from data.sources import (
     fetch_binance_klines, fetch_binance_orderbook, fetch_binance_funding, fetch_binance_oi,
     fetch_whale_alerts, fetch_news_sentiment, fetch_social_sentiment, fetch_onchain_activity
 )
-from core.binance_ws_client import BinanceWebSocketClient
-from pymongo import MongoClient, ASCENDING
+from core.binance_ws_client import BinanceWebSocketClient, MAX_KLINES, candle_from_row
+from core.feed_health import FeedHealthMonitor
+from core.market_bus import MarketBus, KLINE_FIELDS
+from core.snapshot import (
+    SymbolSnapshot, LatestValues, kline_views, parse_funding, parse_open_interest, last_time, sentiment_value
+)
+from data.codec import orderbook_arrays
 
 class DataPipeline:
-    def __init__(self, symbols, interval="15m"):
+    def __init__(self, symbols, interval="15m", shard=None):
         self.symbols = symbols
         self.interval = interval
         self.semaphore = asyncio.Semaphore(Config.DATA_PARALLEL_LIMIT or 10)
         self.ws_clients = {s: BinanceWebSocketClient(s, interval) for s in symbols}
+        # Bayat/sessiz WS akışları REST'e düşer; donmuş veriyle karar verilmez
+        self.health = FeedHealthMonitor(self.ws_clients)
+        # Reconnect sonrası mum boşlukları REST limiter üzerinden toplu doldurulur
+        self._gap_symbols = set()
+        self._fill_locks = {s: asyncio.Lock() for s in symbols}
+        self._backfill_task = None
+        for client in self.ws_clients.values():
+            client.on_gap = self._on_gap
+        # Canlı mum/derinlik tamponları shared memory'de diğer yerel process'lere açılır
+        self.bus = MarketBus(shard=shard) if Config.MARKET_BUS_ENABLED else None
+        if self.bus is not None:
+            for symbol, client in self.ws_clients.items():
+                client.bus = self.bus.attach(symbol)
+            self.bus.write_manifest()
 
         # --- MONGO ENTEGRASYON ---
+        from pymongo import MongoClient  # pipeline kurulurken yüklenir (main import'unu hafifletir)
         self.mongo_client = MongoClient(Config.MONGODB_URI)
         self.mongo_db = self.mongo_client[Config.MONGO_DB_NAME]
         self.coll_name = f"market_data_{interval}"
         self.mongo_coll = self.mongo_db[self.coll_name]
-        # index ile hızlı arama ve otomatik temizlik için
-        self.mongo_coll.create_index([("symbol", ASCENDING), ("timestamp", ASCENDING)])
+        # index ilk yazımda oluşturulur; kurulum Mongo round-trip'ini beklemez
+        self._index_ready = False
+        self._ws_starter = None
+        self._ws_tasks = set()       # sonradan eklenen paritelerin bağlantı görevleri
+        self._event_handler = None
 
         # Temizlik ayarı: Kaç gün geriye veri tutulsun? (örn: 7 gün)
         self.retention_days = 7
 
-    async def start_websockets(self, delay=1.5):
-        for symbol, client in self.ws_clients.items():
+    async def start_websockets(self, delay=1.5, background=False):
+        """
+        background=True: bağlantılar arka planda kademeli açılır, ilk döngü beklemez
+        (henüz bağlanmamış pariteler REST'ten çekilir).
+        """
+        if background:
+            self._ws_starter = asyncio.create_task(self.start_websockets(delay))
+            return self._ws_starter
+        await self._connect_clients(list(self.ws_clients.items()), delay)
+
+    async def _connect_clients(self, clients, delay):
+        for symbol, client in clients:
+            if self.ws_clients.get(symbol) is not client:
+                continue  # bağlantı sırası gelmeden evrenden çıkarıldı
             await client.connect()
             print(f"[WebSocket] {symbol} bağlantısı kuruldu.")
             await asyncio.sleep(delay)
 
     async def stop_websockets(self):
+        for task in (self._ws_starter, self._backfill_task, *self._ws_tasks):
+            if task is not None and not task.done():
+                task.cancel()
         await asyncio.gather(*(client.close() for client in self.ws_clients.values()))
+        if self.bus is not None:
+            self.bus.close()
+
+    def set_event_handler(self, handler):
+        """
+        WS tetikleyicilerini (kline kapanışı, derinlik değişimi, trade burst) handler(symbol, reason)'a bağlar.
+        """
+        self._event_handler = handler
+        for client in self.ws_clients.values():
+            client.on_event = handler
+
+    def add_symbols(self, symbols, delay=1.5):
+        """
+        Yeni listelenen pariteler için tampon/WS client açar; mevcut bağlantılara dokunulmaz.
+        Bağlantılar arka planda kademeli kurulur, o zamana kadar pariteler REST'ten çekilir.
+        """
+        added = []
+        for symbol in symbols:
+            if symbol in self.ws_clients:
+                continue
+            client = BinanceWebSocketClient(symbol, self.interval, on_event=self._event_handler)
+            client.on_gap = self._on_gap
+            if self.bus is not None:
+                client.bus = self.bus.attach(symbol)
+            self._fill_locks[symbol] = asyncio.Lock()
+            self.ws_clients[symbol] = client
+            added.append((symbol, client))
+        if added:
+            self.symbols = self.symbols + [s for s, _ in added]
+            if self.bus is not None:
+                self.bus.write_manifest()
+            task = asyncio.create_task(self._connect_clients(added, delay))
+            self._ws_tasks.add(task)
+            task.add_done_callback(self._ws_tasks.discard)
+        return [s for s, _ in added]
+
+    async def remove_symbols(self, symbols):
+        """
+        Listeden çıkan paritelerin WS bağlantılarını kapatır, tampon ve sağlık durumunu siler.
+        """
+        removed = set(symbols) & set(self.ws_clients)
+        clients = [self.ws_clients.pop(s) for s in removed]
+        for symbol in removed:
+            self._fill_locks.pop(symbol, None)
+            self._gap_symbols.discard(symbol)
+            self.health.evict(symbol)
+        self.symbols = [s for s in self.symbols if s not in removed]
+        await asyncio.gather(*(client.close() for client in clients))
+        if self.bus is not None:
+            for client in clients:
+                client.bus = None
+            for symbol in removed:
+                self.bus.detach(symbol)
+            self.bus.write_manifest()
+        return sorted(removed)
 
     async def fetch_symbol_data(self, symbol):
+        """
+        Parite verisini çeker, feature'ları hesaplar, Mongo'ya yazar ve
+        ajanlara verilecek SymbolSnapshot'ı bir kez kurar.
+        """
         async with self.semaphore:
             try:
                 ws_client = self.ws_clients.get(symbol)
-                df = ws_client.get_latest_klines_df() if ws_client else pd.DataFrame()
-                orderbook = ws_client.get_latest_orderbook() if ws_client else {"bids": [], "asks": []}
+                feed = self.health.check(symbol)
+                df = pd.DataFrame()
+                if ws_client is not None and ws_client.latest_klines:
+                    if not feed["kline"]:
+                        # WS bayat/henüz bağlı değil (ör. checkpoint'ten açılış): tampon tam geçmiş
+                        # yerine sadece son kapanmış muma kadarki aralık REST'ten çekilerek tamamlanır
+                        ws_client.check_gap_until(int(datetime.utcnow().timestamp() * 1000))
+                    # Boşluklu tampon indikatörleri bozar; doldurulamazsa REST'e düşülür
+                    # (arka plandaki backfill sürüyorsa kilit bitmesini bekletir)
+                    await self._fill_gaps(ws_client)
+                    if not ws_client.pending_gaps:
+                        df = ws_client.get_latest_klines_df()
+                orderbook = ws_client.get_latest_orderbook() if feed["depth"] else {"bids": [], "asks": []}
 
                 if df.empty:
+                    feed["kline"] = False
                     klines = await fetch_binance_klines(symbol, self.interval, limit=150)
                     df = pd.DataFrame(klines)
+                    if ws_client is not None:
+                        # WS tamponu REST geçmişiyle tohumlanır; sonraki döngüler tam geçmişi indirmez
+                        ws_client.merge_klines(self._closed_candles(df))
 
                 if not orderbook["bids"]:
+                    feed["depth"] = False
                     orderbook = await fetch_binance_orderbook(symbol, limit=50)
 
                 df = calculate_technicals(df)
@@ -71,9 +185,9 @@ class DataPipeline:
                     "symbol": symbol,
                     "interval": self.interval,
                     "timestamp": datetime.utcnow(),
-                    "klines": df.tail(150).to_dict("records"),  # son 150 mumu kayıt et
+                    "klines": self._encode_klines(df.tail(150)),  # son 150 mumu kayıt et
                     "patterns": patterns,
-                    "orderbook": orderbook,
+                    "orderbook": self._encode_orderbook(orderbook),
                     "orderbook_anomaly": orderbook_anomaly,
                     "funding": funding,
                     "oi": oi,
@@ -82,18 +196,170 @@ class DataPipeline:
                     "news_sentiment": news_sentiment,
                     "social_sentiment": social_sentiment,
                     "onchain": onchain,
-                    "time_features": time_features
+                    "time_features": time_features,
+                    "feed": {stream: "ws" if ok else "rest" for stream, ok in feed.items()},
                 }
+                self._ensure_index()
                 self.mongo_coll.insert_one(record)
 
                 # Eski verileri sil (ör: 7 günden yaşlı kayıtları sil)
                 self.cleanup_old_records(symbol)
 
-                return record
+                bids, asks = orderbook_arrays(orderbook)
+                views = kline_views(df)
+                latest = LatestValues.from_columns(views)
+                snapshot = SymbolSnapshot(
+                    symbol=symbol,
+                    interval=self.interval,
+                    timestamp=record["timestamp"],
+                    klines_df=df,
+                    klines=views,
+                    latest=latest,
+                    patterns=patterns,
+                    oscillator_alerts=oscillator_alerts(df, latest),
+                    volume_anomaly=volume_anomaly,
+                    time_features=time_features,
+                    orderbook_bids=bids,
+                    orderbook_asks=asks,
+                    orderbook_anomaly=orderbook_anomaly,
+                    funding_rates=parse_funding(funding),
+                    oi_changes=parse_open_interest(oi),
+                    funding_time=last_time(funding, "fundingTime"),
+                    oi_time=last_time(oi, "timestamp"),
+                    whale_events=whale_events or [],
+                    sentiment_news=sentiment_value(news_sentiment),
+                    sentiment_social=sentiment_value(social_sentiment),
+                    sentiment_onchain=sentiment_value(onchain),
+                )
+                return snapshot.validate()
             except Exception as ex:
                 print(f"[DataPipeline] {symbol} veri çekim hatası: {ex}")
                 return None
 
+    def checkpoint_state(self):
+        """
+        Kapanmış mum tamponları tek (satır, len(KLINE_FIELDS)) matriste; parite ofsetleri meta'da.
+        """
+        symbols, offsets, rows = [], [0], []
+        holes = {}
+        for symbol, client in self.ws_clients.items():
+            if not client.latest_klines:
+                continue
+            symbols.append(symbol)
+            rows.extend([float(c.get(f, np.nan)) for f in KLINE_FIELDS] for c in client.latest_klines)
+            offsets.append(len(rows))
+            if client.known_holes:
+                holes[symbol] = [list(h) for h in client.known_holes]
+        klines = np.array(rows, dtype=np.float64).reshape(-1, len(KLINE_FIELDS))
+        return {"klines": klines}, {"interval": self.interval, "symbols": symbols, "offsets": offsets, "known_holes": holes}
+
+    def restore_state(self, arrays, meta, symbols=None):
+        """
+        Checkpoint'teki tamponları yükler; checkpoint sonrası kaçan mumlar ilk çekimde
+        (veya WS'in ilk mesajında) sadece eksik aralık olarak doldurulur.
+        """
+        if meta.get("interval") != self.interval or "klines" not in arrays:
+            return 0
+        klines = arrays["klines"]
+        int_fields = {"open_time", "close_time", "number_of_trades"}
+        restored = 0
+        for i, symbol in enumerate(meta["symbols"]):
+            client = self.ws_clients.get(symbol)
+            if client is None:
+                continue
+            block = klines[meta["offsets"][i]:meta["offsets"][i + 1]]
+            candles = [{f: (int(v) if f in int_fields else float(v)) for f, v in zip(KLINE_FIELDS, row)}
+                       for row in block.tolist()]
+            client.known_holes.update(tuple(h) for h in meta["known_holes"].get(symbol, []))
+            client.merge_klines(candles)
+            restored += 1
+        return restored
+
+    @staticmethod
+    def _closed_candles(df, start=None, end=None):
+        now_ms = int(datetime.utcnow().timestamp() * 1000)
+        candles = [candle_from_row(row) for row in df.to_dict("records")]
+        return [c for c in candles if c["close_time"] < now_ms
+                and (start is None or c["open_time"] >= start) and (end is None or c["open_time"] <= end)]
+
+    async def _fill_gaps(self, client):
+        """
+        Bekleyen boşlukları sadece eksik aralığı (startTime/endTime) çekerek doldurur.
+        Tampondan uzun boşlukta son MAX_KLINES mum çekilir. Borsada da olmayan aralıklar
+        known_holes'a alınır ve tekrar istenmez. Çağıran REST limiter'ı (semaphore) tutmalıdır.
+        """
+        symbol = client.symbol.upper()
+        lock = self._fill_locks.get(symbol)
+        if lock is None:
+            return False  # parite evrenden çıkarılmış
+        async with lock:
+            return await self._fill_gaps_locked(client, symbol)
+
+    async def _fill_gaps_locked(self, client, symbol):
+        gaps = client.take_gaps()
+        if not gaps:
+            return True
+        try:
+            for start, end in gaps:
+                count = (end - start) // client.interval_ms + 1
+                if count >= MAX_KLINES:
+                    df = await fetch_binance_klines(symbol, self.interval, limit=MAX_KLINES)
+                    client.merge_klines(self._closed_candles(df))
+                else:
+                    df = await fetch_binance_klines(symbol, self.interval, limit=count,
+                                                    start_time=start, end_time=end + client.interval_ms - 1)
+                    client.merge_klines(self._closed_candles(df, start, end))
+        except Exception as ex:
+            client.pending_gaps = gaps + client.pending_gaps
+            print(f"[DataPipeline] {symbol} mum boşluğu doldurulamadı: {ex}")
+            return False
+        for hole in client.pending_gaps:
+            if any(start <= hole[0] and hole[1] <= end for start, end in gaps):
+                client.known_holes.add(hole)
+        client.scan_gaps()
+        print(f"[DataPipeline] {symbol} {len(gaps)} mum boşluğu dolduruldu.")
+        return True
+
+    def _on_gap(self, symbol):
+        self._gap_symbols.add(symbol)
+        if self._backfill_task is None or self._backfill_task.done():
+            self._backfill_task = asyncio.create_task(self.backfill_gaps())
+
+    async def backfill_gaps(self):
+        """
+        Boşluk bildiren pariteleri kısa bir bekleme sonrası toplu doldurur; toplu reconnect'te
+        tüm pariteler aynı REST limiter'ından (semaphore) sırayla geçer.
+        """
+        async def fill(symbol):
+            client = self.ws_clients.get(symbol)
+            if client is not None and client.pending_gaps:
+                async with self.semaphore:
+                    await self._fill_gaps(client)
+
+        while self._gap_symbols:
+            await asyncio.sleep(Config.KLINE_BACKFILL_DELAY_SEC)
+            symbols, self._gap_symbols = self._gap_symbols, set()
+            await asyncio.gather(*(fill(s) for s in symbols))
+
+    async def reference_klines(self, symbol, limit):
+        """
+        Evrende/bu döngüde olmayan referans paritenin (örn. benchmark) kapanış serisi:
+        WS tamponu varsa oradan, yoksa sadece istenen kadar mum REST'ten. Kolon -> dizi sözlüğü döner.
+        """
+        client = self.ws_clients.get(symbol)
+        df = client.get_latest_klines_df() if client is not None and client.latest_klines else None
+        if df is None or df.empty:
+            async with self.semaphore:
+                df = await fetch_binance_klines(symbol, self.interval, limit=limit)
+        return {c: pd.to_numeric(df[c]).to_numpy() for c in ("open_time", "close_time", "close") if c in df}
+
+    def _ensure_index(self):
+        # index ile hızlı arama ve otomatik temizlik için
+        if not self._index_ready:
+            from pymongo import ASCENDING
+            self.mongo_coll.create_index([("symbol", ASCENDING), ("timestamp", ASCENDING)])
+            self._index_ready = True
+
     def cleanup_old_records(self, symbol):
         """Belirlenen retention süresinden eski verileri siler."""
         threshold = datetime.utcnow() - timedelta(days=self.retention_days)
@@ -104,15 +370,45 @@ class DataPipeline:
         if result.deleted_count > 0:
             print(f"[MongoDB] {symbol} için {result.deleted_count} eski kayıt silindi.")
 
-    async def batch_fetch(self):
-        results = await asyncio.gather(*(self.fetch_symbol_data(s) for s in self.symbols))
-        return [r for r in results if r is not None]
+    async def batch_fetch(self, symbols=None, deadline=None):
+        """
+        Pariteleri verilen sırayla çeker (semaphore FIFO). deadline (sn) verilirse
+        süre dolunca bitmeyen çekimler iptal edilir, biten pariteler sırayla döner.
+        """
+        symbols = self.symbols if symbols is None else symbols
+        if deadline is None:
+            results = await asyncio.gather(*(self.fetch_symbol_data(s) for s in symbols))
+            return [r for r in results if r is not None]
+        tasks = [asyncio.create_task(self.fetch_symbol_data(s)) for s in symbols]
+        if not tasks:
+            return []
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return [t.result() for t in tasks if t.done() and not t.cancelled() and t.result() is not None]
 
-    def get_last_data_from_db(self, symbol, limit=1):
+    def get_last_data_from_db(self, symbol, limit=1, decode=True):
         """MongoDB'den en güncel veriyi oku (en son kayıt edilenleri çek)."""
         query = {"symbol": symbol}
         cursor = self.mongo_coll.find(query).sort("timestamp", -1).limit(limit)
-        return list(cursor)
+        records = list(cursor)
+        if decode:
+            for rec in records:
+                # Kolon bazlı bloblar doğrudan NumPy dizilerine açılır
+                rec["klines"] = decode_klines(rec.get("klines"))
+                rec["orderbook"] = decode_orderbook(rec.get("orderbook"))
+        return records
+
+    def _encode_klines(self, df):
+        if Config.STORAGE_ENCODING != "columnar":
+            return df.to_dict("records")
+        return encode_klines(df, float_dtype=Config.STORAGE_FLOAT_DTYPE, delta=Config.STORAGE_DELTA)
+
+    def _encode_orderbook(self, orderbook):
+        if Config.STORAGE_ENCODING != "columnar":
+            return orderbook
+        return encode_orderbook(orderbook, float_dtype=Config.STORAGE_FLOAT_DTYPE)
 
     def _analyze_orderbook(self, ob):
         try:
@@ -0,0 +1,95 @@
+# core/deadline_scheduler.py
+
+import math
+import time
+from collections import defaultdict
+from config.config import Config
+
+
+class DeadlineScheduler:
+    """
+    Döngü bütçesi içinde pariteleri ucuz bir öncelik skoruna göre sıralar.
+    - Skor: son volatilite (close'a oranla), hacim anomalisi, önceki sinyal ve bayatlık (staleness)
+    - Hiç analiz edilmemiş pariteler en öne alınır; bayatlık terimi ertelenenlerin aç kalmasını önler
+    - Bütçede bitmeyen pariteler sonraki döngüye ertelenir; deadline kaçırma ve bayatlık raporlanır
+    """
+
+    def __init__(self, budget=None, fetch_share=0.6, vol_weight=100.0, volume_weight=1.0, signal_weight=1.0, stale_weight=0.5):
+        self.budget = Config.CYCLE_DEADLINE_SEC if budget is None else budget
+        self.fetch_share = fetch_share    # bütçenin veri çekimine ayrılan payı (kalanı analize kalır)
+        self.vol_weight = vol_weight
+        self.volume_weight = volume_weight
+        self.signal_weight = signal_weight
+        self.stale_weight = stale_weight
+        self.last_done = {}               # symbol -> son başarılı analiz zamanı (monotonic)
+        self.features = {}                # symbol -> (volatilite oranı, hacim anomalisi, sinyal var mı)
+        self.misses = defaultdict(int)    # symbol -> kaçırılan deadline sayısı
+        self.cycles = 0
+
+    def priority(self, symbol, now=None):
+        if symbol not in self.last_done:
+            return math.inf
+        now = time.monotonic() if now is None else now
+        vol, volume_anomaly, signal = self.features.get(symbol, (0.0, 1.0, False))
+        staleness = (now - self.last_done[symbol]) / max(Config.ANALYSIS_INTERVAL, 1)
+        return (self.vol_weight * vol
+                + self.volume_weight * abs(math.log(max(volume_anomaly, 1e-6)))
+                + self.signal_weight * signal
+                + self.stale_weight * staleness)
+
+    def order(self, symbols):
+        """
+        Pariteleri öncelik sırasıyla döner (eşitlikte orijinal sıra korunur).
+        """
+        now = time.monotonic()
+        return sorted(symbols, key=lambda s: -self.priority(s, now))
+
+    def deadline(self, started, share=1.0):
+        """
+        Döngü başlangıcına göre bütçenin `share` payından kalan süre (sn); bütçe yoksa None.
+        """
+        if not self.budget:
+            return None
+        return max(0.0, started + self.budget * share - time.monotonic())
+
+    def fetch_deadline(self, started):
+        return self.deadline(started, self.fetch_share)
+
+    def observe(self, snapshot, decision):
+        """
+        Analizi biten paritenin öncelik girdilerini günceller.
+        """
+        latest = snapshot.latest
+        close = latest.close if latest is not None else 0.0
+        volatility = snapshot.time_features.get("volatility", 0.0) if snapshot.time_features else 0.0
+        vol = volatility / close if close and volatility == volatility else 0.0
+        self.features[snapshot.symbol] = (vol, snapshot.volume_anomaly or 1.0, decision["direction"] != "none")
+        self.last_done[snapshot.symbol] = time.monotonic()
+
+    def finish_cycle(self, planned, completed):
+        """
+        Döngü sonu: bütçede bitmeyenleri deadline kaçırma olarak sayar, bayatlık özetini döner.
+        """
+        self.cycles += 1
+        deferred = [s for s in planned if s not in completed]
+        for symbol in deferred:
+            self.misses[symbol] += 1
+        now = time.monotonic()
+        ages = {s: now - self.last_done[s] for s in planned if s in self.last_done}
+        stalest = sorted(ages.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        return {
+            "planned": len(planned),
+            "completed": len(completed),
+            "deferred": len(deferred),
+            "never_analyzed": sum(1 for s in planned if s not in self.last_done),
+            "max_staleness": stalest[0][1] if stalest else 0.0,
+            "stalest": [(s, round(age, 1)) for s, age in stalest],
+        }
+
+    def evict(self, symbol):
+        self.last_done.pop(symbol, None)
+        self.features.pop(symbol, None)
+        self.misses.pop(symbol, None)
+
+    def stats(self):
+        return {"cycles": self.cycles, "misses": dict(self.misses)}
@@ -0,0 +1,106 @@
+# core/event_scheduler.py
+
+import asyncio
+import time
+from collections import Counter
+from config.config import Config
+from core.self_learning import get_agent_weights
+
+
+class EventScheduler:
+    """
+    WS olaylarıyla (kline kapanışı, derinlik değişimi, trade burst) tetiklenen analiz zamanlayıcısı.
+    - Sadece etkilenen pariteler iş kuyruğuna girer; boştaki pariteler maliyet üretmez
+    - Parite başına debounce: son analizden SCHEDULER_DEBOUNCE_SEC geçmeden tekrar koşulmaz
+      (erken gelen olay kaybolmaz, süre dolunca kuyruğa alınır)
+    - Güvenlik taraması: SCHEDULER_SWEEP_SEC boyunca analiz edilmeyen pariteler yine kuyruğa girer
+    - Kuyrukta biriken pariteler tek run_once(symbols=...) çağrısında micro-batch olarak işlenir
+    - Ajan ağırlıkları interval modundaki gibi en fazla ANALYSIS_INTERVAL'da bir yenilenir
+    """
+
+    def __init__(self, orchestrator, debounce=None, sweep_interval=None, weights_interval=None):
+        self.orchestrator = orchestrator
+        self.debounce = Config.SCHEDULER_DEBOUNCE_SEC if debounce is None else debounce
+        self.sweep_interval = Config.SCHEDULER_SWEEP_SEC if sweep_interval is None else sweep_interval
+        self.weights_interval = Config.ANALYSIS_INTERVAL if weights_interval is None else weights_interval
+        self._weights_at = time.monotonic()
+        self._queue = {}               # symbol -> ilk tetikleme sebebi (ekleme sırası korunur)
+        self._delayed = {}             # debounce bekleyen pariteler -> TimerHandle
+        self._last_run = {}
+        self._wakeup = asyncio.Event()
+        self.triggers = Counter()
+        self.runs = 0
+
+    def notify(self, symbol, reason):
+        """
+        WS client callback'i (event loop içinde çağrılır).
+        """
+        self.triggers[reason] += 1
+        if symbol in self._queue or symbol in self._delayed:
+            return
+        wait = self._last_run.get(symbol, float("-inf")) + self.debounce - time.monotonic()
+        if wait > 0:
+            loop = asyncio.get_running_loop()
+            self._delayed[symbol] = loop.call_later(wait, self._release, symbol, reason)
+        else:
+            self._enqueue(symbol, reason)
+
+    def _release(self, symbol, reason):
+        self._delayed.pop(symbol, None)
+        self._enqueue(symbol, reason)
+
+    def _enqueue(self, symbol, reason):
+        self._queue.setdefault(symbol, reason)
+        self._wakeup.set()
+
+    def _sweep(self):
+        now = time.monotonic()
+        for symbol in self.orchestrator.symbols:
+            if now - self._last_run.get(symbol, float("-inf")) >= self.sweep_interval:
+                if symbol not in self._queue and symbol not in self._delayed:
+                    self._enqueue(symbol, "sweep")
+
+    async def _sweep_loop(self):
+        while True:
+            self._sweep()
+            await asyncio.sleep(self.sweep_interval)
+
+    async def run_forever(self):
+        self.orchestrator.data_pipeline.set_event_handler(self.notify)
+        sweeper = asyncio.create_task(self._sweep_loop())
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                symbols, self._queue = list(self._queue), {}
+                if not symbols:
+                    continue
+                started = time.monotonic()
+                for symbol in symbols:
+                    self._last_run[symbol] = started
+                try:
+                    await self.orchestrator.run_once(symbols=symbols)
+                except Exception as ex:
+                    print(f"[EventScheduler] Analiz hatası: {ex}")
+                self.runs += 1
+                self._refresh_weights()
+        finally:
+            sweeper.cancel()
+            for handle in self._delayed.values():
+                handle.cancel()
+            self._delayed.clear()
+            self.orchestrator.data_pipeline.set_event_handler(None)
+
+    def _refresh_weights(self):
+        now = time.monotonic()
+        if now - self._weights_at < self.weights_interval:
+            return
+        self._weights_at = now
+        try:
+            self.orchestrator.agent_pool.agent_weights = get_agent_weights()
+        except Exception as ex:
+            print(f"[EventScheduler] Ajan ağırlıkları yenilenemedi: {ex}")
+
+    def stats(self):
+        return {"runs": self.runs, "queued": len(self._queue), "delayed": len(self._delayed),
+                "triggers": dict(self.triggers)}
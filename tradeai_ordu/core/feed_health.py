@@ -0,0 +1,135 @@
+# core/feed_health.py
+
+import time
+from collections import Counter
+from config.config import Config
+
+STREAMS = ("kline", "depth")
+
+
+class StreamHealth:
+    """
+    Tek bir WS akışının canlılık sayaçları (WS client her mesajda günceller).
+    Gecikme yerel saat ile borsa olay zamanının farkıdır; yerel saat sapması sabit bir ofset ekler.
+    Bağlantı boyunca görülen en küçük fark (saat ofseti + en iyi ağ gecikmesi) taban alınır ve
+    latency_ms bu tabanın üstündeki gecikmeyi ölçer; taban WS_MAX_LATENCY_MS'i aşarsa bir kez loglanır.
+    """
+    __slots__ = ("last_msg", "latency_ms", "clock_offset_ms", "messages", "reconnects", "timeouts", "connected")
+    _offset_warned = False
+
+    def __init__(self):
+        self.last_msg = None        # son mesajın yerel zamanı (monotonic)
+        self.latency_ms = None      # taban üstü borsa olay zamanı -> yerel alım gecikmesi (EWMA)
+        self.clock_offset_ms = None # bağlantıdaki en küçük ham fark (saat ofseti tahmini)
+        self.messages = 0
+        self.reconnects = 0
+        self.timeouts = 0
+        self.connected = False
+
+    def on_connect(self):
+        # Yeni bağlantı yeni taban (NTP düzeltmesi sonrası eski taban geçersiz olabilir)
+        self.connected = True
+        self.clock_offset_ms = None
+
+    def record(self, event_ms=None, alpha=0.2):
+        self.last_msg = time.monotonic()
+        self.messages += 1
+        if event_ms:
+            raw = time.time() * 1000 - event_ms
+            if self.clock_offset_ms is None or raw < self.clock_offset_ms:
+                self.clock_offset_ms = raw
+                self._warn_offset(raw)
+            latency = raw - self.clock_offset_ms
+            self.latency_ms = latency if self.latency_ms is None else self.latency_ms + alpha * (latency - self.latency_ms)
+
+    @classmethod
+    def _warn_offset(cls, offset):
+        if not cls._offset_warned and abs(offset) > Config.WS_MAX_LATENCY_MS:
+            cls._offset_warned = True
+            print(f"[FeedHealth] UYARI: yerel saat borsadan ~{offset:.0f}ms sapmış (NTP senkronunu kontrol edin); "
+                  f"gecikme bu ofset düşülerek ölçülüyor.")
+
+    def age(self, now=None):
+        if self.last_msg is None:
+            return float("inf")
+        return (time.monotonic() if now is None else now) - self.last_msg
+
+
+class FeedHealthMonitor:
+    """
+    Parite/akış bazında WS sağlık takibi ve REST failover kararı.
+    - Akış sağlıklı: bağlı, son mesaj WS_STALE_SEC'ten yeni ve gecikme EWMA'sı WS_MAX_LATENCY_MS altında
+    - Sağlıksız akışın verisi kullanılmaz; pipeline o akışı mevcut REST fetcher'larından çeker
+    - Sağlıklı -> bayat geçişi failover, tersi recovery olarak sayılır ve loglanır
+      (hiç mesaj almamış akış — örn. açılışta bağlantı sırası bekleyen — failover sayılmaz)
+    """
+
+    def __init__(self, clients, max_age=None, max_latency_ms=None):
+        self.clients = clients
+        self.max_age = Config.WS_STALE_SEC if max_age is None else max_age
+        self.max_latency_ms = Config.WS_MAX_LATENCY_MS if max_latency_ms is None else max_latency_ms
+        self.stale = {}             # symbol -> {stream: bayatlama anı (monotonic)}
+        self.failovers = Counter()
+        self.recoveries = Counter()
+
+    def stream_ok(self, health, now=None):
+        if not health.connected or health.age(now) > self.max_age:
+            return False
+        return health.latency_ms is None or health.latency_ms <= self.max_latency_ms
+
+    def check(self, symbol):
+        """
+        {stream: True/False} — True ise akışın WS verisi kullanılabilir.
+        """
+        client = self.clients.get(symbol)
+        if client is None:
+            return dict.fromkeys(STREAMS, False)
+        now = time.monotonic()
+        status = {}
+        for stream in STREAMS:
+            health = client.health[stream]
+            ok = self.stream_ok(health, now)
+            status[stream] = ok
+            stale = self.stale.setdefault(symbol, {})
+            if not ok and stream not in stale and health.last_msg is not None:
+                stale[stream] = now
+                self.failovers[stream] += 1
+                print(f"[FeedHealth] {symbol} {stream} akışı bayat (yaş={health.age(now):.1f}s, "
+                      f"gecikme={health.latency_ms or 0:.0f}ms) -> REST")
+            elif ok and stream in stale:
+                down = now - stale.pop(stream)
+                self.recoveries[stream] += 1
+                print(f"[FeedHealth] {symbol} {stream} akışı {down:.1f}s sonra WS'e döndü.")
+        return status
+
+    def evict(self, symbol):
+        self.stale.pop(symbol, None)
+
+    def summary(self):
+        now = time.monotonic()
+        out = {}
+        for stream in STREAMS:
+            ages, latencies, offsets, healthy = [], [], [], 0
+            for client in self.clients.values():
+                health = client.health[stream]
+                if self.stream_ok(health, now):
+                    healthy += 1
+                if health.last_msg is not None:
+                    ages.append(health.age(now))
+                if health.latency_ms is not None:
+                    latencies.append(health.latency_ms)
+                if health.clock_offset_ms is not None:
+                    offsets.append(health.clock_offset_ms)
+            out[stream] = {
+                "healthy": healthy,
+                "total": len(self.clients),
+                "max_age": round(max(ages), 2) if ages else None,
+                "max_latency_ms": round(max(latencies), 1) if latencies else None,
+                "clock_offset_ms": round(min(offsets), 1) if offsets else None,
+                "reconnects": sum(c.health[stream].reconnects for c in self.clients.values()),
+                "timeouts": sum(c.health[stream].timeouts for c in self.clients.values()),
+                "failovers": self.failovers[stream],
+                "recoveries": self.recoveries[stream],
+            }
+        out["stale_symbols"] = sorted(s for s, streams in self.stale.items() if streams)
+        return out
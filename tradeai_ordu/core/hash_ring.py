@@ -0,0 +1,72 @@
+# core/hash_ring.py
+
+import bisect
+import hashlib
+
+
+def _hash(key):
+    # Process'ler/sunucular arası kararlı olmalı (Python hash() her process'te farklıdır)
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Sanal düğümlü consistent-hash halkası.
+    Shard eklenip çıkarıldığında paritelerin yalnızca ~1/N'i yer değiştirir.
+    """
+
+    def __init__(self, nodes=(), vnodes=160):
+        self.vnodes = vnodes
+        self._keys = []
+        self._owners = {}
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        for i in range(self.vnodes):
+            key = _hash(f"{node}#{i}")
+            if key not in self._owners:
+                bisect.insort(self._keys, key)
+            self._owners[key] = node
+
+    def remove(self, node):
+        for i in range(self.vnodes):
+            key = _hash(f"{node}#{i}")
+            if self._owners.get(key) == node:
+                del self._owners[key]
+                self._keys.pop(bisect.bisect_left(self._keys, key))
+
+    def node_for(self, symbol):
+        if not self._keys:
+            raise ValueError("Hash halkasında düğüm yok")
+        idx = bisect.bisect(self._keys, _hash(symbol)) % len(self._keys)
+        return self._owners[self._keys[idx]]
+
+    def partition(self, symbols):
+        """
+        {node: [symbol, ...]} — her düğüm için sıralı parite listesi.
+        """
+        out = {node: [] for node in set(self._owners.values())}
+        for symbol in symbols:
+            out[self.node_for(symbol)].append(symbol)
+        return out
+
+
+def universe_version(symbols):
+    """
+    Parite evreninin sıradan bağımsız kısa özeti; coordinator ile worker'ların aynı listeyi
+    bölümlediğini doğrulamak için.
+    """
+    return hashlib.md5(",".join(sorted(symbols)).encode()).hexdigest()[:12]
+
+
+def shard_name(index):
+    return f"shard-{index}"
+
+
+def shard_symbols(symbols, index, count):
+    """
+    `count` shard'lık halkada `index` numaralı shard'ın sahip olduğu pariteler.
+    """
+    ring = HashRing(shard_name(i) for i in range(count))
+    return ring.partition(symbols).get(shard_name(index), [])
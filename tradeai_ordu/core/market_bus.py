@@ -0,0 +1,289 @@
+# core/market_bus.py
+
+import glob
+import json
+import os
+import time
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+from config.config import Config
+
+# Segment düzeni (hepsi 8 byte'lık hücreler):
+#   header  : int64[HEADER]   — versiyon, seqlock sayaçları, ring head/count, derinlik seviye sayıları, zaman damgaları
+#   klines  : float64[MAX_KLINES, len(KLINE_FIELDS)]  — kapanmış mum ring buffer'ı
+#   depth   : float64[DEPTH_LEVELS, 4]                — bid fiyat, bid miktar, ask fiyat, ask miktar
+LAYOUT_VERSION = 1
+KLINE_FIELDS = (
+    "open_time", "open", "high", "low", "close", "volume", "close_time",
+    "quote_asset_volume", "number_of_trades", "taker_buy_base_asset_volume", "taker_buy_quote_asset_volume",
+)
+MAX_KLINES = Config.WS_KLINE_BUFFER  # WS mum tamponuyla aynı uzunluk
+DEPTH_LEVELS = 20
+
+H_VERSION, H_KLINE_SEQ, H_KLINE_HEAD, H_KLINE_COUNT, H_KLINE_TS, \
+    H_DEPTH_SEQ, H_BIDS, H_ASKS, H_DEPTH_TS = range(9)
+HEADER = 16
+
+_KLINE_SIZE = MAX_KLINES * len(KLINE_FIELDS)
+_DEPTH_SIZE = DEPTH_LEVELS * 4
+SEGMENT_SIZE = (HEADER + _KLINE_SIZE + _DEPTH_SIZE) * 8
+
+_OWNED = set()  # bu process'in yarattığı segmentler (resource tracker kaydı yazıcıya ait)
+
+
+def segment_name(symbol, prefix=None):
+    return f"{prefix or Config.MARKET_BUS_PREFIX}_{symbol.upper()}"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _views(buf):
+    header = np.ndarray((HEADER,), dtype=np.int64, buffer=buf)
+    klines = np.ndarray((MAX_KLINES, len(KLINE_FIELDS)), dtype=np.float64, buffer=buf, offset=HEADER * 8)
+    depth = np.ndarray((DEPTH_LEVELS, 4), dtype=np.float64, buffer=buf, offset=(HEADER + _KLINE_SIZE) * 8)
+    return header, klines, depth
+
+
+class SymbolBusWriter:
+    """
+    Tek paritenin segmentine yazan taraf (WS client'ın sahibi olan process).
+    Seqlock: yazımdan önce sayaç tek sayıya, sonra çift sayıya çıkar; okuyucu
+    iki okuma arasında sayaç değişmediyse (ve çiftse) tutarlı kopya almıştır.
+    Kline ve derinlik ayrı sayaçlıdır; 250ms'lik derinlik akışı mum okumalarını bozmaz.
+    Aynı adlı segment varsa sadece replace_stale=True iken (sahibi ölmüşse) silinip yeniden yaratılır.
+    """
+
+    def __init__(self, symbol, prefix=None, replace_stale=False):
+        self.symbol = symbol.upper()
+        self.name = segment_name(symbol, prefix)
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=SEGMENT_SIZE)
+        except FileExistsError:
+            if not replace_stale or self.name in _OWNED:
+                raise FileExistsError(f"{self.name}: segment canlı bir yazıcıya ait")
+            # Önceki (çökmüş) çalışmadan kalan segment temizlenir
+            stale = shared_memory.SharedMemory(name=self.name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=SEGMENT_SIZE)
+        _OWNED.add(self.name)
+        self.header, self.klines, self.depth = _views(self.shm.buf)
+        self.header[:] = 0
+        self.header[H_VERSION] = LAYOUT_VERSION
+
+    @staticmethod
+    def _row(candle):
+        return [float(candle.get(f, np.nan)) for f in KLINE_FIELDS]
+
+    def publish_klines(self, candles):
+        """
+        Tamponun tamamını yeniden yazar (tohumlama / boşluk doldurma sonrası).
+        """
+        candles = candles[-MAX_KLINES:]
+        h = self.header
+        h[H_KLINE_SEQ] += 1
+        if candles:
+            self.klines[:len(candles)] = [self._row(c) for c in candles]
+        h[H_KLINE_HEAD] = len(candles) % MAX_KLINES
+        h[H_KLINE_COUNT] = len(candles)
+        h[H_KLINE_TS] = time.time_ns()
+        h[H_KLINE_SEQ] += 1
+
+    def append_kline(self, candle):
+        h = self.header
+        h[H_KLINE_SEQ] += 1
+        head = int(h[H_KLINE_HEAD])
+        self.klines[head] = self._row(candle)
+        h[H_KLINE_HEAD] = (head + 1) % MAX_KLINES
+        h[H_KLINE_COUNT] = min(int(h[H_KLINE_COUNT]) + 1, MAX_KLINES)
+        h[H_KLINE_TS] = time.time_ns()
+        h[H_KLINE_SEQ] += 1
+
+    def publish_depth(self, bids, asks):
+        """
+        bids/asks: Binance formatında [[fiyat, miktar], ...] (string veya sayı).
+        """
+        nb, na = min(len(bids), DEPTH_LEVELS), min(len(asks), DEPTH_LEVELS)
+        h = self.header
+        h[H_DEPTH_SEQ] += 1
+        if nb:
+            self.depth[:nb, 0:2] = np.asarray(bids[:nb], dtype=np.float64)
+        if na:
+            self.depth[:na, 2:4] = np.asarray(asks[:na], dtype=np.float64)
+        h[H_BIDS], h[H_ASKS] = nb, na
+        h[H_DEPTH_TS] = time.time_ns()
+        h[H_DEPTH_SEQ] += 1
+
+    def close(self):
+        del self.header, self.klines, self.depth
+        self.shm.close()
+        _OWNED.discard(self.name)
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SymbolBusReader:
+    """
+    Başka bir yerel process'ten segmenti eşleyen okuyucu (borsaya ek bağlantı açmaz).
+    Görünümler salt-okunurdur; klines()/depth() seqlock ile tutarlı bir kopya döner.
+    """
+
+    def __init__(self, symbol, prefix=None, retries=1000):
+        self.symbol = symbol.upper()
+        name = segment_name(symbol, prefix)
+        self.shm = shared_memory.SharedMemory(name=name)
+        # Okuyucu segmentin sahibi değildir; çıkışta resource tracker segmenti silmemeli
+        if name not in _OWNED:
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.header, kl, dp = _views(self.shm.buf)
+        kl.flags.writeable = False
+        dp.flags.writeable = False
+        self._klines, self._depth = kl, dp
+        self.retries = retries
+        if int(self.header[H_VERSION]) != LAYOUT_VERSION:
+            raise ValueError(f"{self.symbol}: segment düzen versiyonu uyumsuz ({int(self.header[H_VERSION])})")
+
+    def _read(self, seq_index, copy):
+        h = self.header
+        for _ in range(self.retries):
+            before = int(h[seq_index])
+            if not before & 1:  # tek sayı: yazım sürüyor
+                out = copy()
+                if int(h[seq_index]) == before:
+                    return out
+            time.sleep(0)  # yazıcıya CPU bırak
+        raise TimeoutError(f"{self.symbol}: tutarlı okuma yapılamadı (yazıcı çok sık güncelliyor)")
+
+    def klines(self):
+        """
+        Kapanmış mumlar (eskiden yeniye), shape (n, len(KLINE_FIELDS)).
+        """
+        def copy():
+            n, head = int(self.header[H_KLINE_COUNT]), int(self.header[H_KLINE_HEAD])
+            if n < MAX_KLINES:
+                return self._klines[:n].copy()
+            return np.concatenate((self._klines[head:], self._klines[:head]))
+        return self._read(H_KLINE_SEQ, copy)
+
+    def klines_df(self):
+        import pandas as pd
+        return pd.DataFrame(self.klines(), columns=KLINE_FIELDS)
+
+    def depth(self):
+        """
+        (bids, asks) — her biri shape (seviye, 2): fiyat, miktar.
+        """
+        def copy():
+            nb, na = int(self.header[H_BIDS]), int(self.header[H_ASKS])
+            return self._depth[:nb, 0:2].copy(), self._depth[:na, 2:4].copy()
+        return self._read(H_DEPTH_SEQ, copy)
+
+    def top_of_book(self):
+        bids, asks = self.depth()
+        if not len(bids) or not len(asks):
+            return None
+        return {"bid": float(bids[0, 0]), "bid_qty": float(bids[0, 1]), "ask": float(asks[0, 0]), "ask_qty": float(asks[0, 1])}
+
+    def age(self):
+        """
+        Son kline ve derinlik yazımından bu yana geçen süre (sn).
+        """
+        now = time.time_ns()
+        return {"klines": (now - int(self.header[H_KLINE_TS])) / 1e9, "depth": (now - int(self.header[H_DEPTH_TS])) / 1e9}
+
+    def close(self):
+        del self.header, self._klines, self._depth
+        self.shm.close()
+
+
+class MarketBus:
+    """
+    Yazıcı tarafı: parite başına bir segment ve okuyucuların keşfi için manifest dosyası
+    (tmp + os.replace ile atomik yazılır).
+    - shard verilirse ön ek ve manifest shard adıyla soneklenir (<prefix>_<shard>, market_bus.<shard>.json);
+      shard'lar birbirinin manifestini ezmez, kapanan shard diğerlerininkini silmez
+    - Var olan segmentler sadece önceki manifestin pid'i ölmüşse bayat sayılır
+    """
+
+    def __init__(self, prefix=None, manifest=None, shard=None):
+        self.prefix = prefix or Config.MARKET_BUS_PREFIX
+        self.manifest = manifest or Config.MARKET_BUS_MANIFEST
+        if shard:
+            base, ext = os.path.splitext(self.manifest)
+            self.prefix = f"{self.prefix}_{shard}"
+            self.manifest = f"{base}.{shard}{ext}"
+        self.replace_stale = self._owner_dead()
+        self.writers = {}
+
+    def _owner_dead(self):
+        try:
+            with open(self.manifest, "r", encoding="utf-8") as f:
+                pid = json.load(f)["pid"]
+        except (OSError, ValueError, KeyError):
+            return False
+        # Aynı pid: yeniden başlayan container'da pid tekrar kullanılmış olabilir; kendi canlı
+        # segmentlerimizi SymbolBusWriter _OWNED üzerinden korur
+        return pid == os.getpid() or not _pid_alive(pid)
+
+    def attach(self, symbol):
+        writer = self.writers.get(symbol)
+        if writer is None:
+            writer = self.writers[symbol] = SymbolBusWriter(symbol, self.prefix, self.replace_stale)
+        return writer
+
+    def detach(self, symbol):
+        writer = self.writers.pop(symbol, None)
+        if writer is not None:
+            writer.close()
+
+    def write_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest) or ".", exist_ok=True)
+        tmp = f"{self.manifest}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": LAYOUT_VERSION, "prefix": self.prefix, "pid": os.getpid(),
+                       "kline_fields": KLINE_FIELDS, "max_klines": MAX_KLINES, "depth_levels": DEPTH_LEVELS,
+                       "symbols": sorted(self.writers)}, f)
+        os.replace(tmp, self.manifest)
+
+    def close(self):
+        for symbol in list(self.writers):
+            self.detach(symbol)
+        try:
+            os.remove(self.manifest)
+        except FileNotFoundError:
+            pass
+
+
+def published_symbols(manifest=None):
+    """
+    Okuyucu process'ler için: yayındaki paritelerin listesi ve segment ön eki.
+    """
+    with open(manifest or Config.MARKET_BUS_MANIFEST, "r", encoding="utf-8") as f:
+        info = json.load(f)
+    return info["symbols"], info["prefix"]
+
+
+def published_buses(manifest=None):
+    """
+    Tüm yayınlar (tekil ve shard manifestleri birleşik): {parite: segment ön eki}.
+    """
+    base, ext = os.path.splitext(manifest or Config.MARKET_BUS_MANIFEST)
+    out = {}
+    for path in sorted(glob.glob(f"{base}{ext}") + glob.glob(f"{base}.*{ext}")):
+        try:
+            symbols, prefix = published_symbols(path)
+        except (OSError, ValueError, KeyError):
+            continue
+        out.update(dict.fromkeys(symbols, prefix))
+    return out
@@ -1,8 +1,11 @@
 # core/meta_decision_engine.py
 
 from core.strategy_manager import StrategyManager
-from core.self_learning import update_meta_weights
+from core.self_learning import update_meta_weights, update_meta_weights_batch
+from core.agent_result import AgentResultBatch, AgentResultMatrix, TYPE_CODES
+from core.strategy_manager import DIRECTION_NAMES
 from datetime import datetime
+import numpy as np
 
 class MetaDecisionEngine:
     """
@@ -19,29 +22,29 @@ class MetaDecisionEngine:
         Bir parite için tüm ajan skorlarını, riskleri, anomaly ve konsensusu tartarak
         yön (long/short/none), scalp/orta vade, pozisyon boyutu, risk ve detaylı açıklama üretir.
         """
-        # 1. Tüm skorları ve feature’ları normalize edip dinamik ağırlıklandır
-        total_weight = sum(a.get("weight", 1.0) for a in agent_results)
-        weighted_scores = [a.get("score", 0) * a.get("weight", 1.0) for a in agent_results]
-        risk_alerts = [a for a in agent_results if a.get("risk", 0) > 0.7]
-        consensus = self._consensus_score(agent_results)
-        edge_strength = sum(weighted_scores) / (total_weight or 1)
-        explanations = [a.get("explanation", "") for a in agent_results if a.get("explanation")]
-        anomalies = [a for a in agent_results if a.get("anomaly", False)]
-        strategy_type = self._detect_strategy_type(agent_results)
-        direction = self._decide_direction(agent_results, consensus, edge_strength)
+        # 1. Tüm skorları ve feature’ları normalize edip dinamik ağırlıklandır (kolon bazlı, tek geçiş)
+        batch = AgentResultBatch.of(agent_results)
+        agent_results = batch.results
+        total_weight = batch.weight.sum()
+        risk_alerts = batch.select(batch.risk > 0.7)
+        consensus = self._consensus_score(batch)
+        edge_strength = float((batch.score * batch.weight).sum() / (total_weight or 1))
+        anomalies = batch.select(batch.anomaly)
+        strategy_type = self._detect_strategy_type(batch)
+        direction = self._decide_direction(batch, consensus, edge_strength)
 
         # Dump-pump veya anomaly riski varsa otomatik koruma
-        if any(a.get("dump_pump", False) or a.get("anomaly", False) for a in agent_results):
+        if batch.veto:
             direction = "none"
             reason = "Yüksek dump/pump riski veya anomaly tespit edildi. İşlem açma!"
         else:
-            reason = self._explanation_block(explanations, agent_results, consensus, edge_strength)
+            reason = self._explanation_block(agent_results, consensus, edge_strength)
 
         # 2. Strateji önerisi (pozisyon büyüklüğü, stop/kar-al, scalp/orta vade ayrımı)
-        strategy = StrategyManager.suggest_position(symbol, strategy_type, direction, agent_results, edge_strength)
+        strategy = StrategyManager.suggest_position(symbol, strategy_type, direction, batch, edge_strength)
 
         # 3. Risk filtrelemesi (pozisyon önerisi ve risk uyumu)
-        safe, risk_explanation = StrategyManager.filter_risk(agent_results, edge_strength)
+        safe, risk_explanation = StrategyManager.filter_risk(batch, edge_strength)
 
         final_decision = {
             "symbol": symbol,
@@ -63,11 +66,76 @@ class MetaDecisionEngine:
 
         return final_decision
 
-    def _detect_strategy_type(self, agent_results):
+    def decide_batch(self, batch_results, update_weights=True):
+        """
+        decide()'ın tüm pariteler için tek geçişlik vektörel hali.
+        batch_results: {symbol: [AgentResult, ...]} — (parite × ajan) matrisine açılır;
+        edge, konsensus, yön, strateji tipi, pozisyon ve risk filtresi satır bazlı hesaplanır.
+        {symbol: final_decision} döner.
+        """
+        m = AgentResultMatrix(batch_results)
+        if not len(m):
+            return {}
+        counts = m.counts
+        total_weight = m.weight.sum(axis=1)
+        edge_strength = (m.score * m.weight).sum(axis=1) / np.where(total_weight == 0, 1, total_weight)
+
+        longs = m.direction == 1
+        shorts = m.direction == -1
+        consensus = np.maximum(longs.sum(axis=1), shorts.sum(axis=1)) / np.maximum(counts, 1)
+        pos = (longs & (m.score > 0)).sum(axis=1)
+        neg = (shorts & (m.score < 0)).sum(axis=1)
+        confirmed = consensus > 0.65
+        directions = np.where((pos > neg) & (edge_strength > 0.5) & confirmed, 1,
+                              np.where((neg > pos) & (edge_strength < -0.5) & confirmed, -1, 0))
+        # Dump-pump veya anomaly riski varsa otomatik koruma
+        veto = m.veto
+        directions = np.where(veto, 0, directions).astype(np.int8)
+
+        scalp_count = (m.type_code == TYPE_CODES["scalp"]).sum(axis=1)
+        midterm_count = (m.type_code == TYPE_CODES["midterm"]).sum(axis=1)
+        strategy_types = np.where(scalp_count > midterm_count, "scalp",
+                                  np.where(midterm_count > scalp_count, "midterm", "hybrid"))
+
+        strategies = StrategyManager.suggest_positions(m, strategy_types, directions, edge_strength)
+        safe, risk_explanations = StrategyManager.filter_risks(m, edge_strength)
+        anomaly_rows = m.anomaly.any(axis=1)
+        alert_rows = ((m.risk > 0.7) & m.valid).any(axis=1)
+
+        timestamp = datetime.utcnow().isoformat()
+        decisions = {}
+        for i, symbol in enumerate(m.symbols):
+            results = m.results[i]
+            edge, cons = float(edge_strength[i]), float(consensus[i])
+            if veto[i]:
+                reason = "Yüksek dump/pump riski veya anomaly tespit edildi. İşlem açma!"
+            else:
+                reason = self._explanation_block(results, cons, edge)
+            decisions[symbol] = {
+                "symbol": symbol,
+                "timestamp": timestamp,
+                "direction": DIRECTION_NAMES[int(directions[i])],
+                "strategy": strategies[i],
+                "edge_strength": edge,
+                "consensus": cons,
+                "safe": bool(safe[i]),
+                "reason": reason,
+                "risk_explanation": risk_explanations[i],
+                "details": results,
+                "anomalies": [r for r in results if r.anomaly] if anomaly_rows[i] else [],
+                "risk_alerts": [r for r in results if r.risk > 0.7] if alert_rows[i] else [],
+            }
+
+        # Self-learning ağırlık güncellemesi (tek dosya okuma/yazma)
+        if update_weights:
+            update_meta_weights_batch(decisions.values())
+        return decisions
+
+    def _detect_strategy_type(self, batch):
         """
         Agent çıktılarından, ağırlıklı olarak scalp/orta vade/tuzak algısı çıkartır.
         """
-        types = [a.get("type", "unknown") for a in agent_results]
+        types = batch.types
         scalp_count = types.count("scalp")
         midterm_count = types.count("midterm")
         if scalp_count > midterm_count:
@@ -77,12 +145,12 @@ class MetaDecisionEngine:
         else:
             return "hybrid"
 
-    def _decide_direction(self, agent_results, consensus, edge_strength):
+    def _decide_direction(self, batch, consensus, edge_strength):
         """
         Ajan skorları ve konsensus ile yön kararını (long/short/none) verir.
         """
-        pos = sum(1 for a in agent_results if a.get("direction") == "long" and a.get("score", 0) > 0)
-        neg = sum(1 for a in agent_results if a.get("direction") == "short" and a.get("score", 0) < 0)
+        pos = int(np.count_nonzero((batch.direction == 1) & (batch.score > 0)))
+        neg = int(np.count_nonzero((batch.direction == -1) & (batch.score < 0)))
 
         if pos > neg and edge_strength > 0.5 and consensus > 0.65:
             return "long"
@@ -91,26 +159,33 @@ class MetaDecisionEngine:
         else:
             return "none"
 
-    def _consensus_score(self, agent_results):
+    def _consensus_score(self, batch):
         """
         Tüm ajanlar arasında pozitif/negatif onay derecesini ölçer.
         """
-        total = len(agent_results)
-        longers = sum(1 for a in agent_results if a.get("direction") == "long")
-        shorters = sum(1 for a in agent_results if a.get("direction") == "short")
+        total = len(batch)
+        longers = int(np.count_nonzero(batch.direction == 1))
+        shorters = int(np.count_nonzero(batch.direction == -1))
         return max(longers, shorters) / (total or 1)
 
-    def _explanation_block(self, explanations, agent_results, consensus, edge_strength):
+    def _explanation_block(self, agent_results, consensus, edge_strength):
         """
         Açıklamaları ve nedenleri insan gibi özetler.
         """
-        base = " | ".join(explanations[:3])  # En güçlü 3 nedeni öne çıkar
+        # En güçlü 3 nedeni öne çıkar (lazy açıklamalar yalnızca gerektiği kadar formatlanır)
+        explanations = []
+        for a in agent_results:
+            if len(explanations) == 3:
+                break
+            if a.explanation:
+                explanations.append(a.explanation)
+        base = " | ".join(explanations)
         base += f"\nEdge Strength: {edge_strength:.2f}, Consensus: {consensus:.2%}."
 
         for a in agent_results:
-            if a.get("dump_pump", False):
+            if a.dump_pump:
                 base += " | Dump/pump tehlikesi!"
-            if a.get("spoofing", False):
+            if a.spoofing:
                 base += " | Orderbook manipülasyonu riski!"
             if a.get("whale_transfer", False):
                 base += " | Whale hareketi!"
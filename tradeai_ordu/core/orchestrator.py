@@ -1,12 +1,30 @@
 # core/orchestrator.py
 
 import asyncio
+import time
 from core.data_pipeline import DataPipeline
 from core.agent_pool import AgentPool
 from core.meta_decision_engine import MetaDecisionEngine
 from core.strategy_manager import StrategyManager
 from core.self_learning import update_agent_stats, get_agent_weights, update_meta_weights
 from core.reporting import send_report, log_decision
+from core.signal_selector import SignalSelector
+from core.deadline_scheduler import DeadlineScheduler
+from core.universe_screener import UniverseScreener
+from core.anomaly_engine import AnomalyEngine
+from core.correlation_engine import CorrelationEngine
+from config.config import Config
+
+async def publish_decision(dec):
+    """
+    Seçilen sinyali raporlar, loglar ve öğrenme istatistiklerini günceller.
+    """
+    # Telegram isteği event loop'u (ve devam eden analizleri) bloklamasın
+    await asyncio.to_thread(send_report, dec)
+    log_decision(dec)
+    update_agent_stats(dec)
+    update_meta_weights(dec)
+
 
 class Orchestrator:
     """
@@ -23,48 +41,178 @@ class Orchestrator:
         self.agent_pool = agent_pool if agent_pool is not None else AgentPool()
         self.meta_engine = decision_engine if decision_engine is not None else MetaDecisionEngine()
         self.strategy_manager = strategy_manager if strategy_manager is not None else StrategyManager()
+        # Döngü bütçesi ve volatilite/sinyal bazlı parite önceliği
+        self.scheduler = DeadlineScheduler()
+        # Ucuz ön eleme: derin analiz maliyeti listeleme sayısıyla değil K ile ölçeklenir
+        self.screener = UniverseScreener() if Config.SCREEN_ENABLED else None
+        self.open_signals = set()  # son kararı yönlü ve güvenli olan pariteler (her zaman derin analize girer)
+        # Çok değişkenli online anomaly skorları snapshot'lara ajanlardan önce yazılır
+        self.anomaly_engine = AnomalyEngine() if Config.ANOMALY_ENGINE_ENABLED else None
+        # Benchmark betası ve artık (idiosyncratic) getiri: hareket piyasa geneli mi, pariteye özgü mü
+        self.correlation_engine = CorrelationEngine(interval=interval) if Config.CORRELATION_ENGINE_ENABLED else None
 
-    async def run_once(self):
+    async def run_once(self, symbols=None):
         """
         Tek bir döngüde tüm pipeline’ı çalıştırır.
+        symbols verilirse sadece o pariteler (event-driven tetikleme) analiz edilir.
         """
-        print(">> Veri çekiliyor...")
-        batch_data_list = await self.data_pipeline.batch_fetch()
-        batch_data = {d["symbol"]: d for d in batch_data_list if d is not None}
+        all_decisions, reported = await self.analyze_cycle(symbols, on_signal=publish_decision)
+        print(f">> {len(reported)} karar bildirildi.")
+        return all_decisions
 
-        print(">> Ajan analizleri başlatıldı...")
-        agent_results = {}
-        for symbol, data in batch_data.items():
-            results = await self.agent_pool.analyze_symbol(data)
-            agent_results[symbol] = results
+    async def analyze_cycle(self, symbols=None, on_signal=None):
+        """
+        Veri -> ajan -> karar aşamalarını çalıştırır, raporlamayı çağırana bırakır.
+        (tüm kararlar, strateji başına top-N aday listesi) döner; on_signal verilirse
+        sıralaması kesinleşen adaylar döngü bitmeden bu callback'e verilir.
+        Shard worker'lar adayları coordinator'a gönderir, tek process modunda run_once raporlar.
+        """
+        cycle_start = time.monotonic()
+        screened = False
+        if symbols is None:
+            symbols = self.symbols
+            if self.screener is not None and await self.screener.refresh():
+                symbols = self.screener.select(symbols, self.open_signals)
+                screened = True
+                print(f">> Ön eleme: {len(symbols)}/{len(self.symbols)} parite derin analize alındı (K={self.screener.k}).")
+        # En işlem görebilir pariteler önce; bütçe biterse kalanlar sonraki döngüye ertelenir
+        planned = self.scheduler.order(symbols)
+
+        print(">> Veri çekiliyor...")
+        batch_data_list = await self.data_pipeline.batch_fetch(planned, deadline=self.scheduler.fetch_deadline(cycle_start))
+        # Çekim sürerken evrenden çıkarılan pariteler analiz edilmez (ajan durumu yeniden oluşmasın)
+        listed = set(self.symbols)
+        batch_data = {d["symbol"]: d for d in batch_data_list if d is not None and d["symbol"] in listed}
+        health = self.data_pipeline.health.summary()
+        if health["stale_symbols"]:
+            print(f">> Feed sağlığı: {len(health['stale_symbols'])} parite REST'te "
+                  f"(kline {health['kline']['healthy']}/{health['kline']['total']}, "
+                  f"depth {health['depth']['healthy']}/{health['depth']['total']} sağlıklı WS)")
+        if self.anomaly_engine is not None:
+            self.anomaly_engine.score_batch(batch_data.values())
+        if self.correlation_engine is not None:
+            extra = await self._benchmark_klines(batch_data)
+            self.correlation_engine.observe(batch_data.values(), extra)
+            self.correlation_engine.apply(batch_data.values())
 
-        print(">> Nihai karar ve strateji belirleniyor...")
+        print(">> Ajan analizleri ve kararlar başlatıldı...")
+        started = time.monotonic()
+        remaining = self.scheduler.deadline(cycle_start)
+        selector = SignalSelector(total=len(batch_data))
         all_decisions = {}
-        for symbol, results in agent_results.items():
-            final_decision = self.meta_engine.decide(symbol, results)
+        candidates = []
+        # Pariteler MAX_PARALLEL_SYMBOL sınırıyla paralel; biten pariteler micro-batch halinde
+        # vektörel karar motorundan geçer, sıralaması kesinleşen sinyaller hemen raporlanır
+        async for chunk in self.agent_pool.stream_batch(batch_data, deadline=None if remaining is None else max(remaining, 1e-3)):
+            decisions = self.meta_engine.decide_batch(chunk)
+            all_decisions.update(decisions)
+            for symbol, dec in decisions.items():
+                self.scheduler.observe(batch_data[symbol], dec)
+                if dec["direction"] != "none" and dec["safe"]:
+                    self.open_signals.add(symbol)
+                    # Ajan geçmişinin win_count'u bu sinyal yönüyle eşleşmeyi sayar
+                    self.agent_pool.record_trade(symbol, dec["direction"], {r.agent_name for r in dec["details"]})
+                else:
+                    self.open_signals.discard(symbol)
+            for dec in selector.push(decisions.values()):
+                candidates.append(dec)
+                if on_signal is not None:
+                    await on_signal(dec)
+        print(f">> {len(all_decisions)}/{len(batch_data)} parite {time.monotonic() - started:.2f}s içinde analiz edildi.")
 
-            strategy_type = final_decision["strategy"].get("strategy", "hybrid")
-            direction = final_decision.get("direction", "none")
-            edge_strength = final_decision.get("edge_strength", 0.0)
-            safe, risk_explanation = self.strategy_manager.filter_risk(results, edge_strength)
+        for dec in selector.finish():
+            candidates.append(dec)
+            if on_signal is not None:
+                await on_signal(dec)
 
-            position_info = self.strategy_manager.suggest_position(symbol, strategy_type, direction, results, edge_strength)
-            final_decision["strategy"] = position_info
-            final_decision["safe"] = safe
-            final_decision["risk_explanation"] = risk_explanation
+        summary = self.scheduler.finish_cycle(planned, all_decisions)
+        if screened:
+            self.screener.resize(summary, time.monotonic() - cycle_start, self.scheduler.budget)
+        if summary["deferred"]:
+            print(f">> Bütçe aşıldı: {summary['deferred']}/{summary['planned']} parite ertelendi "
+                  f"(hiç analiz edilmemiş: {summary['never_analyzed']}, en bayat: {summary['stalest']})")
+        return all_decisions, candidates
 
-            all_decisions[symbol] = final_decision
+    async def _benchmark_klines(self, batch_data):
+        """
+        Bu döngüde snapshot'ı olmayan benchmark'ların mumları (shard'da başka worker'a düşmüş
+        ya da ön elemede seçilmemiş olabilirler).
+        """
+        engine = self.correlation_engine
+        extra = {}
+        for symbol in engine.benchmarks:
+            if symbol in batch_data:
+                continue
+            try:
+                extra[symbol] = await self.data_pipeline.reference_klines(symbol, engine.klines_needed())
+            except Exception as ex:
+                print(f"[CorrelationEngine] {symbol} benchmark mumları alınamadı: {ex}")
+        return extra
 
-        best_scalp = self._select_best(all_decisions, "scalp", n=5)
-        best_midterm = self._select_best(all_decisions, "midterm", n=5)
+    def update_symbols(self, symbols):
+        """
+        Parite evrenini tek atamayla değiştirir (süren döngü eski listeyle biter);
+        çıkan paritelerin ajan, öncelik, ön eleme ve sinyal durumunu serbest bırakır.
+        """
+        removed = set(self.symbols) - set(symbols)
+        self.symbols = list(symbols)
+        self.agent_pool.evict(removed)
+        for symbol in removed:
+            self.scheduler.evict(symbol)
+            if self.screener is not None:
+                self.screener.evict(symbol)
+            if self.anomaly_engine is not None:
+                self.anomaly_engine.evict(symbol)
+            if self.correlation_engine is not None and symbol not in self.correlation_engine.benchmarks:
+                self.correlation_engine.evict(symbol)
+            self.open_signals.discard(symbol)
+        return removed
 
-        for dec in best_scalp + best_midterm:
-            await send_report(dec)
-            log_decision(dec)
-            update_agent_stats(dec)
-            update_meta_weights(dec)
+    def checkpoint_state(self):
+        """
+        Karar durumu: açık sinyaller, parite öncelik girdileri ve ön eleme EWMA'ları.
+        Monotonic zamanlar süreç dışında anlamsız olduğundan "kaç sn önce" olarak saklanır.
+        """
+        now = time.monotonic()
+        meta = {
+            "open_signals": sorted(self.open_signals),
+            "scheduler": {
+                "features": {s: list(f) for s, f in self.scheduler.features.items()},
+                "ages": {s: now - t for s, t in self.scheduler.last_done.items()},
+                "misses": dict(self.scheduler.misses),
+            },
+        }
+        if self.screener is not None:
+            meta["screener"] = {
+                "k": self.screener.k,
+                "last_price": dict(self.screener.last_price),
+                "ret_mean": dict(self.screener.ret_mean),
+                "ret_var": dict(self.screener.ret_var),
+            }
+        return {}, meta
 
-        print(f">> {len(best_scalp) + len(best_midterm)} karar bildirildi.")
+    def restore_state(self, arrays, meta, symbols=None):
+        listed = set(self.symbols if symbols is None else symbols)
+        self.open_signals.update(s for s in meta.get("open_signals", []) if s in listed)
+        sched = meta.get("scheduler", {})
+        now = time.monotonic()
+        for s, f in sched.get("features", {}).items():
+            if s in listed:
+                self.scheduler.features[s] = tuple(f)
+        for s, age in sched.get("ages", {}).items():
+            if s in listed:
+                self.scheduler.last_done[s] = now - age - meta.get("downtime", 0.0)
+        for s, n in sched.get("misses", {}).items():
+            if s in listed:
+                self.scheduler.misses[s] = n
+        screen = meta.get("screener")
+        if screen and self.screener is not None:
+            self.screener.k = screen["k"]
+            self.screener.ret_mean.update(screen["ret_mean"])
+            self.screener.ret_var.update(screen["ret_var"])
+            # Uzun kesintide son fiyatlardan hesaplanan ilk getiri sahte z-skorları üretir
+            if meta.get("downtime", 0.0) <= 2 * Config.ANALYSIS_INTERVAL:
+                self.screener.last_price.update(screen["last_price"])
 
     async def run_forever(self, delay_sec=60):
         while True:
@@ -73,11 +221,3 @@ class Orchestrator:
             except Exception as ex:
                 print(f"[Orchestrator] Kritik hata: {ex}")
             await asyncio.sleep(delay_sec)
-
-    def _select_best(self, all_decisions, strategy_type, n=5):
-        filtered = [
-            dec for dec in all_decisions.values()
-            if dec["strategy"]["strategy"] == strategy_type and dec["direction"] != "none" and dec["safe"]
-        ]
-        best = sorted(filtered, key=lambda d: abs(d["edge_strength"]), reverse=True)[:n]
-        return best
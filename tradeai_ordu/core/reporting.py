@@ -1,10 +1,22 @@
 # core/reporting.py
 
-import requests
 from config.config import Config
 import json
 from datetime import datetime
 import os
+import numpy as np
+
+def json_default(obj):
+    """
+    AgentResult, NumPy skaler/dizileri ve datetime'ı JSON'a çevirir.
+    """
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
 
 def format_report(final_decision):
     """
@@ -51,6 +63,7 @@ def send_report(final_decision):
         "parse_mode": "Markdown"
     }
     try:
+        import requests  # sadece rapor gönderilirken yüklenir
         response = requests.post(url, data=data, timeout=8)
         if response.status_code != 200:
             print(f"[Reporting] Telegram error: {response.text}")
@@ -68,7 +81,7 @@ def log_decision(final_decision, log_path="logs/decisions.log"):
         **final_decision
     }
     with open(log_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.write(json.dumps(record, ensure_ascii=False, default=json_default) + "\n")
 
 # Kullanım örneği:
 # msg = send_report(final_decision)
@@ -0,0 +1,98 @@
+# core/ring_buffer.py
+
+import numpy as np
+from config.config import Config
+
+DIRECTION_CODES = {"none": 0, "long": 1, "short": -1}
+
+
+class HistoryRing:
+    """
+    Ajan karar geçmişi için sabit boyutlu, kompakt ring buffer.
+    Her kayıt: score/confidence/risk (float32), direction ve o kararın ardından verilen sinyalin
+    yönü (trade_result, int8; 0: sinyal yok). trade_result Orchestrator -> AgentRegistry.record_trade ile dolar.
+    Bellek kullanımı kapasite ile sınırlıdır; eski kayıtların üzerine yazılır.
+    """
+    __slots__ = ("capacity", "score", "confidence", "risk", "direction", "trade_result", "_head", "_size")
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity or Config.AGENT_HISTORY_SIZE
+        self.score = np.zeros(self.capacity, dtype=np.float32)
+        self.confidence = np.zeros(self.capacity, dtype=np.float32)
+        self.risk = np.zeros(self.capacity, dtype=np.float32)
+        self.direction = np.zeros(self.capacity, dtype=np.int8)
+        self.trade_result = np.zeros(self.capacity, dtype=np.int8)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, score, confidence, risk, direction):
+        i = self._head
+        self.score[i] = score
+        self.confidence[i] = confidence
+        self.risk[i] = risk
+        self.direction[i] = DIRECTION_CODES.get(direction, 0)
+        self.trade_result[i] = 0
+        self._head = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def set_trade_result(self, direction):
+        """
+        Son kararın gerçekleşen trade yönünü işaretler (feedback için).
+        """
+        if self._size:
+            self.trade_result[(self._head - 1) % self.capacity] = DIRECTION_CODES.get(direction, 0)
+
+    def _window(self, n):
+        n = min(n, self._size)
+        return (self._head - n + np.arange(n)) % self.capacity
+
+    def last(self, field, n):
+        """
+        Bir alanın son n değerini (eskiden yeniye) döner.
+        """
+        return getattr(self, field)[self._window(n)]
+
+    def win_count(self, window, min_score=0.1):
+        """
+        Son `window` kararda sinyal verilmiş (trade_result != 0), yönü sinyalle eşleşen ve
+        skoru min_score'u geçenlerin sayısı.
+        """
+        idx = self._window(window)
+        traded = self.trade_result[idx]
+        return int(np.count_nonzero((traded != 0) & (self.direction[idx] == traded) & (self.score[idx] > min_score)))
+
+    def count_below(self, window, threshold):
+        """
+        Son `window` kararda |score| < threshold olanların sayısı.
+        """
+        idx = self._window(window)
+        return int(np.count_nonzero(np.abs(self.score[idx]) < threshold))
+
+
+RING_FIELDS = ("score", "confidence", "risk", "direction", "trade_result")
+
+
+def pack_rings(rings):
+    """
+    Aynı kapasiteli ring'leri checkpoint için (K, kapasite) dizilerine yığar.
+    """
+    out = {f: np.stack([getattr(r, f) for r in rings]) for f in RING_FIELDS}
+    out["head"] = np.array([r._head for r in rings], dtype=np.int64)
+    out["size"] = np.array([r._size for r in rings], dtype=np.int64)
+    return out
+
+
+def unpack_ring(arrays, i):
+    """
+    pack_rings çıktısındaki i. ring'i (kopyalayarak) yeniden kurar.
+    """
+    capacity = arrays["score"].shape[1]
+    ring = HistoryRing(capacity)
+    for f in RING_FIELDS:
+        getattr(ring, f)[:] = arrays[f][i]
+    ring._head = int(arrays["head"][i])
+    ring._size = int(arrays["size"][i])
+    return ring
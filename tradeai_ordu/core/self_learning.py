@@ -98,6 +98,19 @@ def update_meta_weights(final_decision):
 
     save_stats(META_WEIGHTS_PATH, weights)
 
+def update_meta_weights_batch(final_decisions):
+    """
+    update_meta_weights'in çoklu karar hali: dosya bir kez okunur, bir kez yazılır.
+    """
+    weights = load_stats(META_WEIGHTS_PATH)
+    for final_decision in final_decisions:
+        key = f"{final_decision.get('symbol', 'ALL')}_{final_decision.get('direction', 'none')}"
+        if final_decision.get("safe", False):
+            weights[key] = weights.get(key, 1.0) + 0.05
+        else:
+            weights[key] = max(0.1, weights.get(key, 1.0) - 0.05)
+    save_stats(META_WEIGHTS_PATH, weights)
+
 def autoedge_discovery(new_pattern):
     """
     Yeni edge veya anomaly patternlerini kaydeder.
@@ -0,0 +1,220 @@
+# core/shard_cluster.py
+
+import asyncio
+import json
+import os
+from config.config import Config
+from core.reporting import json_default
+from core.signal_selector import SignalSelector
+from core.orchestrator import publish_decision
+from core.hash_ring import universe_version
+from core.universe_manager import UniverseGuard
+
+# Aday listeleri (ajan detaylarıyla) varsayılan 64KB satır sınırını aşabilir
+STREAM_LIMIT = 2 ** 24
+
+
+class ShardWorker:
+    """
+    Parite evreninin bir consistent-hash bölümüne sahip worker.
+    Kendi pipeline/WS/ajan havuzunu çalıştırır; coordinator'ın "cycle" isteğine
+    kendi top-N adaylarını döner (raporlama coordinator'da yapılır).
+    Parite evreni coordinator'dan gelir ("universe" isteği); worker kendi bölümünü
+    universe (bu shard'a bölümlenmiş UniverseManager) ile uygular ve evren versiyonunu yanıtlarına ekler.
+    """
+
+    def __init__(self, name, orchestrator, universe=None, version=None):
+        self.name = name
+        self.orchestrator = orchestrator
+        self.universe = universe
+        self.universe_version = version
+        self.server = None
+
+    async def run_cycle(self):
+        _, candidates = await self.orchestrator.analyze_cycle()
+        return {"shard": self.name, "symbols": len(self.orchestrator.symbols),
+                "universe_version": self.universe_version, "candidates": candidates}
+
+    async def apply_universe(self, symbols, version):
+        if self.universe is None:
+            raise ValueError("bu worker evren güncellemesi kabul etmiyor")
+        await self.universe.apply(symbols)
+        self.universe_version = version
+        return {"shard": self.name, "symbols": len(self.orchestrator.symbols), "universe_version": version}
+
+    async def handle(self, request):
+        cmd = request.get("cmd")
+        if cmd == "cycle":
+            return await self.run_cycle()
+        if cmd == "universe":
+            return await self.apply_universe(request["symbols"], request["version"])
+        if cmd == "ping":
+            return {"shard": self.name, "symbols": len(self.orchestrator.symbols)}
+        if cmd == "health":
+            return {"shard": self.name, "health": self.orchestrator.data_pipeline.health.summary()}
+        return {"shard": self.name, "error": f"bilinmeyen komut: {cmd}"}
+
+    async def _on_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    reply = await self.handle(json.loads(line))
+                except Exception as ex:
+                    reply = {"shard": self.name, "error": str(ex)}
+                writer.write(json.dumps(reply, ensure_ascii=False, default=json_default).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, address):
+        """
+        "unix:/yol/shard.sock" veya "tcp:host:port" adresinde satır bazlı JSON isteklerini dinler.
+        """
+        kind, _, target = address.partition(":")
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            self.server = await asyncio.start_unix_server(self._on_client, path=target, limit=STREAM_LIMIT)
+        elif kind == "tcp":
+            host, _, port = target.rpartition(":")
+            self.server = await asyncio.start_server(self._on_client, host or "0.0.0.0", int(port), limit=STREAM_LIMIT)
+        else:
+            raise ValueError(f"Desteklenmeyen shard adresi: {address}")
+        print(f"[ShardWorker] {self.name} {address} adresinde dinliyor ({len(self.orchestrator.symbols)} parite).")
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+class InProcessTransport:
+    """
+    Aynı process içindeki worker'a doğrudan çağrı (yerel test / tek makine).
+    """
+
+    def __init__(self, worker):
+        self.worker = worker
+        self.name = worker.name
+
+    async def request(self, message):
+        return await self.worker.handle(message)
+
+
+class StreamTransport:
+    """
+    Unix socket veya TCP üzerinden satır bazlı JSON istek/yanıt.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.name = address
+
+    async def _connect(self):
+        kind, _, target = self.address.partition(":")
+        if kind == "unix":
+            return await asyncio.open_unix_connection(target, limit=STREAM_LIMIT)
+        if kind == "tcp":
+            host, _, port = target.rpartition(":")
+            return await asyncio.open_connection(host, int(port), limit=STREAM_LIMIT)
+        raise ValueError(f"Desteklenmeyen shard adresi: {self.address}")
+
+    async def request(self, message):
+        reader, writer = await self._connect()
+        try:
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError(f"{self.address} yanıt vermedi")
+            return json.loads(line)
+        finally:
+            writer.close()
+
+
+class ShardCoordinator:
+    """
+    Shard'lardan döngü başına top-N adaylarını toplar, global top-N'i seçip raporlar.
+    Her shard kendi bölümünün top-N'ini döndüğü için birleşim, tek process'te tüm
+    evren üzerinden yapılan seçimle aynıdır. Yanıt vermeyen shard o döngüde atlanır.
+    - Parite evreninin tek sahibi coordinator'dır: set_universe() ile verilen liste, versiyonu
+      farklı olan worker'lara döngüden önce gönderilir. Başka versiyonla yanıt veren shard'ın
+      adayları o döngüde alınmaz (çift/eksik parite olmaz), evren bir sonraki döngüde yeniden gönderilir.
+    """
+
+    def __init__(self, transports, timeout=None):
+        self.transports = list(transports)
+        # Worker kendi bütçesini uygular; coordinator biraz pay bırakır
+        self.timeout = timeout if timeout is not None else (Config.CYCLE_DEADLINE_SEC + 15 if Config.CYCLE_DEADLINE_SEC else None)
+        self.failures = {t.name: 0 for t in self.transports}
+        self.symbols = None
+        self.version = None
+        self.guard = UniverseGuard()
+        self.known_versions = {t.name: None for t in self.transports}
+
+    def set_universe(self, symbols):
+        if self.guard.listed is None:
+            self.guard.listed = list(symbols)
+        self.symbols = sorted(set(symbols))
+        self.version = universe_version(self.symbols)
+        return self.version
+
+    async def _push_universe(self, transport):
+        message = {"cmd": "universe", "version": self.version, "symbols": self.symbols}
+        reply = await asyncio.wait_for(transport.request(message), timeout=self.timeout)
+        if "error" in reply:
+            raise RuntimeError(f"evren gönderilemedi: {reply['error']}")
+        self.known_versions[transport.name] = reply["universe_version"]
+
+    async def _ask(self, transport):
+        if self.version is not None and self.known_versions[transport.name] != self.version:
+            await self._push_universe(transport)
+        return await asyncio.wait_for(transport.request({"cmd": "cycle"}), timeout=self.timeout)
+
+    async def collect(self):
+        replies = await asyncio.gather(*(self._ask(t) for t in self.transports), return_exceptions=True)
+        candidates = []
+        for transport, reply in zip(self.transports, replies):
+            if isinstance(reply, BaseException) or "error" in reply:
+                self.failures[transport.name] += 1
+                print(f"[ShardCoordinator] {transport.name} döngü hatası: {reply if isinstance(reply, BaseException) else reply['error']}")
+                continue
+            version = self.known_versions[transport.name] = reply.get("universe_version")
+            if self.version is not None and version != self.version:
+                # Worker arada yeniden başlamış olabilir; bölümü coordinator'ınkiyle aynı değil
+                print(f"[ShardCoordinator] {transport.name} evren versiyonu uyumsuz ({version} != {self.version}), adaylar atlandı.")
+                continue
+            candidates += reply["candidates"]
+        return candidates
+
+    async def refresh_universe(self, cache, interval=None):
+        """
+        exchangeInfo önbelleğinden evreni periyodik yeniler (UNIVERSE_REFRESH_SEC); değişiklik
+        bir sonraki döngüde worker'lara gider. Yenilemeler UniverseGuard'dan geçer.
+        """
+        interval = Config.UNIVERSE_REFRESH_SEC if interval is None else interval
+        # Açılışta bayat önbellekten başlanmışsa arka plan yenilemesinin sonucu hemen alınır
+        if cache.refresh_task is not None:
+            await cache.refresh_task
+            if cache.entry is not None:
+                try:
+                    self.set_universe(self.guard.accept(cache.entry["symbols"]))
+                except ValueError as ex:
+                    print(f"[ShardCoordinator] exchangeInfo yenilemesi uygulanmadı: {ex}")
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.set_universe(self.guard.accept(await cache.refresh()))
+            except Exception as ex:
+                print(f"[ShardCoordinator] exchangeInfo yenileme hatası: {ex}")
+
+    async def run_once(self, on_signal=None):
+        on_signal = on_signal or publish_decision
+        candidates = await self.collect()
+        selector = SignalSelector(total=len(candidates))
+        best = selector.push(candidates) + selector.finish()
+        for dec in best:
+            await on_signal(dec)
+        print(f">> {len(self.transports)} shard, {len(candidates)} aday -> {len(best)} karar bildirildi.")
+        return best
@@ -0,0 +1,199 @@
+# core/sharded_executor.py
+
+import asyncio
+import inspect
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from config.config import Config
+from core.snapshot import SymbolSnapshot
+from core.agent_registry import AgentRegistry
+from core.agent_graph import publish_signals
+
+# Shared memory üzerinden taşınmayan (küçük, pickle edilen) snapshot alanları
+_SKIP_FIELDS = ("klines_df", "klines")
+
+# --- Worker tarafı (her shard kendi process'inde) ---
+
+_WORKER_AGENTS = AgentRegistry()  # (ajan, parite) -> kalıcı ajan instance'ı
+_WORKER_LOOP = None     # async ajanlar için worker başına tek event loop
+
+
+def _worker_init():
+    global _WORKER_LOOP
+    _WORKER_LOOP = asyncio.new_event_loop()
+
+
+def _run_agent_in_worker(agent_cls, snapshot):
+    agent = _WORKER_AGENTS.get(agent_cls, snapshot)
+    if inspect.iscoroutinefunction(agent.analyze):
+        _WORKER_LOOP.run_until_complete(agent.analyze())
+    else:
+        agent.analyze()
+    return agent.result()
+
+
+def _evict_in_worker(symbols):
+    for symbol in symbols:
+        _WORKER_AGENTS.evict(symbol)
+
+
+def _analyze_shard(shm_name, shape, columns, metas, agent_classes):
+    """
+    Shard'daki tüm pariteleri analiz eder. Kline/indikatör matrisi shared memory'den
+    kopyasız okunur, sadece küçük meta alanlar pickle ile gelir.
+    """
+    # Worker'lar ana process'in resource tracker'ını paylaşır; segmenti ana process unlink eder
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        out = {}
+        for meta in metas:
+            start, end = meta.pop("_rows")
+            view = matrix[start:end]
+            df = pd.DataFrame(view, columns=columns, copy=False)
+            snapshot = SymbolSnapshot(
+                klines_df=df,
+                klines={c: view[:, i] for i, c in enumerate(columns)},
+                **meta,
+            )
+            results = []
+            # agent_classes stage sırasıyla gelir; ara sinyaller snapshot'a yazılır
+            for agent_cls in agent_classes:
+                try:
+                    res = _run_agent_in_worker(agent_cls, snapshot)
+                    publish_signals(agent_cls, res, snapshot)
+                    results.append(res)
+                except Exception as ex:
+                    print(f"[ShardWorker] {agent_cls.__name__} {snapshot.symbol} hatası: {ex}")
+            out[snapshot.symbol] = results
+            del df, view, snapshot
+        del matrix
+        return out
+    finally:
+        shm.close()
+
+
+# --- Ana process tarafı ---
+
+def shard_of(symbol, n_shards):
+    """
+    Pariteyi sabit (process'ler arası tutarlı) bir shard'a eşler.
+    """
+    return zlib.crc32(symbol.encode()) % n_shards
+
+
+class ShardedAgentRunner:
+    """
+    Pariteleri worker process'lere shard'layarak çok çekirdekli ajan analizi yapar.
+    - Her shard tek worker'lı ayrı bir process pool (aynı parite hep aynı worker'da)
+    - Kline/indikatör dizileri multiprocessing.shared_memory ile taşınır, pickle edilmez
+    - Worker tarafında ajan instance'ları parite bazında tekrar kullanılır
+    Sınırlar (Config.validate bu kombinasyonları açılışta reddeder):
+    - lazy/veto değerlendirme, analyze_batch ve ajan bazlı timeout uygulanmaz; her parite için
+      tüm ajanlar stage sırasıyla koşar
+    - Deadline shard bazlıdır: süresi dolan shard'ın tüm pariteleri o döngüde düşer
+    - Ajan geçmişleri worker process'lerde kalır, checkpoint'e girmez
+    """
+
+    def __init__(self, agent_classes, processes=None):
+        self.agent_classes = list(agent_classes)
+        self.processes = processes or Config.AGENT_PROCESSES or os.cpu_count() or 1
+        self.pools = [
+            ProcessPoolExecutor(max_workers=1, initializer=_worker_init)
+            for _ in range(self.processes)
+        ]
+
+    def _pack(self, snapshots):
+        """
+        Shard'a düşen snapshot'ların sayısal kolonlarını tek bir shared memory matrisine yazar.
+        """
+        columns = list(snapshots[0].klines.keys())
+        total = sum(len(s.klines_df) for s in snapshots)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, total * len(columns) * 8))
+        matrix = np.ndarray((total, len(columns)), dtype=np.float64, buffer=shm.buf)
+        metas = []
+        row = 0
+        for snap in snapshots:
+            n = len(snap.klines_df)
+            for i, c in enumerate(columns):
+                col = snap.klines.get(c)
+                matrix[row:row + n, i] = col if col is not None else np.nan
+            meta = {f.name: getattr(snap, f.name) for f in fields(SymbolSnapshot) if f.name not in _SKIP_FIELDS}
+            meta["_rows"] = (row, row + n)
+            metas.append(meta)
+            row += n
+        del matrix
+        return shm, (total, len(columns)), columns, metas
+
+    async def analyze_batch(self, batch_symbol_data, deadline=None):
+        """
+        Tüm batch'i shard'lara böler, paralel çalıştırır ve sonuçları birleştirir.
+        Deadline aşılırsa biten shard'ların sonuçları döner.
+        """
+        shards = {}
+        for symbol, snap in batch_symbol_data.items():
+            shards.setdefault(shard_of(symbol, self.processes), []).append(snap)
+
+        loop = asyncio.get_running_loop()
+        tasks = {}
+        pending = set()
+        try:
+            for idx, snaps in shards.items():
+                shm, shape, columns, metas = self._pack(snaps)
+                fut = loop.run_in_executor(
+                    self.pools[idx], _analyze_shard, shm.name, shape, columns, metas, self.agent_classes
+                )
+                task = asyncio.ensure_future(fut)
+                tasks[task] = (idx, shm)
+                pending.add(task)
+
+            merged = {}
+            started = time.monotonic()
+            while pending:
+                timeout = max(0.0, deadline - (time.monotonic() - started)) if deadline else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is not None:
+                        print(f"[ShardedAgentRunner] Shard {tasks[task][0]} hatası: {task.exception()}")
+                        continue
+                    merged.update(task.result())
+            if pending:
+                print(f"[ShardedAgentRunner] Deadline aşıldı: {len(pending)} shard sonucu beklenmedi.")
+            return merged
+        finally:
+            for task, (_, shm) in tasks.items():
+                if task in pending:
+                    # Worker hâlâ segmenti okuyor olabilir; shard bitince serbest bırakılır
+                    task.add_done_callback(lambda _t, m=shm: self._release(m))
+                else:
+                    self._release(shm)
+
+    def evict(self, symbols):
+        """
+        Listeden çıkan paritelerin worker'lardaki ajan instance'larını serbest bırakır
+        (her shard'ın tek worker'lı pool'u sırayla çalıştığı için analizlerle yarışmaz).
+        """
+        shards = {}
+        for symbol in symbols:
+            shards.setdefault(shard_of(symbol, self.processes), []).append(symbol)
+        for idx, group in shards.items():
+            self.pools[idx].submit(_evict_in_worker, group)
+
+    @staticmethod
+    def _release(shm):
+        shm.close()
+        shm.unlink()
+
+    def shutdown(self, wait=False):
+        for pool in self.pools:
+            pool.shutdown(wait=wait, cancel_futures=True)
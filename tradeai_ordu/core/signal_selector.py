@@ -0,0 +1,76 @@
+# core/signal_selector.py
+
+import heapq
+from config.config import Config
+
+
+class SignalSelector:
+    """
+    Kararları tamamlandıkça kabul eden akış tabanlı top-N seçici.
+    - Her strateji (scalp/midterm) için en fazla N elemanlı min-heap (|edge| sırası)
+    - Sıralaması artık değişemeyecek karar (kalan parite sayısı onu N dışına itemez) hemen yayınlanır
+    - early_edge > 0 ise bu eşiği geçen karar beklemeden yayınlanır (strateji başına en fazla N)
+    - finish() ile yayınlanmamış kalan top-N kararlar sırayla döner
+    Nihai seçim, tüm kararlar bittikten sonra |edge|'e göre sıralayıp ilk N'i almakla aynıdır
+    (early_edge açıkken eşiği geçen kararlar sonradan geçilse de raporlanmış olur).
+    """
+
+    def __init__(self, total, n=None, strategies=("scalp", "midterm"), early_edge=None):
+        self.n = n or Config.SIGNAL_N_BEST
+        self.remaining = total
+        self.early_edge = Config.SIGNAL_EARLY_EDGE if early_edge is None else early_edge
+        self.heaps = {s: [] for s in strategies}
+        self.emitted = {s: set() for s in strategies}
+        self._seq = 0
+
+    @staticmethod
+    def eligible(decision):
+        return decision["direction"] != "none" and decision["safe"]
+
+    def push(self, decisions):
+        """
+        Biten paritelerin kararlarını ekler; hemen yayınlanabilecek kararları döner.
+        decisions: bu parçada karar verilen tüm pariteler (uygun olmayanlar da kalan sayısını düşürür).
+        """
+        out = []
+        for dec in decisions:
+            self.remaining -= 1
+            heap = self.heaps.get(dec["strategy"]["strategy"])
+            if heap is None or not self.eligible(dec):
+                continue
+            # Eşitlikte önce gelen önde kalır (sorted(..., reverse=True) ile aynı)
+            entry = (abs(dec["edge_strength"]), -self._seq, dec)
+            self._seq += 1
+            if len(heap) < self.n:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+            else:
+                continue
+            if self.early_edge and entry[0] >= self.early_edge:
+                out += self._emit(dec)
+        for strategy, heap in self.heaps.items():
+            # rank + kalan parite < N ise karar N dışına itilemez
+            for rank, entry in enumerate(sorted(heap, key=lambda e: e[:2], reverse=True)):
+                if rank + self.remaining >= self.n:
+                    break
+                out += self._emit(entry[2])
+        return out
+
+    def _emit(self, dec):
+        strategy = dec["strategy"]["strategy"]
+        emitted = self.emitted[strategy]
+        if dec["symbol"] in emitted or len(emitted) >= self.n:
+            return []
+        emitted.add(dec["symbol"])
+        return [dec]
+
+    def finish(self):
+        """
+        Döngü sonu (veya deadline): yayınlanmamış top-N kararları strateji sırasıyla döner.
+        """
+        out = []
+        for heap in self.heaps.values():
+            for entry in sorted(heap, key=lambda e: e[:2], reverse=True):
+                out += self._emit(entry[2])
+        return out
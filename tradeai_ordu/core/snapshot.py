@@ -0,0 +1,258 @@
+# core/snapshot.py
+
+from dataclasses import dataclass, field, fields
+import numpy as np
+import pandas as pd
+
+# Ajanların klines_df üzerinden okuduğu kolonlar (snapshot kurulurken bir kez doğrulanır)
+REQUIRED_KLINE_COLUMNS = (
+    "open", "high", "low", "close", "volume",
+    "EMA_9", "EMA_21", "EMA_55", "SMA_200",
+    "MACD", "MACD_SIGNAL", "RSI_14", "STOCH_K", "CCI_20", "ROC",
+    "ATR_14", "Volatility",
+)
+MIN_KLINES = 2
+
+# Pipeline'ın her parite için son/önceki değerini önceden çıkardığı kolonlar
+LATEST_COLUMNS = (
+    "open", "high", "low", "close", "volume",
+    "EMA_9", "EMA_21", "EMA_55", "SMA_50", "SMA_100", "SMA_200",
+    "MACD", "MACD_SIGNAL", "MACD_DIFF", "RSI_14", "STOCH_K", "STOCH_D",
+    "CCI_20", "ROC", "BB_High", "BB_Low", "BB_Mid", "BB_Width",
+    "ATR_14", "Volatility", "OBV", "VPT", "Trend", "Momentum_Shock",
+)
+
+
+class LatestValues:
+    """
+    Her indikatör kolonunun son (`RSI_14`) ve bir önceki (`RSI_14_prev`) değerini tutan
+    kompakt struct. Ajanlar pandas .iloc yerine doğrudan attribute okur.
+    Eksik kolonlar NaN'dır.
+    """
+    __slots__ = LATEST_COLUMNS + tuple(f"{c}_prev" for c in LATEST_COLUMNS)
+
+    @classmethod
+    def from_columns(cls, columns):
+        lv = cls()
+        nan = float("nan")
+        for name in LATEST_COLUMNS:
+            values = columns.get(name)
+            n = len(values) if values is not None else 0
+            setattr(lv, name, float(values[-1]) if n else nan)
+            setattr(lv, f"{name}_prev", float(values[-2]) if n > 1 else nan)
+        return lv
+
+
+_EMPTY = np.empty(0, dtype=np.float64)
+_EMPTY_BOOK = np.empty((0, 2), dtype=np.float64)
+
+
+@dataclass(slots=True)
+class SymbolSnapshot:
+    """
+    DataPipeline -> ajanlar arası tipli veri sözleşmesi.
+    Pipeline her parite için bir kez kurar, tüm ajanlara kopyalamadan aynı obje verilir.
+    Kline/indikatör kolonları NumPy view, funding/OI ve orderbook önceden parse edilmiş dizilerdir.
+    """
+    symbol: str
+    interval: str = "15m"
+    timestamp: object = None
+    # Kline + indikatörler
+    klines_df: pd.DataFrame = None
+    klines: dict = field(default_factory=dict)          # kolon adı -> np.ndarray (df view)
+    latest: LatestValues = None                         # son/önceki indikatör değerleri
+    klines_df_1h: pd.DataFrame = None
+    klines_df_4h: pd.DataFrame = None
+    patterns: dict = field(default_factory=dict)
+    oscillator_alerts: list = field(default_factory=list)
+    volume_anomaly: float = 1.0
+    time_features: dict = field(default_factory=dict)
+    # Orderbook (n, 2) price/qty dizileri
+    orderbook_bids: np.ndarray = field(default_factory=lambda: _EMPTY_BOOK)
+    orderbook_asks: np.ndarray = field(default_factory=lambda: _EMPTY_BOOK)
+    orderbook_anomaly: dict = field(default_factory=dict)
+    # Funding / OI (float64, eskiden yeniye)
+    funding_rates: np.ndarray = field(default_factory=lambda: _EMPTY)
+    oi_changes: np.ndarray = field(default_factory=lambda: _EMPTY)
+    funding_time: int = 0                               # son funding kaydının fundingTime'ı (ms), 0: bilinmiyor
+    oi_time: int = 0                                    # son OI kaydının timestamp'i (ms), 0: bilinmiyor
+    # Whale / sentiment / onchain
+    whale_events: list = field(default_factory=list)
+    sentiment_news: float = 0.0
+    sentiment_social: float = 0.0
+    sentiment_onchain: float = 0.0
+    google_trend: float = 0.0
+    whale_sentiment: float = 0.0
+    sentiment_anomaly: float = 0.0
+    fake_news_flag: bool = False
+    spot_futures_ratio: float = 1.0
+    # Online anomaly motoru (core/anomaly_engine.py): robust mesafe ve feature başına z
+    anomaly_score: float = 0.0
+    anomaly_zscores: np.ndarray = field(default_factory=lambda: _EMPTY)
+    # Korelasyon/beta motoru (core/correlation_engine.py); NaN: motor bu parite için ısınmadı
+    market_beta: float = float("nan")                    # ilk benchmark'a (BTCUSDT) beta
+    market_corr: float = float("nan")
+    benchmark_betas: dict = field(default_factory=dict)  # benchmark -> beta
+    residual_return: float = float("nan")                # son mumun benchmark'tan arındırılmış getirisi
+    residual_z: float = float("nan")
+    # Ajanlar arası paylaşılan ara sinyaller
+    momentum_score: float = 0.0
+    dump_pump_flag: bool = False
+
+    # --- Dict uyumlu erişim (anahtarlar doğrulanır, sessizce None dönmez) ---
+
+    def get(self, key, default=None):
+        if key not in SNAPSHOT_FIELDS:
+            raise KeyError(f"SymbolSnapshot bilinmeyen alan: {key}")
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        if key not in SNAPSHOT_FIELDS:
+            raise KeyError(f"SymbolSnapshot bilinmeyen alan: {key}")
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in SNAPSHOT_FIELDS:
+            raise KeyError(f"SymbolSnapshot bilinmeyen alan: {key}")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in SNAPSHOT_FIELDS and getattr(self, key) is not None
+
+    def validate(self):
+        """
+        Ajanların ihtiyaç duyduğu kolon/uzunlukları bir kez kontrol eder.
+        Eksik veri ajan içinde değil, burada açık bir hata ile yakalanır.
+        """
+        df = self.klines_df
+        if df is None or len(df) < MIN_KLINES:
+            raise ValueError(f"{self.symbol}: en az {MIN_KLINES} mum gerekli")
+        missing = [c for c in REQUIRED_KLINE_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"{self.symbol}: eksik kline kolonları {missing}")
+        if not self.klines:
+            self.klines = kline_views(df)
+        if self.latest is None:
+            self.latest = LatestValues.from_columns(self.klines)
+        return self
+
+
+SNAPSHOT_FIELDS = frozenset(f.name for f in fields(SymbolSnapshot))
+
+
+def kline_views(df):
+    """
+    Sayısal kline/indikatör kolonlarını kopyasız NumPy view olarak döner.
+    """
+    return {c: df[c].to_numpy() for c in df.columns if pd.api.types.is_numeric_dtype(df[c])}
+
+
+def parse_funding(funding):
+    """
+    Binance fundingRate JSON'unu float64 diziye çevirir (hata cevabı -> boş dizi).
+    """
+    if not isinstance(funding, list):
+        return _EMPTY
+    return np.fromiter((float(r.get("fundingRate", 0)) for r in funding), dtype=np.float64, count=len(funding))
+
+
+def parse_open_interest(oi):
+    """
+    openInterestHist JSON'unu sumOpenInterest float64 dizisine çevirir.
+    """
+    if not isinstance(oi, list):
+        return _EMPTY
+    return np.fromiter((float(r.get("sumOpenInterest", 0)) for r in oi), dtype=np.float64, count=len(oi))
+
+
+def last_time(payload, key):
+    """
+    Binance kayıt listesinin son elemanının zaman damgası (ms); yoksa 0.
+    """
+    if not isinstance(payload, list) or not payload or not isinstance(payload[-1], dict):
+        return 0
+    return int(payload[-1].get(key) or 0)
+
+
+def sentiment_value(payload, key="score"):
+    """
+    Placeholder sentiment kaynaklarından skaler skor çıkarır.
+    """
+    if isinstance(payload, dict):
+        return float(payload.get(key, 0) or 0)
+    return float(payload or 0)
+
+
+# --- Vectorized batch API için (parite × feature) matrisi ---
+
+PATTERN_NAMES = (
+    "double_top", "double_bottom", "bullish_engulfing", "bearish_engulfing",
+    "doji", "breakout", "breakdown", "wedge",
+)
+
+
+def trend_slope(close, window):
+    """
+    Son `window` kapanışın doğrusal eğimi (np.polyfit(range(n), values, 1)[0] ile aynı, kapalı form).
+    Geçmiş kısaysa mevcut satırlarla hesaplanır; 2 satırdan azsa NaN. Skaler ve batch yol aynı kuralı kullanır.
+    """
+    values = np.asarray(close[-window:], dtype=np.float64)
+    n = len(values)
+    if n < 2:
+        return np.nan
+    x = np.arange(n, dtype=np.float64)
+    x -= x.mean()
+    return float(np.dot(x, values - values.mean()) / np.dot(x, x))
+
+
+def _feature_value(snap, name):
+    if snap.latest is not None and name in LATEST_COLUMNS:
+        return getattr(snap.latest, name)
+    if name in snap.klines:
+        return snap.klines[name][-1]
+    if name.startswith("pat_"):
+        return float(bool(snap.patterns.get(name[4:])))
+    if name.startswith("slope_"):
+        window = int(name[6:])
+        return trend_slope(snap.klines["close"], window)
+    if name == "volume_anomaly":
+        return snap.volume_anomaly
+    if name == "spoofing":
+        return float(bool(snap.orderbook_anomaly.get("spoofing", False)))
+    if name == "spread":
+        return snap.orderbook_anomaly.get("spread", 0)
+    if name == "whale_count":
+        return len(snap.whale_events)
+    if name == "osc_rsi_alert":
+        return float(any("RSI aşırı" in a for a in snap.oscillator_alerts))
+    raise KeyError(f"Bilinmeyen batch feature: {name}")
+
+
+class SnapshotMatrix:
+    """
+    Tüm pariteler için (parite × feature) float64 matris.
+    Batch ajanları kuralları bu matris üzerinde boolean mask / skor dizisi olarak değerlendirir.
+    """
+    __slots__ = ("symbols", "features", "values", "_index")
+
+    def __init__(self, symbols, features, values):
+        self.symbols = list(symbols)
+        self.features = list(features)
+        self.values = values
+        self._index = {f: i for i, f in enumerate(self.features)}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def col(self, name):
+        return self.values[:, self._index[name]]
+
+    @classmethod
+    def from_snapshots(cls, snapshots, features):
+        features = list(dict.fromkeys(features))
+        values = np.empty((len(snapshots), len(features)), dtype=np.float64)
+        for i, snap in enumerate(snapshots):
+            for j, name in enumerate(features):
+                values[i, j] = _feature_value(snap, name)
+        return cls([s.symbol for s in snapshots], features, values)
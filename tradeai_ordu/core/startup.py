@@ -0,0 +1,50 @@
+# core/startup.py
+
+import time
+from contextlib import contextmanager
+
+# main'in ertelediği ağır modüller (pandas, ta, pymongo, websockets, 10 ajan)
+RUNTIME_MODULES = (
+    "core.data_pipeline",
+    "core.agent_pool",
+    "core.meta_decision_engine",
+    "core.strategy_manager",
+    "core.orchestrator",
+)
+
+
+def preload_runtime():
+    """
+    Ağır import'ları yükler; main bunu bir thread'de, sembol yükleme (disk/ağ)
+    ile eşzamanlı çalıştırır. Sonraki import'lar sys.modules'tan gelir.
+    """
+    import importlib
+    for name in RUNTIME_MODULES:
+        importlib.import_module(name)
+
+
+class StartupTimer:
+    """
+    Açılış aşamalarının süre ölçümü (import, semboller, pipeline, ilk döngü...).
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - t0))
+
+    def mark(self, name, seconds):
+        self.phases.append((name, seconds))
+
+    def report(self):
+        total = time.perf_counter() - self.started
+        parts = ", ".join(f"{name}={sec * 1000:.0f}ms" for name, sec in self.phases)
+        print(f">> Açılış süreleri: {parts} | toplam={total:.2f}s")
+        return {"phases": dict(self.phases), "total": total}
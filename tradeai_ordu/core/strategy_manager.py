@@ -1,6 +1,16 @@
 # core/strategy_manager.py
 
+import warnings
 import numpy as np
+from core.agent_result import AgentResultBatch
+from core.ring_buffer import DIRECTION_CODES
+
+DIRECTION_NAMES = {code: name for name, code in DIRECTION_CODES.items()}
+
+RISK_FLAG_TEXT = "Dump/pump veya orderbook manipülasyon riski var! | "
+WEAK_EDGE_TEXT = "Edge zayıf. | "
+NOT_SAFE_TEXT = "Pozisyon açmak önerilmez."
+STRATEGY_NOTES = {"scalp": " | Hızlı kar, düşük pozisyon.", "midterm": " | Orta vade, yüksek potansiyel."}
 
 class StrategyManager:
     """
@@ -13,16 +23,17 @@ class StrategyManager:
         Meta karar sonrası pozisyon büyüklüğü, stop loss, kar al, 
         strateji türü ve açıklamaları üretir.
         """
-        atr = StrategyManager._median([a.get("features", {}).get("atr", np.nan) for a in agent_results])
-        volatility = StrategyManager._median([a.get("features", {}).get("volatility", np.nan) for a in agent_results])
-        pattern_bonus = sum(1 for a in agent_results if "pattern" in a and a["pattern"])
-        confidence = np.mean([a.get("confidence", 0.5) for a in agent_results])
+        batch = AgentResultBatch.of(agent_results)
+        atr = StrategyManager._median(batch.feature("atr"))
+        volatility = StrategyManager._median(batch.feature("volatility"))
+        pattern_bonus = int(batch.flag("pattern").sum())
+        confidence = np.mean(batch.confidence)
 
         base_risk = 0.015  # Maksimum işlem riski (%1.5)
         position_size = min(1.0, max(0.2, abs(edge_strength) * confidence * (1 + 0.2 * pattern_bonus)))
 
         # Dump-pump, anomaly varsa pozisyon küçült
-        if any(a.get("dump_pump", False) or a.get("anomaly", False) for a in agent_results):
+        if batch.veto:
             position_size *= 0.25
 
         # Volatilite çok yüksekse pozisyon küçült
@@ -42,11 +53,7 @@ class StrategyManager:
             f"Stop: {stop_loss:.4f} | TP: {take_profit:.4f} | "
             f"Edge: {edge_strength:.2f} | Risk: {base_risk:.2%}"
         )
-
-        if strategy_type == "scalp":
-            explanation += " | Hızlı kar, düşük pozisyon."
-        elif strategy_type == "midterm":
-            explanation += " | Orta vade, yüksek potansiyel."
+        explanation += STRATEGY_NOTES.get(strategy_type, "")
 
         return {
             "symbol": symbol,
@@ -64,31 +71,89 @@ class StrategyManager:
         Dump/pump, spoofing, anomaly vb. riskleri kontrol eder,
         pozisyon açılıp açılamayacağına karar verir ve açıklama üretir.
         """
+        batch = AgentResultBatch.of(agent_results)
         safe = True
         explanation = ""
 
-        if any(
-            a.get("dump_pump", False) or 
-            a.get("spoofing", False) or 
-            a.get("anomaly", False)
-            for a in agent_results
-        ):
+        if (batch.dump_pump | batch.spoofing | batch.anomaly).any():
             safe = False
-            explanation += "Dump/pump veya orderbook manipülasyon riski var! | "
+            explanation += RISK_FLAG_TEXT
 
         if abs(edge_strength) < 0.2:
             safe = False
-            explanation += "Edge zayıf. | "
+            explanation += WEAK_EDGE_TEXT
 
         if not safe:
-            explanation += "Pozisyon açmak önerilmez."
+            explanation += NOT_SAFE_TEXT
 
         return safe, explanation
 
+    @staticmethod
+    def suggest_positions(matrix, strategy_types, directions, edge_strength):
+        """
+        suggest_position'ın (parite × ajan) matrisi üzerinde tüm pariteler için vektörel hali.
+        strategy_types: str dizisi, directions: -1/0/1 kod dizisi, edge_strength: float dizisi.
+        Parite sırasıyla strateji dict listesi döner.
+        """
+        base_risk = 0.015  # Maksimum işlem riski (%1.5)
+        with warnings.catch_warnings():
+            # Feature'ı hiç olmayan paritelerde medyan NaN kalır
+            warnings.simplefilter("ignore", RuntimeWarning)
+            atr = np.nanmedian(matrix.atr, axis=1)
+            volatility = np.nanmedian(matrix.volatility, axis=1)
+            confidence = matrix.confidence.sum(axis=1) / matrix.counts
+        pattern_bonus = matrix.pattern.sum(axis=1)
+
+        position_size = np.clip(np.abs(edge_strength) * confidence * (1 + 0.2 * pattern_bonus), 0.2, 1.0)
+        position_size = np.where(np.isnan(position_size), 0.2, position_size)
+        # Dump-pump, anomaly varsa pozisyon küçült
+        position_size = np.where(matrix.veto, position_size * 0.25, position_size)
+        # Volatilite çok yüksekse pozisyon küçült
+        position_size = np.where((volatility != 0) & (volatility > 3 * atr), position_size * 0.5, position_size)
+        # Yön yoksa pozisyon kapalı
+        position_size = np.where(directions == 0, 0.0, position_size)
+
+        # Stop loss ve kar al noktaları ATR bazında
+        stop_loss = np.where((atr != 0) & ~np.isnan(atr), atr * 2, 0.007)
+        take_profit = stop_loss * np.where(strategy_types == "scalp", 2.2, 3.0)
+
+        out = []
+        for i, symbol in enumerate(matrix.symbols):
+            strategy_type = str(strategy_types[i])
+            size, stop, tp, edge = float(position_size[i]), float(stop_loss[i]), float(take_profit[i]), float(edge_strength[i])
+            out.append({
+                "symbol": symbol,
+                "strategy": strategy_type,
+                "direction": DIRECTION_NAMES[int(directions[i])],
+                "size": size,
+                "stop": stop,
+                "take_profit": tp,
+                "explanation": (
+                    f"Pozisyon büyüklüğü: {size:.2f} | Stop: {stop:.4f} | TP: {tp:.4f} | "
+                    f"Edge: {edge:.2f} | Risk: {base_risk:.2%}" + STRATEGY_NOTES.get(strategy_type, "")
+                ),
+            })
+        return out
+
+    @staticmethod
+    def filter_risks(matrix, edge_strength):
+        """
+        filter_risk'in tüm pariteler için vektörel hali; (safe dizisi, açıklama listesi) döner.
+        """
+        risky = (matrix.dump_pump | matrix.spoofing | matrix.anomaly).any(axis=1)
+        weak = np.abs(edge_strength) < 0.2
+        safe = ~risky & ~weak
+        explanations = [
+            "" if ok else (RISK_FLAG_TEXT if r else "") + (WEAK_EDGE_TEXT if w else "") + NOT_SAFE_TEXT
+            for ok, r, w in zip(safe, risky, weak)
+        ]
+        return safe, explanations
+
     @staticmethod
     def _median(values):
         """
         None ve NaN değerleri filtreleyip medyan hesaplar.
         """
-        filtered = [v for v in values if v is not None and not np.isnan(v)]
-        return np.median(filtered) if filtered else np.nan
+        values = np.asarray(values, dtype=np.float64)
+        filtered = values[~np.isnan(values)]
+        return np.median(filtered) if filtered.size else np.nan
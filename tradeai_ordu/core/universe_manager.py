@@ -0,0 +1,120 @@
+# core/universe_manager.py
+
+import asyncio
+from config.config import Config
+from data.exchange_cache import ExchangeInfoCache
+
+
+class UniverseGuard:
+    """
+    exchangeInfo yenilemelerini evrene uygulanmadan önce süzer.
+    - Boş liste ya da önceki evrenin UNIVERSE_MAX_SHRINK oranından fazlasının birden kaybolması
+      (hatalı/yarım cevap) reddedilir; mevcut evren korunur
+    - Listeden düşen parite hemen çıkarılmaz: UNIVERSE_REMOVE_AFTER ardışık yenilemede yoksa çıkar.
+      Durumu kısa süre TRADING dışına çıkan parite WS/ajan/motor durumunu kaybetmez
+    """
+
+    def __init__(self, symbols=None, remove_after=None, max_shrink=None):
+        self.remove_after = Config.UNIVERSE_REMOVE_AFTER if remove_after is None else remove_after
+        self.max_shrink = Config.UNIVERSE_MAX_SHRINK if max_shrink is None else max_shrink
+        self.listed = list(symbols) if symbols else None
+        self.missing = {}              # symbol -> ardışık yokluk sayısı
+
+    def accept(self, symbols):
+        """
+        Uygulanacak evreni döner (yokluğu henüz kesinleşmemiş pariteler sonda korunur);
+        şüpheli yenilemede ValueError.
+        """
+        symbols = list(symbols)
+        if not symbols:
+            raise ValueError("boş parite listesi reddedildi")
+        if self.listed is None:
+            self.listed = symbols
+            return symbols
+        present = set(symbols)
+        gone = [s for s in self.listed if s not in present]
+        if len(gone) > self.max_shrink * len(self.listed):
+            raise ValueError(f"{len(gone)}/{len(self.listed)} parite birden kayboldu, yenileme reddedildi")
+        for symbol in symbols:
+            self.missing.pop(symbol, None)
+        kept = []
+        for symbol in gone:
+            count = self.missing[symbol] = self.missing.get(symbol, 0) + 1
+            if count < self.remove_after:
+                kept.append(symbol)
+            else:
+                del self.missing[symbol]
+        self.listed = symbols + kept
+        return self.listed
+
+
+class UniverseManager:
+    """
+    Çalışırken parite evrenini exchangeInfo ile senkron tutar (yeniden başlatmadan).
+    - UNIVERSE_REFRESH_SEC'te bir exchangeInfo indirilir (disk önbelleği de güncellenir)
+    - Yeni listelenenler için sadece o paritelerin WS bağlantıları/tamponları açılır,
+      delist olanlarınkiler kapatılır; diğer bağlantılar kopmaz
+    - Orchestrator.symbols tek atamayla değişir; çıkan paritelerin ajan/öncelik durumu silinir
+    - partition verilirse (shard worker / local_cluster) her orchestrator kendi bölümünü alır
+    - Yenilemeler UniverseGuard'dan geçer (boş/sert küçülen liste reddedilir, çıkarma gecikmeli)
+    """
+
+    def __init__(self, orchestrators, partition=None, cache=None, interval=None):
+        self.orchestrators = list(orchestrators)
+        self.partition = partition or (lambda symbols: [symbols])
+        self.cache = cache or ExchangeInfoCache()
+        self.interval = Config.UNIVERSE_REFRESH_SEC if interval is None else interval
+        self.guard = UniverseGuard([s for o in self.orchestrators for s in o.symbols])
+        self.added = 0
+        self.removed = 0
+        self.refreshes = 0
+
+    async def apply(self, symbols):
+        """
+        Yeni evreni uygular; {"added": [...], "removed": [...]} döner.
+        """
+        added, removed = [], []
+        for orchestrator, own in zip(self.orchestrators, self.partition(symbols)):
+            current = set(orchestrator.symbols)
+            target = set(own)
+            new = [s for s in own if s not in current]
+            gone = [s for s in orchestrator.symbols if s not in target]
+            if not new and not gone:
+                continue
+            pipeline = orchestrator.data_pipeline
+            pipeline.add_symbols(new)
+            # Sıra korunur: mevcut pariteler önce, yeni listelenenler sonda
+            orchestrator.update_symbols([s for s in orchestrator.symbols if s in target] + new)
+            await pipeline.remove_symbols(gone)
+            added += new
+            removed += gone
+        self.added += len(added)
+        self.removed += len(removed)
+        if added or removed:
+            print(f"[UniverseManager] +{len(added)} {added[:10]} / -{len(removed)} {removed[:10]}")
+        return {"added": added, "removed": removed}
+
+    async def refresh(self):
+        symbols = self.guard.accept(await self.cache.refresh())
+        self.refreshes += 1
+        return await self.apply(symbols)
+
+    async def run_forever(self):
+        # Açılışta bayat önbellekten başlanmışsa arka plan yenilemesinin sonucu hemen uygulanır
+        if self.cache.refresh_task is not None:
+            await self.cache.refresh_task
+            if self.cache.entry is not None:
+                try:
+                    await self.apply(self.guard.accept(self.cache.entry["symbols"]))
+                except ValueError as ex:
+                    print(f"[UniverseManager] exchangeInfo yenilemesi uygulanmadı: {ex}")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as ex:
+                print(f"[UniverseManager] exchangeInfo yenileme hatası: {ex}")
+
+    def stats(self):
+        return {"refreshes": self.refreshes, "added": self.added, "removed": self.removed,
+                "symbols": sum(len(o.symbols) for o in self.orchestrators)}
@@ -0,0 +1,132 @@
+# core/universe_screener.py
+
+import numpy as np
+from config.config import Config
+from data.sources import fetch_binance_tickers_24h
+
+
+def _pct_rank(values):
+    """
+    0..1 arası yüzdelik sıra (en küçük 0, en büyük 1).
+    """
+    n = len(values)
+    if n < 2:
+        return np.ones(n)
+    ranks = np.empty(n)
+    ranks[np.argsort(values, kind="stable")] = np.arange(n)
+    return ranks / (n - 1)
+
+
+class UniverseScreener:
+    """
+    İki katmanlı evren taraması — derin (10 ajanlı) analizden önce ucuz ön eleme:
+    - Tek toplu istekle (/fapi/v1/ticker/24hr) tüm paritelerin 24s hacmi, aralığı ve fiyatı alınır
+    - Skor: likidite (log hacim), volatilite ((high-low)/last) ve döngüler arası getiri z-skorunun
+      kesitsel yüzdelik sıralarının ağırlıklı toplamı
+    - Derin küme = top-K ∪ |z| > SCREEN_Z_ALWAYS olanlar ∪ açık sinyali olan pariteler
+    - K her döngü yükle yeniden boyutlanır: bütçe aşıldıysa küçülür, bol zaman kaldıysa büyür
+    """
+
+    def __init__(self, top_k=None, min_k=None, max_k=None, alpha=0.1, weights=(0.4, 0.3, 0.3)):
+        self.k = top_k or Config.SCREEN_TOP_K
+        self.min_k = min_k or Config.SCREEN_MIN_K
+        self.max_k = max_k or Config.SCREEN_MAX_K
+        self.alpha = alpha
+        self.weights = weights
+        self.last_price = {}
+        self.ret_mean = {}
+        self.ret_var = {}
+        self.scores = {}
+        self.zscores = {}
+
+    async def refresh(self):
+        """
+        24s ticker'ı çekip skorları günceller; hata olursa False döner (tüm evren analiz edilir).
+        """
+        try:
+            tickers = await fetch_binance_tickers_24h()
+        except Exception as ex:
+            print(f"[UniverseScreener] Ticker çekim hatası: {ex}")
+            return False
+        if not isinstance(tickers, list) or not tickers:
+            return False
+        self.update(tickers)
+        return True
+
+    def _zscore(self, symbol, price):
+        """
+        Son taramadan bu yana getirinin, paritenin kendi EWMA ortalama/varyansına göre z-skoru.
+        """
+        prev = self.last_price.get(symbol)
+        self.last_price[symbol] = price
+        if not prev:
+            return 0.0
+        ret = price / prev - 1
+        mean = self.ret_mean.get(symbol, 0.0)
+        var = self.ret_var.get(symbol, 0.0)
+        diff = ret - mean
+        z = diff / np.sqrt(var) if var > 0 else 0.0
+        # EWMA ortalama/varyans (Welford'un üstel ağırlıklı hali)
+        self.ret_mean[symbol] = mean + self.alpha * diff
+        self.ret_var[symbol] = (1 - self.alpha) * (var + self.alpha * diff * diff)
+        return float(z)
+
+    def update(self, tickers):
+        rows = []
+        for t in tickers:
+            try:
+                last = float(t["lastPrice"])
+                rows.append((t["symbol"], float(t["quoteVolume"]), float(t["highPrice"]), float(t["lowPrice"]), last))
+            except (KeyError, TypeError, ValueError):
+                continue
+        if not rows:
+            return
+        symbols = [r[0] for r in rows]
+        quote_volume = np.array([r[1] for r in rows])
+        high = np.array([r[2] for r in rows])
+        low = np.array([r[3] for r in rows])
+        last = np.array([r[4] for r in rows])
+
+        z = np.array([self._zscore(s, p) for s, p in zip(symbols, last)])
+        volatility = np.where(last > 0, (high - low) / np.where(last > 0, last, 1), 0.0)
+        w_liq, w_vol, w_z = self.weights
+        score = (w_liq * _pct_rank(np.log1p(quote_volume))
+                 + w_vol * _pct_rank(volatility)
+                 + w_z * _pct_rank(np.abs(z)))
+        # Likidite alt sınırının altındakiler top-K'ya giremez
+        score = np.where(quote_volume >= Config.SCREEN_MIN_QUOTE_VOLUME, score, -1.0)
+        self.scores = dict(zip(symbols, score.tolist()))
+        self.zscores = dict(zip(symbols, z.tolist()))
+
+    def select(self, universe, open_symbols=()):
+        """
+        Derin analize girecek pariteleri (skor sırasıyla) döner.
+        Skoru olmayan (ticker'da görünmeyen) pariteler sadece açık sinyali varsa alınır.
+        """
+        ranked = sorted((s for s in universe if self.scores.get(s, -1.0) >= 0), key=lambda s: -self.scores[s])
+        deep = ranked[:self.k]
+        chosen = set(deep)
+        for s in ranked[self.k:]:
+            if len(deep) >= self.max_k:
+                break
+            if abs(self.zscores.get(s, 0.0)) > Config.SCREEN_Z_ALWAYS:
+                deep.append(s)
+                chosen.add(s)
+        listed = set(universe)
+        deep += [s for s in open_symbols if s in listed and s not in chosen]
+        return deep
+
+    def evict(self, symbol):
+        for state in (self.last_price, self.ret_mean, self.ret_var, self.scores, self.zscores):
+            state.pop(symbol, None)
+
+    def resize(self, summary, elapsed, budget):
+        """
+        Döngü sonucuna göre K'yı ayarlar: ertelenen parite varsa %20 küçült,
+        bütçenin yarısından azı kullanıldıysa %10 büyüt.
+        """
+        if summary["deferred"]:
+            self.k = max(self.min_k, int(self.k * 0.8))
+        elif budget and elapsed < 0.5 * budget:
+            self.k = min(self.max_k, int(self.k * 1.1) + 1)
+        return self.k
@@ -0,0 +1,62 @@
+# core/veto_scheduler.py
+
+from collections import defaultdict
+
+# MetaDecisionEngine/StrategyManager bu alanlardan biri True ise işlem açmaz
+VETO_KEYS = ("dump_pump", "anomaly")
+
+
+def is_veto(result):
+    return bool(result) and any(result.get(key, False) for key in VETO_KEYS)
+
+
+class VetoScheduler:
+    """
+    Lazy ajan değerlendirmesi için sıralayıcı:
+    - Ajan bazlı ortalama süre ve veto olasılığı EWMA ile ölçülür
+    - Hazır ajanlar (maliyet / veto olasılığı) artan sırayla çalıştırılır
+    - Veto gelen paritede kalan ajanlar atlanır; atlama/veto sayaçları tutulur
+    """
+
+    def __init__(self, alpha=0.1, prior_cost=0.01, prior_veto=0.05, min_veto=1e-3):
+        self.alpha = alpha
+        self.prior_cost = prior_cost
+        self.prior_veto = prior_veto
+        self.min_veto = min_veto
+        self.cost = {}
+        self.veto_rate = {}
+        self.counters = {"symbols": 0, "vetoed_symbols": 0, "agents_run": 0, "agents_skipped": 0}
+        self.vetoes = defaultdict(int)
+
+    def _ewma(self, table, name, value, prior):
+        prev = table.get(name, prior)
+        table[name] = prev + self.alpha * (value - prev)
+
+    def observe(self, name, elapsed, vetoed):
+        self._ewma(self.cost, name, elapsed, self.prior_cost)
+        self._ewma(self.veto_rate, name, 1.0 if vetoed else 0.0, self.prior_veto)
+        self.counters["agents_run"] += 1
+        if vetoed:
+            self.vetoes[name] += 1
+
+    def priority(self, name):
+        """
+        Beklenen veto başına maliyet; küçük olan önce çalışır.
+        """
+        return self.cost.get(name, self.prior_cost) / max(self.veto_rate.get(name, self.prior_veto), self.min_veto)
+
+    def pick(self, ready):
+        return min(ready, key=lambda cls: self.priority(cls.__name__))
+
+    def finish(self, vetoed, skipped):
+        self.counters["symbols"] += 1
+        self.counters["agents_skipped"] += skipped
+        if vetoed:
+            self.counters["vetoed_symbols"] += 1
+
+    def stats(self):
+        return {
+            **self.counters,
+            "vetoes": dict(self.vetoes),
+            "priority": {name: round(self.priority(name), 6) for name in self.cost},
+        }
@@ -0,0 +1,178 @@
+# data/codec.py
+
+import numpy as np
+import pandas as pd
+
+COLUMNAR_FORMAT = "columnar-v1"
+
+# Zaman damgası kolonları (ms, int64) — delta ile saklanır
+TIME_COLUMNS = ("open_time", "close_time")
+# Delta modunda en fazla bu kadar ondalıkla kayıpsız ifade edilen kolonlar (fiyat, hacim,
+# trade sayısı, Trend vb.) sabit ölçekli tamsayı tick olarak saklanır
+MAX_DECIMALS = 8
+_EXACT_LIMIT = 2 ** 53  # |değer * ölçek| bunun altındaysa int <-> float dönüşümü tam
+
+_INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+_REPORTED = set()  # loglanmış (kolon, sebep) çiftleri; her parite için tekrar basılmaz
+
+
+def _report(name, reason):
+    if (name, reason) not in _REPORTED:
+        _REPORTED.add((name, reason))
+        print(f"[codec] '{name}' kolonu {reason}")
+
+
+def _smallest_int_dtype(values):
+    """
+    Delta dizisini kayıpsız tutabilen en küçük tamsayı tipini seçer.
+    """
+    if values.size == 0:
+        return np.int8
+    lo, hi = values.min(), values.max()
+    for dt in _INT_DTYPES:
+        info = np.iinfo(dt)
+        if lo >= info.min and hi <= info.max:
+            return dt
+    return np.int64
+
+
+def _pack_delta(values):
+    """
+    int64 diziyi (ilk değer + farklar) şeklinde paketler.
+    """
+    first = int(values[0]) if values.size else 0
+    diffs = np.diff(values) if values.size else values
+    dt = _smallest_int_dtype(diffs)
+    return {
+        "enc": "delta",
+        "first": first,
+        "dtype": np.dtype(dt).str,
+        "data": diffs.astype(dt).tobytes(),
+    }
+
+
+def _exact_scale(values, max_decimals):
+    """
+    Diziyi kayıpsız tamsayıya çeviren en küçük 10^d ölçeği (d <= max_decimals), yoksa None.
+    rint(v * ölçek) / ölçek tam olarak v'yi vermiyorsa kolon ham float olarak kalır.
+    """
+    if values.size == 0 or not np.isfinite(values).all():
+        return None
+    peak = np.abs(values).max()
+    for d in range(max_decimals + 1):
+        scale = 10 ** d
+        if peak * scale >= _EXACT_LIMIT:
+            return None
+        if np.array_equal(np.rint(values * scale) / scale, values):
+            return scale
+    return None
+
+
+def _unpack_delta(col, n):
+    diffs = np.frombuffer(col["data"], dtype=np.dtype(col["dtype"])).astype(np.int64)
+    out = np.empty(n, dtype=np.int64)
+    if n:
+        out[0] = col["first"]
+        np.cumsum(diffs, out=out[1:])
+        out[1:] += col["first"]
+    return out
+
+
+def encode_klines(df, float_dtype="f8", delta=True, max_decimals=MAX_DECIMALS):
+    """
+    Kline/indikatör DataFrame'ini kolon bazlı binary bloblara paketler.
+    - Sayısal kolonlar float32/float64 blob olarak saklanır (f8: kayıpsız)
+    - delta=True ise zaman damgaları ve max_decimals ondalıkla tam ifade edilen kolonlar
+      (OHLC, hacimler, trade sayısı...) delta + en küçük int tipiyle kayıpsız saklanır
+    - Sayıya çevrilemeyen kolonlar saklanmaz, kısmen çevrilebilenlerde kalanlar NaN olur (ikisi de loglanır)
+    BSON'a doğrudan `bytes` olarak yazılır, satır başına dict üretilmez.
+    """
+    n = len(df)
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if not pd.api.types.is_numeric_dtype(series):
+            coerced = pd.to_numeric(series, errors="coerce")
+            lost = int((coerced.isna() & series.notna()).sum())
+            if coerced.isna().all():
+                if lost:
+                    _report(name, "sayısal değil, kayda alınmadı")
+                continue
+            if lost:
+                _report(name, f"kısmen sayısal değil, {lost} değer NaN olarak saklandı")
+            series = coerced
+        if delta and name in TIME_COLUMNS:
+            columns[name] = _pack_delta(series.to_numpy(dtype=np.int64, na_value=0))
+            continue
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        scale = _exact_scale(values, max_decimals) if delta else None
+        if scale is not None:
+            col = _pack_delta(np.rint(values * scale).astype(np.int64))
+            col["scale"] = scale
+            columns[name] = col
+            continue
+        columns[name] = {
+            "enc": "raw",
+            "dtype": np.dtype(float_dtype).str,
+            "data": values.astype(float_dtype).tobytes(),
+        }
+    return {"format": COLUMNAR_FORMAT, "n": n, "columns": columns}
+
+
+def decode_klines(doc, as_frame=False):
+    """
+    Kolon bazlı kline dokümanını doğrudan NumPy dizilerine açar.
+    Eski (list of dict) formatı da okunur. as_frame=True ise DataFrame döner.
+    """
+    if not isinstance(doc, dict) or doc.get("format") != COLUMNAR_FORMAT:
+        df = pd.DataFrame(doc or [])
+        return df if as_frame else {c: df[c].to_numpy() for c in df.columns}
+    n = doc["n"]
+    arrays = {}
+    for name, col in doc["columns"].items():
+        if col["enc"] == "delta":
+            values = _unpack_delta(col, n)
+            if "scale" in col:
+                values = values / col["scale"]
+        else:
+            values = np.frombuffer(col["data"], dtype=np.dtype(col["dtype"]))
+        arrays[name] = values
+    return pd.DataFrame(arrays, copy=False) if as_frame else arrays
+
+
+def orderbook_arrays(orderbook):
+    """
+    Orderbook'u (n, 2) float64 price/qty dizilerine çevirir.
+    String listeler (REST/WS) ve hazır NumPy dizileri desteklenir.
+    """
+    out = []
+    for side in ("bids", "asks"):
+        levels = orderbook.get(side, []) if orderbook else []
+        arr = np.asarray(levels, dtype=np.float64)
+        out.append(arr.reshape(-1, 2) if arr.size else np.empty((0, 2), dtype=np.float64))
+    return out[0], out[1]
+
+
+def encode_orderbook(orderbook, float_dtype="f8"):
+    """
+    Bid/ask merdivenini paketlenmiş price/qty dizileri olarak saklar.
+    """
+    bids, asks = orderbook_arrays(orderbook)
+    return {
+        "format": COLUMNAR_FORMAT,
+        "dtype": np.dtype(float_dtype).str,
+        "bids": bids.astype(float_dtype).tobytes(),
+        "asks": asks.astype(float_dtype).tobytes(),
+    }
+
+
+def decode_orderbook(doc):
+    """
+    Paketlenmiş orderbook'u (bids, asks) NumPy dizilerine açar; eski format da okunur.
+    """
+    if not isinstance(doc, dict) or doc.get("format") != COLUMNAR_FORMAT:
+        return orderbook_arrays(doc)
+    dt = np.dtype(doc["dtype"])
+    bids = np.frombuffer(doc["bids"], dtype=dt).reshape(-1, 2)
+    asks = np.frombuffer(doc["asks"], dtype=dt).reshape(-1, 2)
+    return bids, asks
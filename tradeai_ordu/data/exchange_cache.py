@@ -0,0 +1,86 @@
+# data/exchange_cache.py
+
+import asyncio
+import json
+import os
+import time
+from config.config import Config
+from data.sources import fetch_binance_exchange_info, usdt_perpetual_symbols
+
+
+class ExchangeInfoCache:
+    """
+    exchangeInfo ve USDT perpetual parite listesinin disk önbelleği.
+    - Geçerlilik süresi (EXCHANGE_INFO_TTL_SEC) içindeyse ağ isteği yapılmaz
+    - Süresi dolmuşsa eski liste hemen döner, yenileme arka planda yapılır
+    - Önbellek yoksa/bozuksa exchangeInfo beklenerek indirilir
+    Dosya tmp + os.replace ile yazılır; yarım kalan yazım önbelleği bozmaz.
+    """
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path or Config.EXCHANGE_INFO_CACHE
+        self.ttl = Config.EXCHANGE_INFO_TTL_SEC if ttl is None else ttl
+        self.entry = None
+        self.refresh_task = None
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if not entry.get("symbols"):
+                return None
+            self.entry = entry
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def age(self):
+        return time.time() - self.entry["fetched_at"] if self.entry else float("inf")
+
+    def is_fresh(self):
+        return self.age() < self.ttl
+
+    def _write(self, entry):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self.path)
+
+    async def refresh(self):
+        """
+        exchangeInfo'yu indirip önbelleğe yazar; parite listesini döner.
+        """
+        info = await fetch_binance_exchange_info()
+        entry = {"fetched_at": time.time(), "symbols": usdt_perpetual_symbols(info), "exchange_info": info}
+        if not entry["symbols"]:
+            # Boş liste (hata cevabı / bakım) evreni boşaltmamalı; önbellek de ezilmez
+            raise ValueError("exchangeInfo parite listesi boş")
+        await asyncio.to_thread(self._write, entry)
+        self.entry = entry
+        return entry["symbols"]
+
+    async def _refresh_quietly(self):
+        try:
+            symbols = await self.refresh()
+            print(f"[ExchangeInfoCache] Arka plan yenilemesi tamam: {len(symbols)} parite.")
+        except Exception as ex:
+            print(f"[ExchangeInfoCache] Arka plan yenileme hatası: {ex}")
+
+    async def get_symbols(self):
+        """
+        (symbols, kaynak) döner; kaynak "cache" | "stale" | "network".
+        """
+        if self.entry is None:
+            await asyncio.to_thread(self.load)
+        if self.entry is None:
+            return await self.refresh(), "network"
+        if self.is_fresh():
+            return self.entry["symbols"], "cache"
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_task = asyncio.create_task(self._refresh_quietly())
+        return self.entry["symbols"], "stale"
+
+    @property
+    def exchange_info(self):
+        return self.entry["exchange_info"] if self.entry else None
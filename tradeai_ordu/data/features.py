@@ -3,15 +3,16 @@ from config.config import Config
 
 import pandas as pd
 import numpy as np
-from ta.trend import EMAIndicator, SMAIndicator, MACD, CCIIndicator
-from ta.momentum import RSIIndicator, StochasticOscillator, ROCIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.volume import OnBalanceVolumeIndicator, VolumePriceTrendIndicator
 
 def calculate_technicals(df):
     """
     Tüm teknik analiz ve indikatörleri DataFrame'e ekler.
     """
+    # ta ilk hesaplamada yüklenir (soğuk başlangıçta import maliyeti ertelenir)
+    from ta.trend import EMAIndicator, SMAIndicator, MACD, CCIIndicator
+    from ta.momentum import RSIIndicator, StochasticOscillator, ROCIndicator
+    from ta.volatility import BollingerBands, AverageTrueRange
+    from ta.volume import OnBalanceVolumeIndicator, VolumePriceTrendIndicator
     df = df.copy()
     # EMA & SMA
     df['EMA_9'] = EMAIndicator(df['close'], window=9).ema_indicator()
@@ -163,19 +164,30 @@ def volume_anomaly(df):
 
 # --- MOMENTUM/OSCILLATOR ALERTS ---
 
-def oscillator_alerts(df):
+def oscillator_alerts(df, latest=None):
+    """
+    latest (LatestValues) verilirse pandas .iloc yerine önceden çıkarılmış değerler kullanılır.
+    """
+    if latest is None:
+        rsi, stoch_k = df['RSI_14'].iloc[-1], df['STOCH_K'].iloc[-1]
+        macd, macd_sig = df['MACD'].iloc[-1], df['MACD_SIGNAL'].iloc[-1]
+        macd_prev, macd_sig_prev = df['MACD'].iloc[-2], df['MACD_SIGNAL'].iloc[-2]
+    else:
+        rsi, stoch_k = latest.RSI_14, latest.STOCH_K
+        macd, macd_sig = latest.MACD, latest.MACD_SIGNAL
+        macd_prev, macd_sig_prev = latest.MACD_prev, latest.MACD_SIGNAL_prev
     alerts = []
-    if df['RSI_14'].iloc[-1] > 80:
+    if rsi > 80:
         alerts.append("RSI aşırı alım (80+)")
-    if df['RSI_14'].iloc[-1] < 20:
+    if rsi < 20:
         alerts.append("RSI aşırı satım (20-)")
-    if df['MACD'].iloc[-1] > df['MACD_SIGNAL'].iloc[-1] and df['MACD'].iloc[-2] < df['MACD_SIGNAL'].iloc[-2]:
+    if macd > macd_sig and macd_prev < macd_sig_prev:
         alerts.append("MACD al sinyali")
-    if df['MACD'].iloc[-1] < df['MACD_SIGNAL'].iloc[-1] and df['MACD'].iloc[-2] > df['MACD_SIGNAL'].iloc[-2]:
+    if macd < macd_sig and macd_prev > macd_sig_prev:
         alerts.append("MACD sat sinyali")
-    if df['STOCH_K'].iloc[-1] > 90:
+    if stoch_k > 90:
         alerts.append("Stoch aşırı alım")
-    if df['STOCH_K'].iloc[-1] < 10:
+    if stoch_k < 10:
         alerts.append("Stoch aşırı satım")
     return alerts
 
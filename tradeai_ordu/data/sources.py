@@ -1,14 +1,23 @@
 # data/sources.py
 
-import aiohttp
-import pandas as pd
+# aiohttp/pandas ilk istekte yüklenir (soğuk başlangıçta import maliyeti ertelenir)
 
 BINANCE_FAPI_BASE = "https://fapi.binance.com"
 
 # Fonksiyonlar (aynı şekilde)
 
-async def fetch_binance_klines(symbol: str, interval: str, limit: int = 150) -> pd.DataFrame:
+async def fetch_binance_klines(symbol: str, interval: str, limit: int = 150,
+                               start_time: int = None, end_time: int = None) -> "pd.DataFrame":
+    """
+    start_time/end_time (ms) verilirse sadece o aralıktaki mumlar çekilir (boşluk doldurma).
+    """
+    import aiohttp
+    import pandas as pd
     url = f"{BINANCE_FAPI_BASE}/fapi/v1/klines?symbol={symbol}&interval={interval}&limit={limit}"
+    if start_time is not None:
+        url += f"&startTime={start_time}"
+    if end_time is not None:
+        url += f"&endTime={end_time}"
     async with aiohttp.ClientSession() as session:
         async with session.get(url, timeout=8) as resp:
             klines = await resp.json()
@@ -23,23 +32,48 @@ async def fetch_binance_klines(symbol: str, interval: str, limit: int = 150) ->
             return df
 
 async def fetch_binance_orderbook(symbol: str, limit: int = 50) -> dict:
+    import aiohttp
     url = f"{BINANCE_FAPI_BASE}/fapi/v1/depth?symbol={symbol}&limit={limit}"
     async with aiohttp.ClientSession() as session:
         async with session.get(url, timeout=8) as resp:
             return await resp.json()
 
 async def fetch_binance_funding(symbol: str) -> list:
+    import aiohttp
     url = f"{BINANCE_FAPI_BASE}/fapi/v1/fundingRate?symbol={symbol}&limit=10"
     async with aiohttp.ClientSession() as session:
         async with session.get(url, timeout=8) as resp:
             return await resp.json()
 
 async def fetch_binance_oi(symbol: str) -> list:
+    import aiohttp
     url = f"{BINANCE_FAPI_BASE}/futures/data/openInterestHist?symbol={symbol}&period=5m&limit=24"
     async with aiohttp.ClientSession() as session:
         async with session.get(url, timeout=8) as resp:
             return await resp.json()
 
+async def fetch_binance_tickers_24h() -> list:
+    """
+    Tüm paritelerin 24s ticker'ı tek istekte (hacim, fiyat değişimi, high/low, trade sayısı).
+    """
+    import aiohttp
+    url = f"{BINANCE_FAPI_BASE}/fapi/v1/ticker/24hr"
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, timeout=8) as resp:
+            return await resp.json()
+
+async def fetch_binance_exchange_info() -> dict:
+    import aiohttp
+    url = f"{BINANCE_FAPI_BASE}/fapi/v1/exchangeInfo"
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, timeout=15) as resp:
+            return await resp.json()
+
+def usdt_perpetual_symbols(exchange_info: dict) -> list:
+    # status != TRADING: delist/settlement sürecindeki pariteler evrenden çıkar
+    return [s['symbol'] for s in exchange_info['symbols']
+            if s['contractType'] == 'PERPETUAL' and s['quoteAsset'] == 'USDT' and s.get('status', 'TRADING') == 'TRADING']
+
 # Placeholder fonksiyonlar (whale, news, social, onchain)
 
 async def fetch_whale_alerts(symbol: str) -> list:
@@ -62,12 +96,7 @@ class BinanceAPI:
         self.api_secret = api_secret
 
     async def get_usdt_futures_symbols(self):
-        url = f"{BINANCE_FAPI_BASE}/fapi/v1/exchangeInfo"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                data = await resp.json()
-                symbols = [s['symbol'] for s in data['symbols'] if s['contractType'] == 'PERPETUAL' and s['quoteAsset'] == 'USDT']
-                return symbols
+        return usdt_perpetual_symbols(await fetch_binance_exchange_info())
 
     async def get_klines(self, symbol, interval, limit=150):
         return await fetch_binance_klines(symbol, interval, limit)
@@ -80,3 +109,6 @@ class BinanceAPI:
 
     async def get_open_interest(self, symbol):
         return await fetch_binance_oi(symbol)
+
+    async def get_tickers_24h(self):
+        return await fetch_binance_tickers_24h()
@@ -1,32 +1,181 @@
 import asyncio
-from core.data_pipeline import DataPipeline
-from core.agent_pool import AgentPool
-from core.meta_decision_engine import MetaDecisionEngine
-from core.strategy_manager import StrategyManager
-from core.self_learning import update_agent_stats, get_agent_weights, update_meta_weights
-from core.reporting import send_report, log_decision
-from core.orchestrator import Orchestrator
+import os
+import time
 from config.config import Config
+from core.hash_ring import shard_name, shard_symbols, universe_version
+from core.startup import StartupTimer, preload_runtime
+
+# pandas/ta/pymongo/websockets ve ajan modülleri main import'unda yüklenmez;
+# preload_runtime() sembol yüklemesiyle eşzamanlı bir thread'de çalışır.
+
+async def run_coordinator(transports, on_close=None, symbols=None, cache=None):
+    """
+    Shard'lardan top-N adaylarını toplayıp global seçimi raporlayan döngü.
+    Parite evrenini (symbols, cache ile periyodik yenilenir) worker'lara coordinator dağıtır.
+    """
+    from core.shard_cluster import ShardCoordinator
+    coordinator = ShardCoordinator(transports)
+    if symbols is not None:
+        coordinator.set_universe(symbols)
+    refresher = None
+    if cache is not None and Config.UNIVERSE_REFRESH_SEC:
+        refresher = asyncio.create_task(coordinator.refresh_universe(cache))
+    print(f">> Coordinator hazır: {len(coordinator.transports)} shard.")
+    try:
+        while True:
+            try:
+                await coordinator.run_once()
+            except Exception as e:
+                print(f"[COORDINATOR HATASI]: {e}")
+            await asyncio.sleep(Config.ANALYSIS_INTERVAL)
+    except asyncio.CancelledError:
+        print(">> Coordinator durduruldu.")
+    finally:
+        stop_task(refresher)
+        if on_close is not None:
+            await on_close()
+
+async def build_shard(symbols, index, cache=None):
+    """
+    Bir shard için kendi pipeline/WS/ajan havuzuna sahip orchestrator kurar.
+    Başlangıç listesi ısınma içindir; geçerli evreni coordinator gönderir.
+    """
+    from core.data_pipeline import DataPipeline
+    from core.agent_pool import AgentPool
+    from core.orchestrator import Orchestrator
+    from core.shard_cluster import ShardWorker
+    from core.universe_manager import UniverseManager
+    own = shard_symbols(symbols, index, Config.SHARD_COUNT)
+    pipeline = DataPipeline(own, shard=shard_name(index))
+    await pipeline.start_websockets(background=True)
+    orchestrator = Orchestrator(symbols=own, pipeline=pipeline, agent_pool=AgentPool())
+    print(f">> {shard_name(index)}: {len(own)}/{len(symbols)} parite.")
+    universe = UniverseManager([orchestrator], cache=cache,
+                               partition=lambda syms: [shard_symbols(syms, index, Config.SHARD_COUNT)])
+    worker = ShardWorker(shard_name(index), orchestrator, universe=universe, version=universe_version(symbols))
+    worker.checkpoint = open_checkpoint(orchestrator, os.path.join(Config.CHECKPOINT_DIR, shard_name(index)))
+    return worker
+
+async def close_shard(worker):
+    await close_checkpoint(*worker.checkpoint)
+    await worker.close()
+    await worker.orchestrator.data_pipeline.stop_websockets()
+    worker.orchestrator.agent_pool.shutdown()
+
+def start_universe(orchestrators, cache):
+    """
+    Listeleme/delist takibini arka planda başlatır (UNIVERSE_REFRESH_SEC=0 ise kapalı).
+    """
+    if not Config.UNIVERSE_REFRESH_SEC:
+        return None
+    from core.universe_manager import UniverseManager
+    return asyncio.create_task(UniverseManager(orchestrators, cache=cache).run_forever())
+
+def stop_task(task):
+    if task is not None:
+        task.cancel()
+
+def open_checkpoint(orchestrator, directory=None):
+    """
+    Son checkpoint'i yükler ve periyodik kaydı başlatır (CHECKPOINT_INTERVAL_SEC=0 ise kapalı).
+    """
+    if not Config.CHECKPOINT_INTERVAL_SEC:
+        return None, None
+    from core.checkpoint import Checkpointer
+    components = {
+        "pipeline": orchestrator.data_pipeline,
+        "agents": orchestrator.agent_pool,
+        "orchestrator": orchestrator,
+    }
+    if orchestrator.anomaly_engine is not None:
+        components["anomaly"] = orchestrator.anomaly_engine
+    if orchestrator.correlation_engine is not None:
+        components["correlation"] = orchestrator.correlation_engine
+    checkpointer = Checkpointer(components, directory=directory)
+    info = checkpointer.load(orchestrator.symbols)
+    if info:
+        print(f">> Checkpoint yüklendi: nesil {info['generation']}, {info['age']:.0f}s önce "
+              f"({', '.join(info['components'])}); sadece aradaki mumlar çekilecek.")
+    return checkpointer, asyncio.create_task(checkpointer.run_forever())
+
+async def close_checkpoint(checkpointer, task):
+    stop_task(task)
+    if checkpointer is not None:
+        try:
+            await checkpointer.save()
+        except Exception as ex:
+            print(f"[Checkpointer] Kapanış checkpoint'i yazılamadı: {ex}")
+
+async def _timed(coro):
+    t0 = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - t0
 
 async def main():
-    # 1. Exchange API bağlantısı ve sembollerin çekilmesi
-    from data.sources import BinanceAPI
-    exchange = BinanceAPI(
-        api_key=Config.BINANCE_API_KEY,
-        api_secret=Config.BINANCE_API_SECRET
-    )
+    Config.validate()
+    if Config.RUN_MODE == "coordinator":
+        # Worker'lar ayrı process/sunucularda; sadece adaylar birleştirilir
+        from core.shard_cluster import StreamTransport
+        from data.exchange_cache import ExchangeInfoCache
+        nodes = [a.strip() for a in Config.SHARD_NODES.split(",") if a.strip()]
+        cache = ExchangeInfoCache()
+        symbols, source = await cache.get_symbols()
+        print(f">> Toplam {len(symbols)} parite alındı ({source}); worker'lara dağıtılacak.")
+        return await run_coordinator((StreamTransport(a) for a in nodes), symbols=symbols, cache=cache)
+
+    timer = StartupTimer()
+
+    # 1. Ağır import'lar thread'de yüklenirken semboller disk önbelleğinden (yoksa exchangeInfo'dan) alınır
+    from data.exchange_cache import ExchangeInfoCache
+    runtime = asyncio.create_task(_timed(asyncio.to_thread(preload_runtime)))
+
+    print(">> Binance USDT vadeli pariteleri yükleniyor...")
+    cache = ExchangeInfoCache()
+    (symbols, source), elapsed = await _timed(cache.get_symbols())
+    timer.mark(f"symbols[{source}]", elapsed)
+    print(f">> Toplam {len(symbols)} parite alındı ({source}).")
+
+    _, elapsed = await runtime
+    timer.mark("imports", elapsed)
+
+    if Config.RUN_MODE == "worker":
+        # Consistent-hash bölümüne düşen pariteler; döngüyü ve evren güncellemelerini coordinator yönetir
+        worker = await build_shard(symbols, Config.SHARD_INDEX, cache)
+        await worker.serve(Config.SHARD_LISTEN)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await close_shard(worker)
+        return
+
+    if Config.RUN_MODE == "local_cluster":
+        # Tek process'te SHARD_COUNT worker + coordinator (yerel test)
+        from core.shard_cluster import InProcessTransport
+        workers = [await build_shard(symbols, i, cache) for i in range(Config.SHARD_COUNT)]
 
-    print(">> Binance USDT vadeli pariteleri çekiliyor...")
-    symbols = await exchange.get_usdt_futures_symbols()
-    print(f">> Toplam {len(symbols)} parite alındı.")
+        async def _close_all():
+            for w in workers:
+                await close_shard(w)
+        return await run_coordinator([InProcessTransport(w) for w in workers], on_close=_close_all,
+                                     symbols=symbols, cache=cache)
+
+    from core.data_pipeline import DataPipeline
+    from core.agent_pool import AgentPool
+    from core.meta_decision_engine import MetaDecisionEngine
+    from core.strategy_manager import StrategyManager
+    from core.self_learning import get_agent_weights
+    from core.orchestrator import Orchestrator
 
     # 2. Data pipeline (REST+WebSocket destekli), agent pool, karar motoru, strateji yöneticisi oluşturuluyor
-    pipeline = DataPipeline(symbols)
-    await pipeline.start_websockets()  # WebSocket clientları başlat
+    with timer.phase("pipeline"):
+        pipeline = DataPipeline(symbols)
+        # WS bağlantıları arka planda kademeli açılır; ilk döngü bağlanmamış pariteleri REST'ten çeker
+        await pipeline.start_websockets(background=True)
 
-    agent_pool = AgentPool()
-    decision_engine = MetaDecisionEngine()
-    strategy_manager = StrategyManager()
+    with timer.phase("agent_pool"):
+        agent_pool = AgentPool()
+        decision_engine = MetaDecisionEngine()
+        strategy_manager = StrategyManager()
 
     # 3. Orchestrator oluşturuluyor
     orchestrator = Orchestrator(
@@ -37,36 +186,56 @@ async def main():
         strategy_manager=strategy_manager,
     )
 
+    # Yeni listeleme/delist'ler yeniden başlatmadan (ısınma kaybı olmadan) uygulanır
+    universe = start_universe([orchestrator], cache)
+
+    # Mum tamponları, ajan geçmişleri ve karar durumu son checkpoint'ten yüklenir
+    with timer.phase("restore"):
+        checkpoint = open_checkpoint(orchestrator)
+
     print(">> Sistem hazır. Sonsuz analiz döngüsü başlıyor...")
 
     try:
-        while True:
-            try:
-                # 4. Tüm pariteler için tek seferde veri çek, analiz et, karar ver
-                results = await orchestrator.run_once()
+        if Config.SCHEDULER_MODE == "event":
+            # 4. WS olayları (mum kapanışı, derinlik, trade burst) sadece etkilenen pariteleri analiz ettirir
+            from core.event_scheduler import EventScheduler
+            timer.report()
+            await EventScheduler(orchestrator).run_forever()
+        else:
+            first_cycle = True
 
-                # 5. Sonuçları raporla, logla, öğrenme modüllerini çalıştır
-                for symbol, final_decision in results.items():
-                    await send_report(final_decision)
-                    log_decision(final_decision)
-                    update_agent_stats(final_decision)
-                    update_meta_weights(final_decision)
+            while True:
+                try:
+                    # 4. Tüm pariteler için tek seferde veri çek, analiz et, karar ver
+                    #    (en iyi sinyallerin raporlama/log/öğrenme adımları run_once içinde)
+                    if first_cycle:
+                        first_cycle = False
+                        try:
+                            with timer.phase("first_cycle"):
+                                results = await orchestrator.run_once()
+                        finally:
+                            timer.report()
+                    else:
+                        results = await orchestrator.run_once()
 
-                # 6. Dinamik olarak ajan ağırlıklarını güncelle
-                weights = get_agent_weights()
+                    # 5. Dinamik olarak ajan ağırlıklarını güncelle
+                    agent_pool.agent_weights = get_agent_weights()
 
-                print(f">> Döngü tamamlandı. {len(results)} parite işlendi.")
+                    print(f">> Döngü tamamlandı. {len(results)} parite işlendi.")
 
-            except Exception as e:
-                print(f"[ANA DÖNGÜ HATASI]: {e}")
+                except Exception as e:
+                    print(f"[ANA DÖNGÜ HATASI]: {e}")
 
-            await asyncio.sleep(Config.ANALYSIS_INTERVAL)
+                await asyncio.sleep(Config.ANALYSIS_INTERVAL)
 
     except asyncio.CancelledError:
         print(">> Sistem durduruldu, websocket bağlantıları kapanıyor...")
 
     finally:
+        stop_task(universe)
+        await close_checkpoint(*checkpoint)
         await pipeline.stop_websockets()
+        agent_pool.shutdown()
         print(">> WebSocket bağlantıları kapatıldı, program sonlandırıldı.")
 
 if __name__ == "__main__":
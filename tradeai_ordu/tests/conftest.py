@@ -0,0 +1,55 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Modüller proje kökünden import edilir (config.config, core.*, data.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_klines(seed=0, n=250, start=1700000000000, interval_ms=900000):
+    from data.features import calculate_technicals
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    open_time = start + np.arange(n) * interval_ms
+    df = pd.DataFrame({
+        "open_time": open_time, "open": close + rng.normal(0, 0.1, n), "high": close + 0.5,
+        "low": close - 0.5, "close": close, "volume": rng.random(n) * 1000,
+        "close_time": open_time + interval_ms - 1,
+    })
+    return calculate_technicals(df)
+
+
+def make_snapshot(symbol="BTCUSDT", seed=0, df=None):
+    """
+    Pipeline'ın ürettiği gibi doğrulanmış, indikatörlü bir SymbolSnapshot.
+    """
+    from data.codec import orderbook_arrays
+    from data.features import detect_patterns, oscillator_alerts
+    from core.snapshot import SymbolSnapshot, kline_views, parse_funding, parse_open_interest
+    df = make_klines(seed) if df is None else df
+    bids, asks = orderbook_arrays({"bids": [["100.1", "2"], ["100.0", "30"]], "asks": [["100.2", "1"], ["100.3", "2"]]})
+    return SymbolSnapshot(
+        symbol=symbol, klines_df=df, klines=kline_views(df), patterns=detect_patterns(df),
+        oscillator_alerts=oscillator_alerts(df), volume_anomaly=1.3,
+        time_features={"atr": df.ATR_14.iloc[-1], "volatility": 1.0},
+        orderbook_bids=bids, orderbook_asks=asks,
+        orderbook_anomaly={"big_bid": 30, "big_ask": 2, "spoofing": False, "spread": 0.1},
+        funding_rates=parse_funding([{"fundingRate": "0.0001"}] * 4),
+        oi_changes=parse_open_interest([{"sumOpenInterest": "100"}] * 5),
+    ).validate()
+
+
+@pytest.fixture
+def snapshots():
+    return lambda n, prefix="S": {f"{prefix}{i}USDT": make_snapshot(f"{prefix}{i}USDT", i) for i in range(n)}
+
+
+@pytest.fixture
+def snapshot_from():
+    # Verilen kline DataFrame'inden tek snapshot (kısa geçmiş / özel seri testleri için)
+    return lambda symbol, df: make_snapshot(symbol, df=df)
@@ -0,0 +1,51 @@
+# tests/test_agent_executor.py
+
+import asyncio
+import threading
+
+from agents.base_agent import BaseAgent
+from core.agent_executor import AgentExecutor
+from core.agent_pool import AgentPool
+from core.snapshot import SymbolSnapshot
+
+
+class SlowAgent(BaseAgent):
+    default_params = {}
+    release = threading.Event()
+    calls = 0
+
+    def analyze(self):
+        SlowAgent.calls += 1
+        SlowAgent.release.wait(5)
+        self._base_output(score=0.5, confidence=0.5, risk=0.0, direction="long", type="slow", explanation="")
+
+
+def test_timed_out_thread_instance_is_skipped_until_done():
+    SlowAgent.release.clear()
+    SlowAgent.calls = 0
+    executor = AgentExecutor(mode="thread", max_workers=2, timeout=0.05)
+    pool = AgentPool(agent_list=[SlowAgent], executor=executor)
+    snap = SymbolSnapshot(symbol="AAAUSDT")
+
+    async def scenario():
+        assert await pool._run_agent(SlowAgent, snap) is None          # timeout
+        agent = pool.registry.peek(SlowAgent, "AAAUSDT")
+        assert executor.busy(agent)
+        other = SymbolSnapshot(symbol="AAAUSDT")
+        assert await pool._run_agent(SlowAgent, other) is None          # hâlâ sürüyor: atlanır
+        assert agent.data is snap and SlowAgent.calls == 1
+        SlowAgent.release.set()
+        for _ in range(100):
+            if not executor.busy(agent):
+                break
+            await asyncio.sleep(0.01)
+        result = await pool._run_agent(SlowAgent, other)
+        assert result is not None and agent.data is other and SlowAgent.calls == 2
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        SlowAgent.release.set()
+        pool.shutdown()
+    stats = executor.stats()["SlowAgent"]
+    assert (stats["timeout"], stats["busy"], stats["success"]) == (1, 1, 1)
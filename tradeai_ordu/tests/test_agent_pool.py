@@ -0,0 +1,133 @@
+# tests/test_agent_pool.py
+
+import asyncio
+import time
+
+import pytest
+
+from agents.midterm_agent import MidtermAgent
+from agents.momentum_agent import MomentumAgent
+from agents.scalp_agent import ScalpAgent
+from config.config import Config
+from core.agent_executor import AgentExecutor
+from core.agent_pool import AgentPool
+
+
+@pytest.fixture
+def pool():
+    pool = AgentPool(agent_list=[ScalpAgent, MidtermAgent, MomentumAgent], executor=AgentExecutor(mode="thread", max_workers=2))
+    yield pool
+    pool.shutdown()
+
+
+def test_batch_agents_are_persistent_and_keep_history(monkeypatch, pool, snapshots):
+    monkeypatch.setattr(Config, "AGENT_BATCH_MODE", True)
+    batch = snapshots(3)
+    instance = pool.batch_agents[ScalpAgent]
+    for _ in range(3):
+        results = asyncio.run(pool.analyze_batch(batch))
+    assert pool.batch_agents[ScalpAgent] is instance
+    for symbol in batch:
+        names = {r.agent_name for r in results[symbol]}
+        assert {"ScalpAgent", "MidtermAgent", "MomentumAgent"} <= names
+        assert len(pool.registry.peek(ScalpAgent, symbol).history) == 3
+    arrays, meta = pool.checkpoint_state()
+    assert ["ScalpAgent", "S0USDT"] in meta["keys"]
+
+
+def test_batch_timeout_drops_agent_for_the_cycle(monkeypatch, pool, snapshots):
+    monkeypatch.setattr(Config, "AGENT_BATCH_MODE", True)
+    pool.executor.agent_timeouts = {"ScalpAgent": 0.05}
+    release = __import__("threading").Event()
+    original = ScalpAgent.analyze_batch
+    monkeypatch.setattr(ScalpAgent, "analyze_batch", lambda self, m: (release.wait(5), original(self, m))[1])
+    batch = snapshots(2)
+    try:
+        results = asyncio.run(pool.analyze_batch(batch))
+        assert all("ScalpAgent" not in {r.agent_name for r in res} for res in results.values())
+        assert pool.executor.busy(pool.batch_agents[ScalpAgent])
+        # Önceki çağrı sürerken ajan atlanır, parite bazlı moda da düşmez
+        results = asyncio.run(pool.analyze_batch(batch))
+        assert all("ScalpAgent" not in {r.agent_name for r in res} for res in results.values())
+    finally:
+        release.set()
+    stats = pool.executor.stats()["ScalpAgent"]
+    assert stats["timeout"] == 1 and stats["busy"] == 1
+
+
+class SlowAgents:
+    """
+    analyze_symbol yerine geçen sahte ajan koşusu: parite başına gecikme, eşzamanlılık ve iptal kaydı.
+    """
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.active = 0
+        self.peak = 0
+        self.cancelled = set()
+
+    async def __call__(self, data, agent_classes=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delays[data.symbol])
+            return [{"agent_name": "ScalpAgent", "symbol": data.symbol}]
+        except asyncio.CancelledError:
+            self.cancelled.add(data.symbol)
+            raise
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def slow_pool(monkeypatch, pool):
+    monkeypatch.setattr(Config, "AGENT_BATCH_MODE", False)
+
+    def install(delays):
+        fake = SlowAgents(delays)
+        monkeypatch.setattr(pool, "analyze_symbol", fake)
+        return fake
+
+    return install
+
+
+def test_stream_batch_respects_max_parallel(monkeypatch, pool, slow_pool, snapshots):
+    monkeypatch.setattr(Config, "MAX_PARALLEL_SYMBOL", 2)
+    batch = snapshots(6)
+    fake = slow_pool({s: 0.02 for s in batch})
+    results = asyncio.run(pool.analyze_batch(batch, deadline=5))
+    assert fake.peak == 2
+    assert set(results) == set(batch)
+    # Açık max_parallel Config'in önüne geçer
+    fake = slow_pool({s: 0.02 for s in batch})
+    asyncio.run(pool.analyze_batch(batch, max_parallel=3, deadline=5))
+    assert fake.peak == 3
+
+
+def test_stream_batch_yields_as_symbols_complete(pool, slow_pool, snapshots):
+    batch = snapshots(3)
+    fake = slow_pool({"S0USDT": 0.4, "S1USDT": 0.01, "S2USDT": 0.05})
+
+    async def collect():
+        start = time.monotonic()
+        arrivals = []
+        async for chunk in pool.stream_batch(batch, max_parallel=3, deadline=5):
+            arrivals += [(symbol, time.monotonic() - start) for symbol in chunk]
+        return arrivals
+
+    arrivals = asyncio.run(collect())
+    assert [symbol for symbol, _ in arrivals] == ["S1USDT", "S2USDT", "S0USDT"]
+    # Hızlı pariteler en yavaşı beklemeden gelir
+    assert arrivals[0][1] < 0.2 and arrivals[1][1] < 0.2
+    assert not fake.cancelled
+
+
+def test_stream_batch_deadline_cancels_pending(pool, slow_pool, snapshots):
+    batch = snapshots(4)
+    fake = slow_pool({"S0USDT": 0.01, "S1USDT": 5, "S2USDT": 0.02, "S3USDT": 5})
+    start = time.monotonic()
+    results = asyncio.run(pool.analyze_batch(batch, max_parallel=4, deadline=0.2))
+    assert time.monotonic() - start < 1
+    assert set(results) == {"S0USDT", "S2USDT"}
+    assert fake.cancelled == {"S1USDT", "S3USDT"}
+    assert fake.active == 0
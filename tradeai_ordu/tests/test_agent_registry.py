@@ -0,0 +1,61 @@
+# tests/test_agent_registry.py
+
+import numpy as np
+
+from agents.momentum_agent import MomentumAgent
+from agents.scalp_agent import ScalpAgent
+from core.agent_registry import AgentRegistry
+from core.agent_result import AgentResult
+from core.ring_buffer import HistoryRing, pack_rings, unpack_ring
+
+
+def test_ring_wraparound_keeps_latest_in_order():
+    ring = HistoryRing(capacity=4)
+    for i in range(6):
+        ring.append(float(i), 0.5, 0.1, "long")
+    assert len(ring) == 4
+    np.testing.assert_array_equal(ring.last("score", 10), [2, 3, 4, 5])
+    np.testing.assert_array_equal(ring.last("score", 2), [4, 5])
+    assert ring.count_below(4, 3.5) == 2
+    copy = unpack_ring(pack_rings([ring]), 0)
+    np.testing.assert_array_equal(copy.last("score", 4), ring.last("score", 4))
+    copy.append(6.0, 0.5, 0.1, "short")
+    np.testing.assert_array_equal(copy.last("score", 4), [3, 4, 5, 6])
+
+
+def test_win_count_only_counts_signalled_matches():
+    ring = HistoryRing(capacity=8)
+    for direction, signal in [("long", "long"), ("long", "short"), ("none", None), ("short", "short"), ("long", None)]:
+        ring.append(0.5, 0.5, 0.1, direction)
+        if signal:
+            ring.set_trade_result(signal)
+    # "none" kararlar ve sinyal verilmeyen döngüler kazanç sayılmaz
+    assert ring.win_count(8) == 2
+    assert ring.win_count(2) == 1
+    ring.append(0.05, 0.5, 0.1, "long")
+    ring.set_trade_result("long")
+    assert ring.win_count(8, min_score=0.1) == 2
+
+
+def test_registry_get_remember_evict(snapshots):
+    registry = AgentRegistry()
+    snaps = snapshots(2)
+    first = registry.get(ScalpAgent, snaps["S0USDT"])
+    assert registry.get(ScalpAgent, snaps["S0USDT"]) is first
+    assert registry.peek(ScalpAgent, "S0USDT") is first and registry.peek(ScalpAgent, "S1USDT") is None
+    registry.remember(MomentumAgent, snaps["S0USDT"], AgentResult(agent_name="MomentumAgent", score=0.7, direction="long"))
+    registry.remember(ScalpAgent, snaps["S1USDT"], AgentResult(agent_name="ScalpAgent", score=0.3, direction="short"))
+    assert len(registry) == 3
+    assert len(registry.peek(MomentumAgent, "S0USDT").history) == 1
+    registry.record_trade("S0USDT", "long", {"MomentumAgent"})
+    assert registry.peek(MomentumAgent, "S0USDT").history.win_count(5) == 1
+    arrays, meta = registry.checkpoint_state()
+    registry.evict("S0USDT")
+    assert set(registry.agents_for("S1USDT")) == {"ScalpAgent"} and not registry.agents_for("S0USDT")
+    # Geri yüklenen geçmiş ajan ilk yaratıldığında bağlanır; evict bekleyenleri de siler
+    restored = AgentRegistry()
+    restored.restore_state(arrays, meta)
+    agent = restored.get(MomentumAgent, snaps["S0USDT"])
+    np.testing.assert_allclose(agent.history.last("score", 1), [0.7])
+    restored.evict("S1USDT")
+    assert ["ScalpAgent", "S1USDT"] not in restored.checkpoint_state()[1]["keys"]
@@ -0,0 +1,121 @@
+# tests/test_anomaly_engine.py
+
+import numpy as np
+import pytest
+
+from core.anomaly_engine import FEATURES, MAD_SCALE, AnomalyEngine, source_stamps
+
+RET, VOLUME, SPREAD, FUNDING, OI, IMBALANCE = range(len(FEATURES))
+CANDLE_MS = 900_000
+
+
+def feed(engine, rng, cycles, candle_every=15, funding_every=480, oi_every=5, shock_at=None):
+    """
+    60 sn'lik döngü taklidi: kapanış/hacim mumda, funding ve OI kendi periyotlarında değişir,
+    orderbook feature'ları her döngüde yenilenir. (döngü, mesafe, z) listesi döner.
+    """
+    close, funding, oi = 100.0, 0.0001, 1e6
+    out = []
+    for t in range(cycles):
+        if t % candle_every == 0:
+            close *= np.exp(rng.normal(0, 0.002) + (0.05 if t == shock_at else 0.0))
+        if t % funding_every == 0:
+            funding += rng.normal(0, 1e-5)
+        if t % oi_every == 0:
+            oi *= 1 + rng.normal(0, 0.001)
+        x = [np.nan, 0.1 * (t // candle_every % 3), 1e-4 + rng.normal(0, 1e-5), 1e-6 * (t // funding_every),
+             0.001 * (t // oi_every % 2), rng.normal(0, 0.1)]
+        stamps = [t // candle_every * CANDLE_MS, t // funding_every * 1.0, t // oi_every * 1.0]
+        distance, z = engine.update(["BTCUSDT"], [close], [x], [stamps])
+        out.append((t, distance[0], z[0]))
+    return out
+
+
+def test_piecewise_constant_inputs_only_update_on_new_observations():
+    engine = AnomalyEngine(alpha=0.05, eta=0.05, min_obs=10)
+    feed(engine, np.random.default_rng(0), 1500)
+    n = engine.n[engine.slots["BTCUSDT"]]
+    assert n[RET] == 1500 // 15 - 1          # ilk mumun getirisi yok
+    assert n[VOLUME] == 1500 // 15
+    assert n[FUNDING] == 1500 // 480 + 1
+    assert n[OI] == 1500 // 5
+    assert n[SPREAD] == n[IMBALANCE] == 1500
+    # Getiri dağılımı sıfıra çökmemiş: ölçek mum getirisi std'sine (0.002) yakın
+    row = engine.slots["BTCUSDT"]
+    assert 0.0005 < MAD_SCALE * engine.mad[row, RET] < 0.006
+
+
+def test_normal_candle_closes_do_not_saturate_and_shock_does():
+    engine = AnomalyEngine(alpha=0.05, eta=0.05, min_obs=10)
+    rng = np.random.default_rng(1)
+    history = feed(engine, rng, 1500)
+    closes = [z[RET] for t, _, z in history[600:] if t % 15 == 0]
+    assert np.percentile(np.abs(closes), 95) < 4
+    shocked = AnomalyEngine(alpha=0.05, eta=0.05, min_obs=10)
+    out = feed(shocked, np.random.default_rng(1), 1500, shock_at=1200)
+    assert out[1200][2][RET] >= 9
+    # Aynı mum sonraki döngülerde tekrar skorlanmaz
+    assert all(z[RET] == 0 for _, _, z in out[1201:1215])
+
+
+def test_missing_stamps_fall_back_to_every_cycle():
+    engine = AnomalyEngine(min_obs=1)
+    for _ in range(3):
+        engine.update(["X"], [100.0], [[np.nan, 1.0, 1.0, 1.0, 1.0, 1.0]], [[np.nan, np.nan, np.nan]])
+    assert (engine.n[engine.slots["X"]][1:] == 3).all()
+
+
+def test_sketches_track_welford_and_median():
+    engine = AnomalyEngine(alpha=0.01, eta=0.005, min_obs=5)
+    rng = np.random.default_rng(2)
+    data = rng.normal(3.0, 2.0, (4000, len(FEATURES)))
+    for row in data:
+        engine.update(["X"], [np.nan], [row])
+    slot = engine.slots["X"]
+    cols = slice(1, None)  # "ret" kapanıştan türetilir
+    np.testing.assert_allclose(engine.mean[slot, cols], data[:, cols].mean(axis=0), rtol=1e-9)
+    np.testing.assert_allclose(engine.m2[slot, cols] / (len(data) - 1), data[:, cols].var(axis=0, ddof=1), rtol=1e-9)
+    assert np.abs(engine.median[slot, cols] - 3.0).max() < 0.3
+    assert np.abs(MAD_SCALE * engine.mad[slot, cols] - 2.0).max() < 0.4
+
+
+def test_outlier_scores_higher_than_inliers():
+    engine = AnomalyEngine(alpha=0.05, eta=0.05, min_obs=20)
+    rng = np.random.default_rng(3)
+    for _ in range(300):
+        engine.update(["X"], [np.nan], [rng.normal(0, 1, len(FEATURES))])
+    inlier, _ = engine.update(["X"], [np.nan], [np.zeros(len(FEATURES))])
+    outlier, z = engine.update(["X"], [np.nan], [np.full(len(FEATURES), 8.0)])
+    assert inlier[0] < 1 and outlier[0] > 5 and (z[0, 1:] > 5).all()
+
+
+def test_checkpoint_keeps_stamps(snapshots):
+    engine = AnomalyEngine(min_obs=1)
+    snap = snapshots(1)["S0USDT"]
+    snap.funding_time, snap.oi_time = 1000, 2000
+    engine.score_batch([snap])
+    arrays, meta = engine.checkpoint_state()
+    restored = AnomalyEngine(min_obs=1)
+    restored.restore_state(arrays, {**meta, "downtime": 0.0})
+    slot = restored.slots["S0USDT"]
+    np.testing.assert_array_equal(restored.last_stamp[slot], source_stamps(snap))
+    # Aynı snapshot tekrar gelirse mum/funding/OI feature'ları güncellenmez
+    before = restored.n[slot].copy()
+    restored.score_batch([snap])
+    assert (restored.n[slot] - before)[[RET, VOLUME, FUNDING, OI]].sum() == 0
+
+
+@pytest.mark.parametrize("k", [1, 5])
+def test_batch_equals_sequential(k):
+    rng = np.random.default_rng(4)
+    symbols = [f"S{i}" for i in range(k)]
+    batch, single = AnomalyEngine(min_obs=3), AnomalyEngine(min_obs=3)
+    for step in range(20):
+        closes = rng.uniform(90, 110, k)
+        x = rng.normal(0, 1, (k, len(FEATURES)))
+        stamps = np.full((k, 3), float(step))
+        d_batch, z_batch = batch.update(symbols, closes, x, stamps)
+        for i, s in enumerate(symbols):
+            d, z = single.update([s], closes[i:i + 1], x[i:i + 1], stamps[i:i + 1])
+            assert d[0] == pytest.approx(d_batch[i])
+            np.testing.assert_allclose(z[0], z_batch[i])
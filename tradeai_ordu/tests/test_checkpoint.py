@@ -0,0 +1,78 @@
+# tests/test_checkpoint.py
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from core.checkpoint import Checkpointer
+
+
+class Component:
+    def __init__(self, values=None):
+        self.values = values
+        self.restored = None
+
+    def checkpoint_state(self):
+        return {"values": np.asarray(self.values)}, {"n": len(self.values)}
+
+    def restore_state(self, arrays, meta, symbols=None):
+        self.restored = (np.array(arrays["values"]), meta)
+
+
+def test_save_and_restore(tmp_path):
+    saver = Checkpointer({"c": Component([1.0, 2.0, 3.0])}, directory=str(tmp_path), interval=0)
+    assert asyncio.run(saver.save()) == 1
+    target = Component()
+    info = Checkpointer({"c": target}, directory=str(tmp_path), interval=0).load()
+    assert info["generation"] == 1 and info["components"] == ["c"]
+    np.testing.assert_array_equal(target.restored[0], [1.0, 2.0, 3.0])
+    assert target.restored[1]["n"] == 3 and target.restored[1]["downtime"] >= 0
+
+
+def test_failed_write_keeps_previous_generation(tmp_path, monkeypatch):
+    comp = Component([1.0, 2.0])
+    saver = Checkpointer({"c": comp}, directory=str(tmp_path), interval=0)
+    asyncio.run(saver.save())
+    comp.values = [9.0, 9.0]
+    monkeypatch.setattr("core.checkpoint.json.dump", lambda *a, **k: (_ for _ in ()).throw(OSError("disk full")))
+    with pytest.raises(OSError):
+        asyncio.run(saver.save())
+    monkeypatch.undo()
+    target = Component()
+    info = Checkpointer({"c": target}, directory=str(tmp_path), interval=0).load()
+    assert info["generation"] == 1
+    np.testing.assert_array_equal(target.restored[0], [1.0, 2.0])
+    # Yarım kalan neslin dosyaları bir sonraki başarılı kayıtta temizlenir
+    asyncio.run(saver.save())
+    assert sorted(p.name for p in tmp_path.glob("*.npy")) == ["c.values.3.npy"]
+
+
+def test_saves_are_serialized(tmp_path, monkeypatch):
+    saver = Checkpointer({"c": Component([1.0])}, directory=str(tmp_path), interval=0)
+    write = saver.write
+    active, overlaps, gate = [0], [], threading.Event()
+
+    def slow_write(states, generation):
+        active[0] += 1
+        overlaps.append(active[0])
+        gate.wait(1)
+        write(states, generation)
+        active[0] -= 1
+
+    monkeypatch.setattr(saver, "write", slow_write)
+
+    async def scenario():
+        periodic = asyncio.create_task(saver.save())
+        await asyncio.sleep(0.05)
+        periodic.cancel()                       # close_checkpoint: görev iptal + kapanış kaydı
+        shutdown = asyncio.create_task(saver.save())
+        await asyncio.sleep(0.05)
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await periodic
+        return await shutdown
+
+    assert asyncio.run(scenario()) == 2
+    assert overlaps == [1, 1]
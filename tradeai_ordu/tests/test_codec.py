@@ -0,0 +1,76 @@
+# tests/test_codec.py
+
+import numpy as np
+import pandas as pd
+
+from data.codec import encode_klines, decode_klines, encode_orderbook, decode_orderbook
+
+
+def _klines(n=150, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.round(65000 + np.cumsum(rng.normal(0, 40, n)), 1)
+    t0 = 1700000000000
+    return pd.DataFrame({
+        "open_time": t0 + np.arange(n) * 900000,
+        "open": np.round(close + rng.normal(0, 10, n), 1),
+        "close": close,
+        "volume": np.round(rng.gamma(2, 500, n), 3),
+        "close_time": t0 + np.arange(n) * 900000 + 899999,
+        "quote_asset_volume": [f"{v:.8f}" for v in rng.gamma(2, 3e7, n)],
+        "num_trades": rng.integers(1000, 9000, n),
+        "EMA_9": close.cumsum() / np.arange(1, n + 1) + rng.normal(0, 1e-6, n),
+        "SMA_200": np.full(n, np.nan),
+        "Trend": rng.choice([-1, 1], n),
+    })
+
+
+def test_f8_roundtrip_is_lossless():
+    df = _klines()
+    out = decode_klines(encode_klines(df, float_dtype="f8"))
+    for name in df.columns:
+        expected = pd.to_numeric(df[name]).to_numpy(dtype=np.float64)
+        assert np.array_equal(np.asarray(out[name], dtype=np.float64), expected, equal_nan=True), name
+
+
+def test_decimal_columns_use_integer_ticks():
+    doc = encode_klines(_klines())
+    cols = doc["columns"]
+    for name in ("open", "close", "volume", "num_trades", "Trend", "open_time"):
+        assert cols[name]["enc"] == "delta", name
+    # Tam ondalık karşılığı olmayan indikatörler ham float kalır
+    assert cols["EMA_9"]["enc"] == "raw"
+    assert cols["Trend"]["dtype"] == np.dtype(np.int8).str
+
+
+def test_inexact_prices_fall_back_to_raw():
+    df = _klines()
+    df["close"] = df["close"] + 1e-9 / 3
+    doc = encode_klines(df)
+    assert doc["columns"]["close"]["enc"] == "raw"
+    assert np.array_equal(decode_klines(doc)["close"], df["close"].to_numpy())
+
+
+def test_legacy_records_are_readable():
+    df = _klines(5)
+    out = decode_klines(df.to_dict("records"), as_frame=True)
+    assert list(out.columns) == list(df.columns) and len(out) == 5
+
+
+def test_orderbook_roundtrip():
+    ob = {"bids": [["100.1", "2"], ["100.0", "30.5"]], "asks": [["100.2", "1"]]}
+    bids, asks = decode_orderbook(encode_orderbook(ob))
+    assert bids.tolist() == [[100.1, 2.0], [100.0, 30.5]] and asks.tolist() == [[100.2, 1.0]]
+
+
+def test_non_numeric_columns_are_logged(capsys):
+    df = _klines(5)
+    df["note"] = ["a", "b", "c", "d", "e"]
+    df["mixed"] = ["1.5", "x", "2.5", None, "3"]
+    doc = encode_klines(df)
+    assert "note" not in doc["columns"]
+    decoded = decode_klines(doc)
+    np.testing.assert_array_equal(decoded["mixed"], [1.5, np.nan, 2.5, np.nan, 3.0])
+    out = capsys.readouterr().out
+    assert "'note' kolonu sayısal değil" in out and "'mixed' kolonu kısmen sayısal değil, 1 değer" in out
+    encode_klines(df)
+    assert capsys.readouterr().out == ""
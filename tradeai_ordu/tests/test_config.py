@@ -0,0 +1,27 @@
+# tests/test_config.py
+
+import pytest
+
+from config.config import Config
+
+
+def test_default_config_is_valid():
+    Config.validate()
+
+
+@pytest.mark.parametrize("name, value", [
+    ("AGENT_EVAL_MODE", "lazy"),
+    ("AGENT_BATCH_MODE", True),
+    ("AGENT_TIMEOUT_OVERRIDES", "MomentumAgent=3"),
+    ("CHECKPOINT_INTERVAL_SEC", 300.0),
+])
+def test_sharded_rejects_unsupported_combinations(monkeypatch, name, value):
+    monkeypatch.setattr(Config, "AGENT_EXECUTOR", "sharded")
+    monkeypatch.setattr(Config, "AGENT_EVAL_MODE", "parallel")
+    monkeypatch.setattr(Config, "AGENT_BATCH_MODE", False)
+    monkeypatch.setattr(Config, "AGENT_TIMEOUT_OVERRIDES", "")
+    monkeypatch.setattr(Config, "CHECKPOINT_INTERVAL_SEC", 0.0)
+    Config.validate()
+    monkeypatch.setattr(Config, name, value)
+    with pytest.raises(ValueError):
+        Config.validate()
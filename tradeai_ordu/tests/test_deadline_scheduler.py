@@ -0,0 +1,113 @@
+# tests/test_deadline_scheduler.py
+
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from config.config import Config
+from core import deadline_scheduler
+from core.deadline_scheduler import DeadlineScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(deadline_scheduler.time, "monotonic", clock)
+    monkeypatch.setattr(Config, "ANALYSIS_INTERVAL", 10)
+    return clock
+
+
+def snapshot(symbol, volatility=0.0, close=100.0, volume_anomaly=1.0):
+    return SimpleNamespace(
+        symbol=symbol,
+        latest=SimpleNamespace(close=close),
+        time_features={"volatility": volatility},
+        volume_anomaly=volume_anomaly,
+    )
+
+
+def decision(direction="none"):
+    return {"direction": direction}
+
+
+def test_order_ranks_by_priority_terms(clock):
+    scheduler = DeadlineScheduler(budget=10)
+    scheduler.observe(snapshot("CALM"), decision())
+    scheduler.observe(snapshot("VOL", volatility=2.0), decision())                # 100 * 0.02 = 2
+    scheduler.observe(snapshot("SPIKE", volume_anomaly=math.e ** 3), decision())  # |log| = 3
+    scheduler.observe(snapshot("DRY", volume_anomaly=math.e ** -1.5), decision())  # |log| = 1.5
+    scheduler.observe(snapshot("SIGNAL"), decision("long"))                       # 1
+    clock.now += 20  # herkese eşit bayatlık: 0.5 * 2 = 1
+    symbols = ["CALM", "SIGNAL", "NEW2", "DRY", "VOL", "SPIKE", "NEW1"]
+    # Hiç analiz edilmemişler en önde ve kendi aralarında orijinal sırada
+    assert scheduler.order(symbols) == ["NEW2", "NEW1", "SPIKE", "VOL", "DRY", "SIGNAL", "CALM"]
+    assert scheduler.priority("NEW1") == math.inf
+    assert scheduler.priority("CALM") == pytest.approx(1.0)
+    assert scheduler.priority("SPIKE") == pytest.approx(4.0)
+
+
+def test_deferred_symbols_are_promoted_next_cycle(clock):
+    scheduler = DeadlineScheduler(budget=10)
+    symbols = ["A", "B", "C", "D"]
+    for s in symbols:
+        scheduler.observe(snapshot(s), decision())
+    clock.now += 10
+    planned = scheduler.order(symbols)
+    assert planned == symbols
+    # Bütçe sadece ilk iki pariteye yetti
+    completed = {}
+    for s in planned[:2]:
+        scheduler.observe(snapshot(s), decision())
+        completed[s] = decision()
+    summary = scheduler.finish_cycle(planned, completed)
+    assert summary["deferred"] == 2 and summary["completed"] == 2
+    assert summary["stalest"][0][0] in ("C", "D")
+    clock.now += 10
+    # Ertelenenler daha bayat: sonraki döngüde öne geçer
+    assert scheduler.order(symbols) == ["C", "D", "A", "B"]
+    assert scheduler.stats() == {"cycles": 1, "misses": {"C": 1, "D": 1}}
+
+
+def test_staleness_overtakes_volatility(clock):
+    scheduler = DeadlineScheduler(budget=10)
+    scheduler.observe(snapshot("QUIET"), decision())
+    clock.now += 10
+    scheduler.observe(snapshot("VOL", volatility=1.0), decision())  # 100 * 0.01 = 1
+    # Bayatlık farkı 0.5 * 10/10 = 0.5 < 1: volatil parite önde
+    assert scheduler.order(["QUIET", "VOL"]) == ["VOL", "QUIET"]
+    # VOL yeniden analiz edilmeden önce QUIET 30 sn daha beklediyse fark 0.5 * 30/10 = 1.5 > 1
+    scheduler.observe(snapshot("QUIET"), decision())
+    clock.now += 30
+    scheduler.observe(snapshot("VOL", volatility=1.0), decision())
+    assert scheduler.order(["VOL", "QUIET"]) == ["QUIET", "VOL"]
+
+
+def test_evict_resets_symbol_to_never_analyzed(clock):
+    scheduler = DeadlineScheduler(budget=10)
+    for s in ("A", "B"):
+        scheduler.observe(snapshot(s), decision())
+    scheduler.finish_cycle(["A", "B"], {"B": decision()})
+    scheduler.evict("A")
+    assert "A" not in scheduler.last_done and "A" not in scheduler.features
+    assert scheduler.stats()["misses"] == {}
+    assert scheduler.order(["B", "A"]) == ["A", "B"]
+
+
+def test_deadline_splits_budget_between_fetch_and_analysis(clock):
+    scheduler = DeadlineScheduler(budget=10, fetch_share=0.6)
+    started = clock.now
+    clock.now += 2
+    assert scheduler.fetch_deadline(started) == pytest.approx(4.0)
+    assert scheduler.deadline(started) == pytest.approx(8.0)
+    clock.now += 20
+    assert scheduler.deadline(started) == 0.0
+    assert DeadlineScheduler(budget=0).deadline(started) is None
@@ -0,0 +1,53 @@
+# tests/test_event_scheduler.py
+
+import asyncio
+from types import SimpleNamespace
+
+from core import event_scheduler
+from core.event_scheduler import EventScheduler
+
+
+class FakeOrchestrator:
+    def __init__(self):
+        self.symbols = ["BTCUSDT", "ETHUSDT"]
+        self.agent_pool = SimpleNamespace(agent_weights={})
+        self.data_pipeline = SimpleNamespace(set_event_handler=lambda handler: None)
+        self.batches = []
+
+    async def run_once(self, symbols=None):
+        self.batches.append(symbols)
+        return {}
+
+
+def test_event_mode_refreshes_agent_weights(monkeypatch):
+    versions = iter(range(1, 100))
+    monkeypatch.setattr(event_scheduler, "get_agent_weights", lambda: {"ScalpAgent": next(versions)})
+    orchestrator = FakeOrchestrator()
+
+    async def scenario():
+        scheduler = EventScheduler(orchestrator, debounce=0, sweep_interval=3600, weights_interval=0)
+        task = asyncio.create_task(scheduler.run_forever())
+        await asyncio.sleep(0.01)   # ilk tarama
+        scheduler.notify("BTCUSDT", "kline_close")
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert orchestrator.batches == [["BTCUSDT", "ETHUSDT"], ["BTCUSDT"]]
+    assert orchestrator.agent_pool.agent_weights == {"ScalpAgent": 2}
+    assert scheduler.runs == 2
+
+
+def test_weights_are_rate_limited(monkeypatch):
+    calls = []
+    monkeypatch.setattr(event_scheduler, "get_agent_weights", lambda: calls.append(1) or {})
+
+    async def scenario():
+        scheduler = EventScheduler(FakeOrchestrator(), weights_interval=3600)
+        for _ in range(5):
+            scheduler._refresh_weights()
+
+    asyncio.run(scenario())
+    assert calls == []
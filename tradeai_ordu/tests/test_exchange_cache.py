@@ -0,0 +1,126 @@
+# tests/test_exchange_cache.py
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from data import exchange_cache
+from data.exchange_cache import ExchangeInfoCache
+
+
+def exchange_info(*symbols, status="TRADING"):
+    return {"symbols": [{"symbol": s, "contractType": "PERPETUAL", "quoteAsset": "USDT", "status": status}
+                        for s in symbols]}
+
+
+@pytest.fixture
+def network(monkeypatch):
+    replies = []
+
+    async def fetch():
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(exchange_cache, "fetch_binance_exchange_info", fetch)
+    return replies
+
+
+def test_empty_refresh_raises_and_keeps_cache(tmp_path, network):
+    path = tmp_path / "exchange_info.json"
+    cache = ExchangeInfoCache(path=str(path), ttl=3600)
+    network += [exchange_info("BTCUSDT", "ETHUSDT"), exchange_info("BTCUSDT", status="SETTLING"), {"symbols": []}]
+    assert asyncio.run(cache.refresh()) == ["BTCUSDT", "ETHUSDT"]
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            asyncio.run(cache.refresh())
+    assert cache.entry["symbols"] == ["BTCUSDT", "ETHUSDT"]
+    assert json.loads(path.read_text())["symbols"] == ["BTCUSDT", "ETHUSDT"]
+
+
+def write_cache(path, symbols, age=0.0):
+    path.write_text(json.dumps({"fetched_at": time.time() - age, "symbols": symbols, "exchange_info": {}}))
+
+
+def test_missing_or_corrupt_cache_fetches_from_network(tmp_path, network):
+    path = tmp_path / "sub" / "exchange_info.json"
+    network += [exchange_info("BTCUSDT"), exchange_info("ETHUSDT")]
+    cache = ExchangeInfoCache(path=str(path), ttl=3600)
+    assert asyncio.run(cache.get_symbols()) == (["BTCUSDT"], "network")
+    assert json.loads(path.read_text())["symbols"] == ["BTCUSDT"]
+    path.write_text('{"fetched_at": 1, "symb')
+    cache = ExchangeInfoCache(path=str(path), ttl=3600)
+    assert asyncio.run(cache.get_symbols()) == (["ETHUSDT"], "network")
+    assert not network
+
+
+def test_fresh_cache_skips_network(tmp_path, network):
+    path = tmp_path / "exchange_info.json"
+    write_cache(path, ["BTCUSDT", "ETHUSDT"], age=10)
+    cache = ExchangeInfoCache(path=str(path), ttl=3600)
+    # network listesi boş: istek yapılsaydı IndexError olurdu
+    assert asyncio.run(cache.get_symbols()) == (["BTCUSDT", "ETHUSDT"], "cache")
+    assert cache.refresh_task is None
+
+
+def test_stale_cache_returns_immediately_and_refreshes_in_background(tmp_path, network):
+    path = tmp_path / "exchange_info.json"
+    write_cache(path, ["BTCUSDT"], age=7200)
+    network.append(exchange_info("BTCUSDT", "SOLUSDT"))
+    cache = ExchangeInfoCache(path=str(path), ttl=3600)
+
+    async def run():
+        first = await cache.get_symbols()
+        task = cache.refresh_task
+        # Yenileme sürerken ikinci çağrı yeni görev açmaz
+        second = await cache.get_symbols()
+        assert cache.refresh_task is task and not task.done()
+        await task
+        return first, second, await cache.get_symbols()
+
+    first, second, after = asyncio.run(run())
+    assert first == second == (["BTCUSDT"], "stale")
+    assert after == (["BTCUSDT", "SOLUSDT"], "cache")
+    assert json.loads(path.read_text())["symbols"] == ["BTCUSDT", "SOLUSDT"]
+
+
+def test_failed_background_refresh_keeps_stale_list(tmp_path, network):
+    path = tmp_path / "exchange_info.json"
+    write_cache(path, ["BTCUSDT"], age=7200)
+    network += [OSError("timeout"), exchange_info("ETHUSDT")]
+    cache = ExchangeInfoCache(path=str(path), ttl=3600)
+
+    async def run():
+        results = []
+        for _ in range(2):
+            results.append(await cache.get_symbols())
+            await cache.refresh_task
+        return results
+
+    results = asyncio.run(run())
+    assert results == [(["BTCUSDT"], "stale"), (["BTCUSDT"], "stale")]
+    # İkinci yenileme başarılı: yeni liste sonraki çağrıda görünür
+    assert cache.entry["symbols"] == ["ETHUSDT"] and cache.is_fresh()
+
+
+def test_interrupted_write_keeps_previous_cache(tmp_path, network, monkeypatch):
+    path = tmp_path / "exchange_info.json"
+    write_cache(path, ["BTCUSDT"], age=7200)
+    network.append(exchange_info("ETHUSDT"))
+    cache = ExchangeInfoCache(path=str(path), ttl=3600)
+    cache.load()
+
+    def broken_dump(entry, f):
+        f.write('{"fetched_at": ')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(exchange_cache.json, "dump", broken_dump)
+    with pytest.raises(OSError):
+        asyncio.run(cache.refresh())
+    # Yarım yazım tmp dosyada kalır; asıl önbellek ve bellekteki kayıt bozulmaz
+    assert json.loads(path.read_text())["symbols"] == ["BTCUSDT"]
+    assert cache.entry["symbols"] == ["BTCUSDT"]
+    assert ExchangeInfoCache(path=str(path)).load()["symbols"] == ["BTCUSDT"]
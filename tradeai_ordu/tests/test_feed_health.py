@@ -0,0 +1,42 @@
+# tests/test_feed_health.py
+
+import pytest
+
+from core import feed_health
+from core.feed_health import FeedHealthMonitor, StreamHealth
+
+
+class Client:
+    def __init__(self):
+        self.health = {"kline": StreamHealth(), "depth": StreamHealth()}
+
+
+@pytest.mark.parametrize("offset_ms", [-8000.0, 0.0, 12000.0])
+def test_constant_clock_offset_does_not_count_as_latency(monkeypatch, offset_ms):
+    clock = {"now": 1_700_000_000.0}
+    monkeypatch.setattr(feed_health.time, "time", lambda: clock["now"])
+    client = Client()
+    monitor = FeedHealthMonitor({"BTCUSDT": client}, max_age=1e9, max_latency_ms=3000)
+    for stream in ("kline", "depth"):
+        client.health[stream].on_connect()
+    for i, network_ms in enumerate([40, 25, 60, 30, 45] * 4):
+        event_ms = 1_700_000_000_000 + i * 1000
+        clock["now"] = (event_ms + network_ms + offset_ms) / 1000  # yerel saat offset_ms kadar kaymış
+        client.health["kline"].record(event_ms)
+        client.health["depth"].record(event_ms)
+    health = client.health["kline"]
+    assert health.clock_offset_ms == pytest.approx(offset_ms + 25, abs=0.01)
+    assert 0 <= health.latency_ms < 60
+    assert monitor.check("BTCUSDT") == {"kline": True, "depth": True}
+
+
+def test_latency_spike_above_baseline_fails_over(monkeypatch):
+    clock = {"now": 1_700_000_000.0}
+    monkeypatch.setattr(feed_health.time, "time", lambda: clock["now"])
+    health = StreamHealth()
+    health.on_connect()
+    for delay in [0.05] * 5 + [6.0] * 10:
+        health.record(clock["now"] * 1000 - delay * 1000 + 20_000)  # yerel saat 20s geride
+    assert health.clock_offset_ms == pytest.approx(-19_950)
+    assert health.latency_ms > 3000
+    assert not FeedHealthMonitor({}, max_age=1e9, max_latency_ms=3000).stream_ok(health)
@@ -0,0 +1,142 @@
+# tests/test_market_bus.py
+
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import uuid
+
+import numpy as np
+import pytest
+
+from config.config import Config
+from core.market_bus import KLINE_FIELDS, MAX_KLINES, MarketBus, SymbolBusReader, SymbolBusWriter, published_buses
+
+
+@pytest.fixture
+def prefix():
+    return f"t{uuid.uuid4().hex[:8]}"
+
+
+def candle(i):
+    return dict.fromkeys(KLINE_FIELDS, float(i))
+
+
+def test_ring_order_and_depth(prefix):
+    writer = SymbolBusWriter("BTCUSDT", prefix)
+    reader = SymbolBusReader("BTCUSDT", prefix)
+    try:
+        writer.publish_klines([candle(i) for i in range(5)])
+        for i in range(5, MAX_KLINES + 30):
+            writer.append_kline(candle(i))
+        rows = reader.klines()
+        assert rows.shape == (MAX_KLINES, len(KLINE_FIELDS))
+        np.testing.assert_array_equal(rows[:, 0], np.arange(30, MAX_KLINES + 30))
+        writer.publish_depth([["100.5", "2"]], [["100.6", "1"], ["100.7", "3"]])
+        assert reader.top_of_book() == {"bid": 100.5, "bid_qty": 2.0, "ask": 100.6, "ask_qty": 1.0}
+    finally:
+        reader.close()
+        writer.close()
+
+
+def _hammer(prefix, count):
+    writer = SymbolBusWriter("ETHUSDT", prefix, replace_stale=True)
+    try:
+        for i in range(count):
+            writer.append_kline(candle(i))
+            writer.publish_depth([[i, i]] * 20, [[i, i]] * 20)
+    finally:
+        writer.close()
+
+
+def test_seqlock_reader_never_sees_torn_rows(prefix):
+    """
+    Ayrı process'te durmadan yazan yazıcıya karşı her okuma kendi içinde tutarlı olmalı:
+    tüm hücreler aynı sayaç değerini taşır ve ring sırası kesintisizdir.
+    """
+    ctx = multiprocessing.get_context("fork")
+    writer = SymbolBusWriter("ETHUSDT", prefix)
+    writer.close()  # yazıcı alt process'te yeniden yaratılır; okuyucu onu bekler
+    proc = ctx.Process(target=_hammer, args=(prefix, 50_000))
+    proc.start()
+    reader = None
+    try:
+        while reader is None and proc.is_alive():
+            try:
+                reader = SymbolBusReader("ETHUSDT", prefix)
+            except (FileNotFoundError, ValueError):
+                continue
+        assert reader is not None
+        reads = 0
+        while proc.is_alive() and reads < 20_000:
+            rows = reader.klines()
+            if len(rows):
+                assert (rows == rows[:, :1]).all()
+                assert (np.diff(rows[:, 0]) == 1).all()
+            bids, asks = reader.depth()
+            assert (bids == bids[:1, :1]).all() and (asks == bids[:1, :1]).all()
+            reads += 1
+        assert reads > 100
+    finally:
+        proc.join()
+        if reader is not None:
+            reader.close()
+
+
+def test_shard_buses_do_not_share_manifest(tmp_path, prefix):
+    manifest = str(tmp_path / "bus.json")
+    a = MarketBus(prefix, manifest, shard="shard-0")
+    b = MarketBus(prefix, manifest, shard="shard-1")
+    try:
+        a.attach("BTCUSDT")
+        b.attach("ETHUSDT")
+        a.write_manifest()
+        b.write_manifest()
+        assert published_buses(manifest) == {"BTCUSDT": f"{prefix}_shard-0", "ETHUSDT": f"{prefix}_shard-1"}
+        a.close()
+        assert published_buses(manifest) == {"ETHUSDT": f"{prefix}_shard-1"}
+    finally:
+        a.close()
+        b.close()
+
+
+def test_live_segment_is_not_replaced(tmp_path, prefix):
+    manifest = str(tmp_path / "bus.json")
+    owner = MarketBus(prefix, manifest)
+    owner.attach("BTCUSDT")
+    owner.write_manifest()
+    try:
+        # Sahibi canlı (aynı process, segment _OWNED'da): ikinci yazıcı segmenti silemez
+        with pytest.raises(FileExistsError):
+            MarketBus(prefix, manifest).attach("BTCUSDT")
+        # Ölü pid'li manifest: kalan segment bayattır ve yeniden yaratılır
+        with open(manifest, "w", encoding="utf-8") as f:
+            json.dump({"pid": _dead_pid(), "prefix": prefix, "symbols": ["SOLUSDT"]}, f)
+        SymbolBusWriter("SOLUSDT", prefix).shm.close()  # _OWNED dışı bırakılmış yetim segment taklidi
+        _disown(f"{prefix}_SOLUSDT")
+        successor = MarketBus(prefix, manifest)
+        assert successor.replace_stale
+        successor.attach("SOLUSDT").close()
+    finally:
+        owner.close()
+
+
+def _dead_pid():
+    proc = multiprocessing.get_context("fork").Process(target=os._exit, args=(0,))
+    proc.start()
+    proc.join()
+    return proc.pid
+
+
+def _disown(name):
+    from core import market_bus
+    market_bus._OWNED.discard(name)
+
+
+def test_ws_client_does_not_load_bus():
+    # Bus kapalıyken WS istemcisi market_bus'ı yüklememeli; tampon uzunluğu Config'ten gelir
+    code = ("import sys; import core.binance_ws_client as ws; from config.config import Config; "
+            "assert 'core.market_bus' not in sys.modules; assert ws.MAX_KLINES == Config.WS_KLINE_BUFFER")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert MAX_KLINES == Config.WS_KLINE_BUFFER
@@ -0,0 +1,69 @@
+# tests/test_meta_decision_engine.py
+
+import numpy as np
+import pytest
+
+from core import meta_decision_engine
+from core.agent_result import AgentResult
+from core.meta_decision_engine import MetaDecisionEngine
+
+TYPES = ("scalp", "midterm", "trap", "unknown")
+
+
+def random_results(rng, n):
+    return [
+        AgentResult(
+            agent_name=f"Agent{i}", score=float(rng.uniform(-3, 3)), confidence=float(rng.uniform(0, 1)),
+            risk=float(rng.uniform(0, 1)), direction=str(rng.choice(["long", "short", "none"])),
+            type=str(rng.choice(TYPES)), explanation=f"neden {i}", anomaly=bool(rng.random() < 0.05),
+            dump_pump=bool(rng.random() < 0.03), spoofing=bool(rng.random() < 0.05),
+            weight=float(rng.uniform(0.1, 3)),
+        )
+        for i in range(n)
+    ]
+
+
+def strong(direction, n=6):
+    sign = 1 if direction == "long" else -1
+    return [AgentResult(agent_name=f"Agent{i}", score=2.5 * sign, confidence=0.9, risk=0.1,
+                        direction=direction, type="scalp", explanation="güçlü") for i in range(n)]
+
+
+def assert_same(batch, single):
+    for key in ("symbol", "direction", "safe", "reason", "risk_explanation"):
+        assert batch[key] == single[key], key
+    assert batch["edge_strength"] == pytest.approx(single["edge_strength"])
+    assert batch["consensus"] == pytest.approx(single["consensus"])
+    assert batch["strategy"].keys() == single["strategy"].keys()
+    for key, value in single["strategy"].items():
+        if isinstance(value, float):
+            assert batch["strategy"][key] == pytest.approx(value), key
+        else:
+            assert batch["strategy"][key] == value, key
+    for key in ("details", "anomalies", "risk_alerts"):
+        assert [r.agent_name for r in batch[key]] == [r.agent_name for r in single[key]], key
+
+
+def test_decide_batch_matches_decide(monkeypatch):
+    monkeypatch.setattr(meta_decision_engine, "update_meta_weights", lambda decision: None)
+    rng = np.random.default_rng(11)
+    batch_results = {f"S{i}USDT": random_results(rng, int(rng.integers(1, 14))) for i in range(60)}
+    batch_results.update({"LONGUSDT": strong("long"), "SHORTUSDT": strong("short"),
+                          "VETOUSDT": strong("long") + [AgentResult(agent_name="DumpPumpAgent", dump_pump=True)]})
+    engine = MetaDecisionEngine()
+    decisions = engine.decide_batch(batch_results, update_weights=False)
+    assert list(decisions) == list(batch_results)
+    for symbol, results in batch_results.items():
+        assert_same(decisions[symbol], engine.decide(symbol, results))
+    assert decisions["LONGUSDT"]["direction"] == "long"
+    assert decisions["SHORTUSDT"]["direction"] == "short"
+    assert decisions["VETOUSDT"]["direction"] == "none"
+
+
+def test_decide_batch_updates_weights_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(meta_decision_engine, "update_meta_weights_batch", lambda decisions: calls.append(list(decisions)))
+    rng = np.random.default_rng(12)
+    MetaDecisionEngine().decide_batch({f"S{i}USDT": random_results(rng, 4) for i in range(5)})
+    assert len(calls) == 1 and len(calls[0]) == 5
+    assert MetaDecisionEngine().decide_batch({}) == {}
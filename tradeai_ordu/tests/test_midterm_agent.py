@@ -0,0 +1,50 @@
+# tests/test_midterm_agent.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.midterm_agent import MidtermAgent
+from core.snapshot import SnapshotMatrix, trend_slope
+
+
+def trending_klines(n=260, step=0.5, interval_ms=900000):
+    # EMA21 > EMA55 > SMA200 olacak şekilde düzgün yükselen seri (eğim yalnızca pencereden gelir)
+    from data.features import calculate_technicals
+    rng = np.random.default_rng(7)
+    close = 100 + step * np.arange(n) + rng.normal(0, 0.05, n)
+    open_time = 1700000000000 + np.arange(n) * interval_ms
+    df = pd.DataFrame({
+        "open_time": open_time, "open": close - 0.1, "high": close + 0.5, "low": close - 0.5,
+        "close": close, "volume": rng.random(n) * 1000, "close_time": open_time + interval_ms - 1,
+    })
+    return calculate_technicals(df)
+
+
+@pytest.mark.parametrize("rows", [2, 5, 23, 24, 60])
+def test_batch_matches_scalar_with_short_history(rows, snapshot_from):
+    df = trending_klines()
+    # İndikatörler uzun seriden gelir, mum geçmişi trend_slope_window'dan kısa kalır
+    snaps = [snapshot_from("UPUSDT", df.tail(rows).reset_index(drop=True)),
+             snapshot_from("DOWNUSDT", df.iloc[::-1].reset_index(drop=True).tail(rows).reset_index(drop=True))]
+    batch_agent = MidtermAgent(None)
+    matrix = SnapshotMatrix.from_snapshots(snaps, batch_agent.required_batch_features())
+    batch = batch_agent.analyze_batch(matrix)
+    for snap, res in zip(snaps, batch):
+        agent = MidtermAgent(snap)
+        agent.analyze()
+        scalar = agent.result_data
+        assert (res.score, res.confidence, res.risk) == pytest.approx((scalar.score, scalar.confidence, scalar.risk))
+        assert (res.direction, res.anomaly, res.explanation) == (scalar.direction, scalar.anomaly, scalar.explanation)
+    # Kısa geçmişte eğim mevcut satırlardan hesaplanır ve trend kuralı iki yolda da tetiklenir
+    slope = trend_slope(snaps[0].klines["close"], batch_agent.params["trend_slope_window"])
+    assert slope == pytest.approx(0.5, abs=0.1)
+    assert "Güçlü yukarı trend" in batch[0].explanation
+
+
+def test_trend_slope_matches_polyfit():
+    close = np.random.default_rng(3).normal(100, 1, 40)
+    for window in (2, 10, 24, 40, 100):
+        tail = close[-window:]
+        assert trend_slope(close, window) == pytest.approx(np.polyfit(range(len(tail)), tail, 1)[0])
+    assert np.isnan(trend_slope(close[:1], 24))
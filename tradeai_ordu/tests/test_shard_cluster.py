@@ -0,0 +1,94 @@
+# tests/test_shard_cluster.py
+
+import asyncio
+from types import SimpleNamespace
+
+from core.hash_ring import HashRing, shard_name, shard_symbols, universe_version
+from core.shard_cluster import InProcessTransport, ShardCoordinator, ShardWorker
+from core.universe_manager import UniverseManager
+
+SYMBOLS = [f"C{i}USDT" for i in range(600)]
+
+
+def test_partition_is_disjoint_and_complete():
+    parts = [shard_symbols(SYMBOLS, i, 4) for i in range(4)]
+    assert sorted(sum(parts, [])) == sorted(SYMBOLS)
+    assert all(60 < len(p) < 240 for p in parts)
+
+
+def test_partition_is_order_independent_and_deterministic():
+    assert shard_symbols(SYMBOLS[::-1], 1, 3) == shard_symbols(SYMBOLS, 1, 3)[::-1]
+    # Hash Python hash()'ine bağlı değil: sabit bir parite hep aynı shard'a düşer
+    assert HashRing(shard_name(i) for i in range(4)).node_for("BTCUSDT") == \
+        HashRing(shard_name(i) for i in reversed(range(4))).node_for("BTCUSDT")
+
+
+def test_adding_a_shard_moves_only_its_share():
+    before = HashRing(shard_name(i) for i in range(4))
+    after = HashRing(shard_name(i) for i in range(5))
+    moved = [s for s in SYMBOLS if before.node_for(s) != after.node_for(s)]
+    assert all(after.node_for(s) == shard_name(4) for s in moved)
+    assert len(moved) < len(SYMBOLS) * 0.35
+
+
+def test_universe_version_ignores_order():
+    assert universe_version(["A", "B"]) == universe_version(["B", "A"]) != universe_version(["A"])
+
+
+class FakePipeline:
+    def __init__(self):
+        self.ws_clients = {}
+
+    def add_symbols(self, symbols):
+        self.ws_clients.update(dict.fromkeys(symbols))
+
+    async def remove_symbols(self, symbols):
+        for s in symbols:
+            self.ws_clients.pop(s, None)
+
+
+class FakeOrchestrator:
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.data_pipeline = FakePipeline()
+
+    def update_symbols(self, symbols):
+        self.symbols = list(symbols)
+
+    async def analyze_cycle(self):
+        return None, [{"symbol": s, "score": 1.0} for s in self.symbols]
+
+
+def make_workers(symbols, count):
+    workers = []
+    for i in range(count):
+        orchestrator = FakeOrchestrator(shard_symbols(symbols, i, count))
+        universe = UniverseManager([orchestrator], cache=object(),
+                                   partition=lambda syms, i=i: [shard_symbols(syms, i, count)])
+        workers.append(ShardWorker(shard_name(i), orchestrator, universe=universe, version=universe_version(symbols)))
+    return workers
+
+
+def test_coordinator_distributes_one_universe():
+    # Worker'lar farklı zamanlarda farklı listeler yüklemiş
+    workers = make_workers(SYMBOLS[:500], 3)
+    workers[1] = make_workers(SYMBOLS[100:], 3)[1]
+    coordinator = ShardCoordinator([InProcessTransport(w) for w in workers])
+    coordinator.set_universe(SYMBOLS[:550])
+    candidates = asyncio.run(coordinator.collect())
+    assert sorted(c["symbol"] for c in candidates) == sorted(SYMBOLS[:550])
+    assert {w.universe_version for w in workers} == {coordinator.version}
+
+
+def test_mismatched_worker_is_skipped_until_resynced():
+    workers = make_workers(SYMBOLS, 2)
+    coordinator = ShardCoordinator([InProcessTransport(w) for w in workers])
+    coordinator.set_universe(SYMBOLS)
+    asyncio.run(coordinator.collect())
+    # shard-1 yeniden başladı ve kendi (eski) listesiyle açıldı
+    stale = make_workers(SYMBOLS[:300], 2)[1]
+    coordinator.transports[1] = InProcessTransport(stale)
+    first = asyncio.run(coordinator.collect())
+    assert {c["symbol"] for c in first} == set(shard_symbols(SYMBOLS, 0, 2))
+    second = asyncio.run(coordinator.collect())
+    assert sorted(c["symbol"] for c in second) == sorted(SYMBOLS)
@@ -0,0 +1,88 @@
+# tests/test_signal_selector.py
+
+import random
+
+import pytest
+
+from core.signal_selector import SignalSelector
+
+
+def decision(symbol, edge, strategy="scalp", direction="long", safe=True):
+    return {
+        "symbol": symbol,
+        "direction": direction,
+        "safe": safe,
+        "edge_strength": edge,
+        "strategy": {"strategy": strategy},
+    }
+
+
+def top_n(decisions, n):
+    # Referans: tüm kararlar bittikten sonra strateji başına |edge| sıralı ilk N
+    best = {}
+    for strategy in ("scalp", "midterm"):
+        pool = [d for d in decisions if d["strategy"]["strategy"] == strategy and SignalSelector.eligible(d)]
+        best[strategy] = [d["symbol"] for d in sorted(pool, key=lambda d: abs(d["edge_strength"]), reverse=True)[:n]]
+    return best
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_streamed_emission_equals_sorted_top_n(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 5)
+    decisions = [
+        decision(
+            f"S{i}USDT",
+            round(rng.uniform(-1, 1), 2),
+            strategy=rng.choice(["scalp", "midterm", "none"]),
+            direction=rng.choice(["long", "short", "none"]),
+            safe=rng.random() > 0.2,
+        )
+        for i in range(rng.randint(5, 40))
+    ]
+    order = decisions[:]
+    rng.shuffle(order)
+    # Eşit |edge|'de geliş sırası belirleyici olduğundan referans da geliş sırasıyla sıralanır
+    expected = top_n(order, n)
+    selector = SignalSelector(total=len(decisions), n=n, early_edge=0)
+    emitted = []
+    while order:
+        size = rng.randint(1, 4)
+        chunk, order = order[:size], order[size:]
+        early = selector.push(chunk)
+        # Erken yayınlanan her karar nihai top-N'de olmak zorunda (rank + kalan < N kanıtı)
+        for dec in early:
+            assert dec["symbol"] in expected[dec["strategy"]["strategy"]]
+        emitted += early
+    emitted += selector.finish()
+    for strategy, symbols in expected.items():
+        got = [d["symbol"] for d in emitted if d["strategy"]["strategy"] == strategy]
+        assert sorted(got) == sorted(symbols)
+        assert len(got) == len(set(got))
+
+
+def test_decision_is_emitted_once_its_rank_is_final():
+    selector = SignalSelector(total=4, n=2, early_edge=0)
+    assert selector.push([decision("A", 0.9), decision("B", 0.1)]) == []
+    # Kalan 1 parite: rank 0 + 1 < 2 → A artık N dışına itilemez
+    assert [d["symbol"] for d in selector.push([decision("C", -0.5)])] == ["A"]
+    assert [d["symbol"] for d in selector.push([decision("D", 0.2, safe=False)])] == ["C"]
+    assert selector.finish() == []
+
+
+def test_early_edge_emits_before_rank_is_final():
+    selector = SignalSelector(total=3, n=1, early_edge=0.5)
+    # Eşiği geçen karar döngü bitmeden yayınlanır
+    assert [d["symbol"] for d in selector.push([decision("A", 0.6)])] == ["A"]
+    # Sonradan gelen daha güçlü karar top-1'i devralır ama kota dolu: yayınlanmaz
+    assert selector.push([decision("B", 0.9)]) == []
+    assert selector.push([decision("C", 0.7)]) == []
+    assert selector.finish() == []
+    assert top_n([decision("A", 0.6), decision("B", 0.9), decision("C", 0.7)], 1)["scalp"] == ["B"]
+
+
+def test_early_edge_below_threshold_waits_for_final_rank():
+    selector = SignalSelector(total=3, n=1, early_edge=0.5)
+    assert selector.push([decision("A", 0.4)]) == []
+    assert selector.push([decision("B", 0.45, strategy="midterm")]) == []
+    assert [d["symbol"] for d in selector.push([decision("C", 0.3)])] == ["A", "B"]
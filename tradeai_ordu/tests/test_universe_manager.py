@@ -0,0 +1,113 @@
+# tests/test_universe_manager.py
+
+import asyncio
+
+import pytest
+
+from core.hash_ring import shard_symbols
+from core.universe_manager import UniverseGuard, UniverseManager
+
+
+class FakePipeline:
+    def __init__(self, symbols):
+        self.ws_clients = dict.fromkeys(symbols)
+        self.closed = []
+
+    def add_symbols(self, symbols):
+        self.ws_clients.update(dict.fromkeys(symbols))
+
+    async def remove_symbols(self, symbols):
+        for s in symbols:
+            self.ws_clients.pop(s, None)
+            self.closed.append(s)
+
+
+class FakeOrchestrator:
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.data_pipeline = FakePipeline(symbols)
+        self.evicted = []
+
+    def update_symbols(self, symbols):
+        self.evicted += [s for s in self.symbols if s not in symbols]
+        self.symbols = list(symbols)
+
+
+class FakeCache:
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.refresh_task = None
+        self.entry = None
+
+    async def refresh(self):
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+SYMBOLS = [f"C{i}USDT" for i in range(40)]
+
+
+def test_apply_adds_and_removes_keeping_order():
+    orchestrator = FakeOrchestrator(SYMBOLS[:5])
+    manager = UniverseManager([orchestrator], cache=FakeCache())
+    change = asyncio.run(manager.apply(SYMBOLS[1:5] + ["NEWUSDT"]))
+    assert change == {"added": ["NEWUSDT"], "removed": ["C0USDT"]}
+    assert orchestrator.symbols == SYMBOLS[1:5] + ["NEWUSDT"]
+    assert orchestrator.evicted == ["C0USDT"]
+    assert set(orchestrator.data_pipeline.ws_clients) == set(orchestrator.symbols)
+
+
+def test_apply_without_change_is_a_noop():
+    orchestrator = FakeOrchestrator(SYMBOLS[:5])
+    manager = UniverseManager([orchestrator], cache=FakeCache())
+    assert asyncio.run(manager.apply(SYMBOLS[:5][::-1])) == {"added": [], "removed": []}
+    assert orchestrator.symbols == SYMBOLS[:5] and orchestrator.data_pipeline.closed == []
+
+
+def test_partitioned_apply_gives_each_shard_its_share():
+    shards = [FakeOrchestrator(shard_symbols(SYMBOLS[:30], i, 3)) for i in range(3)]
+    manager = UniverseManager(shards, cache=FakeCache(),
+                              partition=lambda syms: [shard_symbols(syms, i, 3) for i in range(3)])
+    asyncio.run(manager.apply(SYMBOLS[5:]))
+    for i, orchestrator in enumerate(shards):
+        assert sorted(orchestrator.symbols) == sorted(shard_symbols(SYMBOLS[5:], i, 3))
+    assert sorted(s for o in shards for s in o.symbols) == sorted(SYMBOLS[5:])
+
+
+def test_guard_rejects_empty_and_sharp_shrink():
+    guard = UniverseGuard(SYMBOLS, remove_after=3, max_shrink=0.1)
+    with pytest.raises(ValueError):
+        guard.accept([])
+    with pytest.raises(ValueError):
+        guard.accept(SYMBOLS[:30])
+    assert guard.listed == SYMBOLS and guard.missing == {}
+
+
+def test_guard_removes_only_after_consecutive_absences():
+    guard = UniverseGuard(SYMBOLS, remove_after=3, max_shrink=0.1)
+    without = SYMBOLS[1:]
+    assert "C0USDT" in guard.accept(without)
+    assert "C0USDT" in guard.accept(without)
+    assert "C0USDT" not in guard.accept(without)
+    # Arada geri gelen paritenin sayacı sıfırlanır
+    guard = UniverseGuard(SYMBOLS, remove_after=2, max_shrink=0.1)
+    guard.accept(without)
+    guard.accept(SYMBOLS)
+    assert "C0USDT" in guard.accept(without)
+
+
+def test_refresh_keeps_state_through_a_short_status_flap():
+    orchestrator = FakeOrchestrator(SYMBOLS)
+    flap = [s for s in SYMBOLS if s != "C7USDT"]
+    cache = FakeCache(flap, [], SYMBOLS[:10], SYMBOLS + ["NEWUSDT"])
+    manager = UniverseManager([orchestrator], cache=cache)
+    manager.guard.remove_after = 2
+    asyncio.run(manager.refresh())                  # C7 TRADING dışında: korunur
+    for _ in range(2):                              # boş ve yarım cevap reddedilir
+        with pytest.raises(ValueError):
+            asyncio.run(manager.refresh())
+    asyncio.run(manager.refresh())                  # C7 geri döndü
+    assert "C7USDT" in orchestrator.symbols and orchestrator.evicted == []
+    assert orchestrator.symbols[-1] == "NEWUSDT"
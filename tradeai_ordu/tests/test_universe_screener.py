@@ -0,0 +1,89 @@
+# tests/test_universe_screener.py
+
+import pytest
+
+from config.config import Config
+from core.universe_screener import UniverseScreener
+
+
+def ticker(symbol, price, volume=1e8, spread=0.02):
+    return {
+        "symbol": symbol,
+        "lastPrice": str(price),
+        "quoteVolume": str(volume),
+        "highPrice": str(price * (1 + spread)),
+        "lowPrice": str(price * (1 - spread)),
+    }
+
+
+@pytest.fixture
+def screener(monkeypatch):
+    monkeypatch.setattr(Config, "SCREEN_Z_ALWAYS", 3.0)
+    screener = UniverseScreener(top_k=3, min_k=2, max_k=5)
+    universe = [f"S{i}USDT" for i in range(10)]
+    # S0 en yüksek skor; |z| sadece S6, S7, S8 ve S9'da eşiğin üstünde
+    screener.scores = {s: 1.0 - i / 10 for i, s in enumerate(universe)}
+    screener.zscores = {s: 0.0 for s in universe}
+    screener.zscores.update({"S6USDT": 4.0, "S7USDT": -3.5, "S8USDT": 5.0, "S9USDT": 3.2})
+    return screener, universe
+
+
+def test_select_takes_top_k_by_score(screener):
+    screener, universe = screener
+    screener.zscores = dict.fromkeys(screener.zscores, 0.0)
+    assert screener.select(list(reversed(universe))) == ["S0USDT", "S1USDT", "S2USDT"]
+
+
+def test_select_adds_z_overflow_up_to_max_k(screener):
+    screener, universe = screener
+    deep = screener.select(universe)
+    # top-3 + |z| > 3 olanlar skor sırasıyla, toplam max_k=5'te kesilir (S8, S9 dışarıda)
+    assert deep == ["S0USDT", "S1USDT", "S2USDT", "S6USDT", "S7USDT"]
+    assert len(deep) == screener.max_k
+
+
+def test_select_keeps_open_signals_even_without_ticker(screener):
+    screener, universe = screener
+    screener.scores["S4USDT"] = -1.0  # likidite altı
+    universe.append("NEWUSDT")  # ticker'da görünmüyor
+    deep = screener.select(universe, open_symbols=["S1USDT", "S4USDT", "NEWUSDT", "GONEUSDT"])
+    assert deep[:5] == ["S0USDT", "S1USDT", "S2USDT", "S6USDT", "S7USDT"]
+    # Açık sinyalliler max_k dışında eklenir; evrende olmayan (delist) alınmaz, tekrar yok
+    assert deep[5:] == ["S4USDT", "NEWUSDT"]
+    # Açık sinyali olmayan skorsuz parite alınmaz
+    assert "NEWUSDT" not in screener.select(universe)
+
+
+def test_resize_shrinks_on_deferred_and_grows_with_spare_budget(screener):
+    screener, _ = screener
+    screener.k = 4
+    assert screener.resize({"deferred": 2}, elapsed=1.0, budget=10) == 3
+    assert screener.resize({"deferred": 1}, elapsed=1.0, budget=10) == 2
+    # min_k alt sınırı
+    assert screener.resize({"deferred": 1}, elapsed=1.0, budget=10) == 2
+    # Bütçenin yarısından azı kullanıldı: büyür, max_k'da durur
+    assert screener.resize({"deferred": 0}, elapsed=1.0, budget=10) == 3
+    for _ in range(5):
+        k = screener.resize({"deferred": 0}, elapsed=1.0, budget=10)
+    assert k == screener.max_k
+    # Bütçenin yarısı aşıldıysa veya bütçe yoksa sabit kalır
+    assert screener.resize({"deferred": 0}, elapsed=6.0, budget=10) == screener.max_k
+    screener.k = 3
+    assert screener.resize({"deferred": 0}, elapsed=1.0, budget=0) == 3
+
+
+def test_zscore_flags_a_jump_against_the_symbols_own_history():
+    screener = UniverseScreener(top_k=1, min_k=1, max_k=2)
+    price = 100.0
+    for i in range(30):
+        price *= 1.001 if i % 2 else 0.999
+        screener.update([ticker("AUSDT", price), ticker("BUSDT", 50.0 + (i % 2) * 0.05)])
+    assert abs(screener.zscores["AUSDT"]) < 3
+    screener.update([ticker("AUSDT", price * 1.05), ticker("BUSDT", 50.0)])
+    assert screener.zscores["AUSDT"] > 10
+    assert abs(screener.zscores["BUSDT"]) < 3
+    screener.evict("AUSDT")
+    assert "AUSDT" not in screener.last_price and "AUSDT" not in screener.ret_var
+    # Geçmişi olmayan parite için z = 0
+    screener.update([ticker("AUSDT", price)])
+    assert screener.zscores["AUSDT"] == 0.0
@@ -0,0 +1,75 @@
+# tests/test_ws_gaps.py
+
+import asyncio
+
+from core.binance_ws_client import BinanceWebSocketClient
+from core.data_pipeline import DataPipeline
+
+IV = 900_000
+T0 = 1_700_000_100_000 - 1_700_000_100_000 % IV
+
+
+def message(open_time, closed):
+    return {"E": open_time, "k": {"t": open_time, "T": open_time + IV - 1, "x": closed, "n": 10,
+                                  "o": "1", "h": "1", "l": "1", "c": "1", "v": "1", "q": "1", "V": "1", "Q": "1"}}
+
+
+def client_with(n):
+    client = BinanceWebSocketClient("BTCUSDT", "15m")
+    notified = []
+    client.on_gap = notified.append
+    for i in range(n):
+        client._on_kline(message(T0 + i * IV, True))
+    return client, notified
+
+
+def test_contiguous_stream_has_no_gaps():
+    client, notified = client_with(5)
+    client._on_kline(message(T0 + 5 * IV, False))
+    assert client.pending_gaps == [] and notified == []
+
+
+def test_missed_candles_are_recorded_once():
+    client, notified = client_with(3)
+    # Soket kopukken T0+3 ve T0+4 kapandı
+    client._on_kline(message(T0 + 5 * IV, False))
+    client._on_kline(message(T0 + 5 * IV, False))
+    assert client.pending_gaps == [(T0 + 3 * IV, T0 + 4 * IV)]
+    assert notified == ["BTCUSDT"]
+
+
+def test_early_next_candle_does_not_leave_a_gap():
+    client, notified = client_with(3)
+    # T0+4'ün ilk mesajı T0+3'ün x=true kapanışından önce geldi
+    client._on_kline(message(T0 + 4 * IV, False))
+    assert client.pending_gaps == [(T0 + 3 * IV, T0 + 3 * IV)]
+    client._on_kline(message(T0 + 3 * IV, True))
+    assert client.pending_gaps == []
+    client._on_kline(message(T0 + 4 * IV, True))
+    assert client.pending_gaps == [] and len(client.latest_klines) == 5
+
+
+def test_late_candle_keeps_the_rest_of_the_gap():
+    client, _ = client_with(3)
+    client._on_kline(message(T0 + 6 * IV, False))
+    client._on_kline(message(T0 + 3 * IV, True))
+    assert client.pending_gaps == [(T0 + 4 * IV, T0 + 5 * IV)]
+
+
+def test_buffer_holes_and_known_holes():
+    client, _ = client_with(3)
+    client.merge_klines([{**client.latest_klines[0], "open_time": T0 + 5 * IV}])
+    assert client.pending_gaps == [(T0 + 3 * IV, T0 + 4 * IV)]
+    client.known_holes.add((T0 + 3 * IV, T0 + 4 * IV))
+    assert client.scan_gaps() == []
+
+
+def test_fill_skips_removed_symbol():
+    async def scenario():
+        pipeline = DataPipeline(["BTCUSDT"])
+        client = pipeline.ws_clients["BTCUSDT"]
+        client.pending_gaps = [(T0, T0)]
+        await pipeline.remove_symbols(["BTCUSDT"])
+        return await pipeline._fill_gaps(client), client.pending_gaps
+
+    assert asyncio.run(scenario()) == (False, [(T0, T0)])